@@ -0,0 +1,77 @@
+"""
+Per-request cost of the bearer auth pipeline, before and after decoding the
+JWT once per request.
+
+"before" replays the old flow: the token is decoded by AccessPass, decoded
+again by is_token_valid, and the separate AccessTokenBearer instance used by
+get_current_user repeats both on the same request. "after" is the current
+AccessTokenBearer called the same two times on one request.
+
+The Redis blocklist lookup is stubbed out so only the CPU work is measured.
+
+Run from the repository root with the app's environment loaded:
+
+    python -m benchmarks.auth_pipeline
+"""
+import asyncio
+import time
+from datetime import timedelta
+from starlette.requests import Request
+from src.app.auth import dependencies
+from src.app.auth.utils import create_access_token, verify_access_token
+
+ITERATIONS = 20_000
+
+
+async def not_blocklisted(jti: str) -> bool:
+    return False
+
+
+def make_request(token: str) -> Request:
+    return Request({"type": "http", "headers": [(b"authorization", f"Bearer {token}".encode())]})
+
+
+async def legacy_access_pass(token: str) -> dict:
+    token_data = verify_access_token(token)
+    if verify_access_token(token) is None:
+        raise ValueError("invalid token")
+    await not_blocklisted(token_data["jti"])
+    return token_data
+
+
+async def before(token: str) -> None:
+    # access_token_bearer on the route + AccessTokenBearer() inside get_current_user
+    await legacy_access_pass(token)
+    await legacy_access_pass(token)
+
+
+async def after(token: str) -> None:
+    request = make_request(token)
+    await dependencies.access_token_bearer(request)
+    await dependencies.access_token_bearer(request)
+
+
+async def measure(pipeline, token: str) -> float:
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        await pipeline(token)
+    return (time.perf_counter() - start) / ITERATIONS * 1e6
+
+
+async def main() -> None:
+    dependencies.token_in_blocklist = not_blocklisted
+    token = create_access_token({"user_uid": "benchmark"}, expiry=timedelta(hours=1))
+
+    # warm up
+    await measure(before, token)
+    await measure(after, token)
+
+    before_us = await measure(before, token)
+    after_us = await measure(after, token)
+
+    print(f"before: {before_us:8.2f} us/request")
+    print(f"after:  {after_us:8.2f} us/request  ({before_us / after_us:.1f}x)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
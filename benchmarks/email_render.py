@@ -0,0 +1,78 @@
+"""
+Cost of rendering personalized emails, for sizing digest jobs.
+
+Renders ITERATIONS messages through the worker's path (render_message on a
+queued email_message payload): verification emails, and job alert digests of
+DIGEST_SIZE jobs. "recompiled" is the same render with the message's template compiled
+from source every time, which is what a worker without the template cache
+would pay; it runs a fraction of the iterations and is scaled per message.
+
+Run from the repository root with the app's environment loaded:
+
+    python -m benchmarks.email_render
+"""
+import time
+from src.app import email_templates
+from src.app.email_templates import email_message, render_message
+
+ITERATIONS = 100_000
+RECOMPILED_ITERATIONS = 2_000
+DIGEST_SIZE = 10
+
+
+def verification(i: int) -> dict:
+    return email_message([f"user{i}@example.com"], "verify_email", link=f"http://localhost:8000/api/v1/auth/verify_email/token{i}")
+
+
+def digest(i: int) -> dict:
+    jobs = [
+        {"title": f"Backend Engineer {i}-{j}", "location": "Lagos", "salary": "NGN 500k - 700k per month", "link": f"http://localhost:8000/api/v1/jobs/{i}-{j}"}
+        for j in range(DIGEST_SIZE)
+    ]
+    return email_message([f"user{i}@example.com"], "job_alert", first_name=f"User {i}", jobs=jobs)
+
+
+def measure(make_message, iterations: int) -> tuple[float, int]:
+    """Microseconds per message, and the average body size in bytes."""
+    messages = [make_message(i) for i in range(iterations)]
+    size = 0
+
+    start = time.perf_counter()
+    for message in messages:
+        _, body = render_message(message)
+        size += len(body)
+    elapsed = time.perf_counter() - start
+
+    return elapsed / iterations * 1e6, size // iterations
+
+
+def recompiled(make_message, iterations: int) -> float:
+    environment = email_templates.template_environment()
+    messages = [make_message(i) for i in range(iterations)]
+
+    start = time.perf_counter()
+    for message in messages:
+        source = environment.loader.get_source(environment, f"{message['template']}.html")[0]
+        environment.from_string(source).render(message["context"])
+    elapsed = time.perf_counter() - start
+
+    return elapsed / iterations * 1e6
+
+
+def main() -> None:
+    email_templates.load_templates()
+
+    for name, make_message in (("verification", verification), (f"digest of {DIGEST_SIZE}", digest)):
+        # warm up
+        measure(make_message, 1_000)
+
+        cached_us, size = measure(make_message, ITERATIONS)
+        recompiled_us = recompiled(make_message, RECOMPILED_ITERATIONS)
+
+        print(f"{name}: {ITERATIONS:,} messages of ~{size:,} bytes")
+        print(f"  cached:     {cached_us:8.2f} us/message  ({1e6 / cached_us:,.0f} messages/s per process)")
+        print(f"  recompiled: {recompiled_us:8.2f} us/message  ({recompiled_us / cached_us:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
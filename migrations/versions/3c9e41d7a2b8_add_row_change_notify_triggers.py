@@ -0,0 +1,59 @@
+"""Add row change NOTIFY triggers
+
+Revision ID: 3c9e41d7a2b8
+Revises: 752294c86b57
+Create Date: 2026-10-18 14:05:12.402871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9e41d7a2b8'
+down_revision: Union[str, None] = '752294c86b57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# must match src.db.change_feed.CHANNEL
+channel = 'row_changes'
+tables = ['users', 'jobs', 'applications']
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION notify_row_change() RETURNS trigger AS $$
+        DECLARE
+            changed RECORD;
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                changed := OLD;
+            ELSE
+                changed := NEW;
+            END IF;
+
+            PERFORM pg_notify('{channel}', json_build_object('table', TG_TABLE_NAME, 'op', TG_OP, 'uid', changed.uid)::text);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+
+    for table in tables:
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_notify_row_change ON {table}")
+        op.execute(f"""
+            CREATE TRIGGER {table}_notify_row_change
+            AFTER INSERT OR UPDATE OR DELETE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION notify_row_change()
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in reversed(tables):
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_notify_row_change ON {table}")
+
+    op.execute("DROP FUNCTION IF EXISTS notify_row_change()")
@@ -0,0 +1,43 @@
+"""Add full-text search vector to jobs
+
+Revision ID: 5d27b0e6f1c3
+Revises: a81f5c2e9d04
+Create Date: 2026-10-18 16:40:03.551920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '5d27b0e6f1c3'
+down_revision: Union[str, None] = 'a81f5c2e9d04'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# must match src.app.models.job_search_vector
+search_document = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(location, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'C')"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # a stored generated column is computed for every existing row, which rewrites the table
+    op.add_column('jobs', sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed(search_document, persisted=True), nullable=True))
+
+    with op.get_context().autocommit_block():
+        op.create_index('ix_jobs_search_vector', 'jobs', ['search_vector'], postgresql_using='gin', postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_jobs_search_vector', table_name='jobs', postgresql_concurrently=True, if_exists=True)
+
+    op.drop_column('jobs', 'search_vector')
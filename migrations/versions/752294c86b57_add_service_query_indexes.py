@@ -0,0 +1,47 @@
+"""Add indexes for service layer queries
+
+Revision ID: 752294c86b57
+Revises: ddcf9d8064b6
+Create Date: 2026-10-18 09:12:40.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '752294c86b57'
+down_revision: Union[str, None] = 'ddcf9d8064b6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (name, table, columns) - btree indexes can be scanned backwards, so these also
+# serve the `ORDER BY created_at DESC, uid DESC` used by the services
+indexes = [
+    ('ix_users_email_address', 'users', ['email_address']),
+    ('ix_jobs_created_at_uid', 'jobs', ['created_at', 'uid']),
+    ('ix_jobs_employer_uid_created_at', 'jobs', ['employer_uid', 'created_at']),
+    ('ix_jobs_job_type_work_mode_created_at', 'jobs', ['job_type', 'work_mode', 'created_at', 'uid']),
+    ('ix_jobs_work_mode_created_at', 'jobs', ['work_mode', 'created_at', 'uid']),
+    ('ix_applications_created_at', 'applications', ['created_at']),
+    ('ix_applications_job_uid_created_at', 'applications', ['job_uid', 'created_at']),
+    ('ix_applications_user_uid_created_at', 'applications', ['user_uid', 'created_at']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY can not run inside a transaction block
+    with op.get_context().autocommit_block():
+        for name, table, columns in indexes:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, columns in reversed(indexes):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
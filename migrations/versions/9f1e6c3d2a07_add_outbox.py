@@ -0,0 +1,38 @@
+"""Add outbox
+
+Revision ID: 9f1e6c3d2a07
+Revises: e7d3a9c1b5f2
+Create Date: 2026-10-18 20:31:54.662190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '9f1e6c3d2a07'
+down_revision: Union[str, None] = 'e7d3a9c1b5f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('outbox',
+    sa.Column('uid', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('attempts', postgresql.INTEGER(), server_default='0', nullable=False),
+    sa.Column('created_at', postgresql.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('available_at', postgresql.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('uid')
+    )
+    op.create_index('ix_outbox_available_at', 'outbox', ['available_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_outbox_available_at', table_name='outbox')
+    op.drop_table('outbox')
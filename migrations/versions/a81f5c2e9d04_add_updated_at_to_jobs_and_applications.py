@@ -0,0 +1,32 @@
+"""Add updated_at to jobs and applications
+
+Revision ID: a81f5c2e9d04
+Revises: 3c9e41d7a2b8
+Create Date: 2026-10-18 15:22:47.913350
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'a81f5c2e9d04'
+down_revision: Union[str, None] = '3c9e41d7a2b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # now() is stable within the transaction, so existing rows get it without a table rewrite
+    op.add_column('jobs', sa.Column('updated_at', postgresql.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False))
+    op.add_column('applications', sa.Column('updated_at', postgresql.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('applications', 'updated_at')
+    op.drop_column('jobs', 'updated_at')
@@ -0,0 +1,157 @@
+"""Add structured salary to jobs
+
+Revision ID: c4b8e2f7a913
+Revises: 5d27b0e6f1c3
+Create Date: 2026-10-18 18:05:12.407316
+
+"""
+import re
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4b8e2f7a913'
+down_revision: Union[str, None] = '5d27b0e6f1c3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+salary_period = postgresql.ENUM('HOUR', 'DAY', 'WEEK', 'MONTH', 'YEAR', name='salary_period', create_type=False)
+
+# A frozen copy of src.app.salary.parse_salary, so this backfill does the same thing
+# however the app's parser changes later. Periods are the salary_period labels.
+CURRENCY_SYMBOLS = {'$': 'USD', '₦': 'NGN', '£': 'GBP', '€': 'EUR', '₵': 'GHS', '₹': 'INR'}
+CURRENCY_WORDS = {'naira': 'NGN', 'dollar': 'USD', 'dollars': 'USD', 'pound': 'GBP', 'pounds': 'GBP', 'euro': 'EUR', 'euros': 'EUR', 'cedi': 'GHS', 'cedis': 'GHS'}
+CURRENCY_CODES = {'USD', 'NGN', 'GBP', 'EUR', 'CAD', 'AUD', 'GHS', 'KES', 'ZAR', 'INR', 'EGP'}
+
+PERIOD_WORDS = {
+    'HOUR': ('hour', 'hourly', 'hr', 'ph'),
+    'DAY': ('day', 'daily'),
+    'WEEK': ('week', 'weekly', 'wk', 'pw'),
+    'MONTH': ('month', 'monthly', 'mo', 'mth', 'pm'),
+    'YEAR': ('year', 'yearly', 'yr', 'annual', 'annually', 'annum', 'pa'),
+}
+
+AMOUNT = re.compile(r'(\d[\d,]*(?:\.\d+)?)\s*(thousand|million|billion|mn|bn|k|m|%)?(?![a-z])', re.IGNORECASE)
+WORD = re.compile(r'[a-z]+', re.IGNORECASE)
+MULTIPLIERS = {'k': 1_000, 'thousand': 1_000, 'm': 1_000_000, 'mn': 1_000_000, 'million': 1_000_000, 'bn': 1_000_000_000, 'billion': 1_000_000_000}
+MAX_AMOUNT = 10 ** 10
+
+
+def parse_salary(text):
+    """(salary_min, salary_max, currency, period) of a free-form salary; unstated parts are None."""
+    if not text:
+        return None, None, None, None
+
+    amounts = []
+    suffixes = []
+    for number, suffix in AMOUNT.findall(text):
+        if suffix == '%':
+            continue
+
+        amounts.append(float(number.replace(',', '')))
+        suffixes.append(suffix.lower())
+
+    if len(amounts) == 2 and suffixes[1] and not suffixes[0] and amounts[0] < amounts[1]:
+        suffixes[0] = suffixes[1]
+
+    amounts = [amount * MULTIPLIERS.get(suffix, 1) for amount, suffix in zip(amounts, suffixes)]
+    amounts = [amount for amount in amounts if amount < MAX_AMOUNT]
+
+    words = [word.lower() for word in WORD.findall(text.replace('.', ''))]
+
+    currency = next((code for symbol, code in CURRENCY_SYMBOLS.items() if symbol in text), None)
+    currency = currency or next((word.upper() for word in words if word.upper() in CURRENCY_CODES), None)
+    currency = currency or next((CURRENCY_WORDS[word] for word in words if word in CURRENCY_WORDS), None)
+
+    period = next((period for word in words for period, names in PERIOD_WORDS.items() if word in names), None)
+
+    if not amounts:
+        return None, None, currency, period
+
+    return min(amounts), max(amounts), currency, period
+
+
+jobs = sa.table(
+    'jobs',
+    sa.column('uid', postgresql.UUID(as_uuid=True)),
+    sa.column('salary', sa.String()),
+    sa.column('salary_min', sa.NUMERIC(12, 2)),
+    sa.column('salary_max', sa.NUMERIC(12, 2)),
+    sa.column('currency', sa.CHAR(3)),
+    sa.column('period', salary_period),
+)
+
+
+def backfill_salaries(bind) -> None:
+    """Parses the salary of every existing job, one committed batch at a time."""
+    update = (
+        jobs.update()
+        .where(jobs.c.uid == sa.bindparam('job_uid'))
+        .values(
+            salary_min=sa.bindparam('salary_min'),
+            salary_max=sa.bindparam('salary_max'),
+            currency=sa.bindparam('currency'),
+            period=sa.bindparam('period'),
+        )
+    )
+
+    last_uid = None
+    while True:
+        batch = sa.select(jobs.c.uid, jobs.c.salary).order_by(jobs.c.uid).limit(BATCH_SIZE)
+        if last_uid is not None:
+            batch = batch.where(jobs.c.uid > last_uid)
+
+        rows = bind.execute(batch).all()
+        if not rows:
+            break
+
+        parsed = []
+        for uid, salary in rows:
+            salary_min, salary_max, currency, period = parse_salary(salary)
+            parsed.append({
+                'job_uid': uid,
+                'salary_min': salary_min,
+                'salary_max': salary_max,
+                'currency': currency,
+                'period': period,
+            })
+
+        bind.execute(update, parsed)
+        last_uid = rows[-1].uid
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    salary_period.create(op.get_bind(), checkfirst=True)
+
+    # nullable columns without a default are a catalog-only change
+    op.add_column('jobs', sa.Column('salary_min', sa.NUMERIC(12, 2), nullable=True))
+    op.add_column('jobs', sa.Column('salary_max', sa.NUMERIC(12, 2), nullable=True))
+    op.add_column('jobs', sa.Column('currency', sa.CHAR(3), nullable=True))
+    op.add_column('jobs', sa.Column('period', salary_period, nullable=True))
+
+    # outside the migration transaction, so each batch commits and only holds its own row locks
+    with op.get_context().autocommit_block():
+        backfill_salaries(op.get_bind())
+
+        op.create_index('ix_jobs_salary_min', 'jobs', ['salary_min'], postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_jobs_salary_max', 'jobs', ['salary_max'], postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_jobs_salary_max', table_name='jobs', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_jobs_salary_min', table_name='jobs', postgresql_concurrently=True, if_exists=True)
+
+    op.drop_column('jobs', 'period')
+    op.drop_column('jobs', 'currency')
+    op.drop_column('jobs', 'salary_max')
+    op.drop_column('jobs', 'salary_min')
+    salary_period.drop(op.get_bind(), checkfirst=True)
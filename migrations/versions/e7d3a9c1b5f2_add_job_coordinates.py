@@ -0,0 +1,292 @@
+"""Add coordinates and geohash to jobs
+
+Revision ID: e7d3a9c1b5f2
+Revises: c4b8e2f7a913
+Create Date: 2026-10-18 19:12:36.118204
+
+"""
+import csv
+import io
+import re
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7d3a9c1b5f2'
+down_revision: Union[str, None] = 'c4b8e2f7a913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+# Frozen copies of the bundled gazetteer and of the src.app.geo code that places a job,
+# so this backfill does the same thing however the app's data and code change later.
+GAZETTEER = """\
+name,country,latitude,longitude,aliases
+Lagos,NG,6.5244,3.3792,Lagos State|Eko|Lagos Island
+Ikeja,NG,6.6018,3.3515,
+Lekki,NG,6.4698,3.5852,
+Victoria Island,NG,6.4281,3.4219,VI
+Ikoyi,NG,6.4549,3.4346,
+Yaba,NG,6.5095,3.3711,
+Surulere,NG,6.5000,3.3500,
+Abuja,NG,9.0765,7.3986,FCT|Federal Capital Territory
+Ibadan,NG,7.3775,3.9470,Oyo
+Kano,NG,12.0022,8.5920,
+Port Harcourt,NG,4.8156,7.0498,Rivers
+Benin City,NG,6.3350,5.6037,Benin|Edo
+Enugu,NG,6.4584,7.5464,
+Kaduna,NG,10.5105,7.4165,
+Jos,NG,9.8965,8.8583,Plateau
+Ilorin,NG,8.4966,4.5421,Kwara
+Abeokuta,NG,7.1475,3.3619,Ogun
+Owerri,NG,5.4840,7.0351,Imo
+Calabar,NG,4.9757,8.3417,Cross River
+Uyo,NG,5.0377,7.9128,Akwa Ibom
+Warri,NG,5.5544,5.7932,Delta
+Akure,NG,7.2571,5.2058,Ondo
+Onitsha,NG,6.1445,6.7885,
+Awka,NG,6.2104,7.0741,Anambra
+Aba,NG,5.1066,7.3667,
+Umuahia,NG,5.5320,7.4860,Abia
+Maiduguri,NG,11.8311,13.1510,Borno
+Sokoto,NG,13.0059,5.2476,
+Zaria,NG,11.0855,7.7199,
+Osogbo,NG,7.7827,4.5418,Osun
+Ado Ekiti,NG,7.6211,5.2214,Ekiti
+Asaba,NG,6.1980,6.7320,
+Makurdi,NG,7.7322,8.5391,Benue
+Lokoja,NG,7.8023,6.7333,Kogi
+Minna,NG,9.6139,6.5569,Niger
+Bauchi,NG,10.3158,9.8442,
+Yola,NG,9.2035,12.4954,Adamawa
+Accra,GH,5.6037,-0.1870,
+Kumasi,GH,6.6885,-1.6244,
+Nairobi,KE,-1.2921,36.8219,
+Mombasa,KE,-4.0435,39.6682,
+Kigali,RW,-1.9441,30.0619,
+Kampala,UG,0.3476,32.5825,
+Dar es Salaam,TZ,-6.7924,39.2083,
+Addis Ababa,ET,9.0300,38.7400,
+Johannesburg,ZA,-26.2041,28.0473,Joburg
+Cape Town,ZA,-33.9249,18.4241,
+Pretoria,ZA,-25.7479,28.2293,
+Durban,ZA,-29.8587,31.0218,
+Cairo,EG,30.0444,31.2357,
+Casablanca,MA,33.5731,-7.5898,
+Dakar,SN,14.7167,-17.4677,
+Abidjan,CI,5.3600,-4.0083,
+Lusaka,ZM,-15.3875,28.3228,
+Harare,ZW,-17.8252,31.0335,
+Tunis,TN,36.8065,10.1815,
+Kinshasa,CD,-4.4419,15.2663,
+Luanda,AO,-8.8390,13.2894,
+Douala,CM,4.0511,9.7679,
+Yaounde,CM,3.8480,11.5021,Yaoundé
+Lome,TG,6.1256,1.2254,Lomé
+Cotonou,BJ,6.3703,2.3912,
+London,GB,51.5074,-0.1278,
+Manchester,GB,53.4808,-2.2426,
+Birmingham,GB,52.4862,-1.8904,
+Edinburgh,GB,55.9533,-3.1883,
+Dublin,IE,53.3498,-6.2603,
+Paris,FR,48.8566,2.3522,
+Berlin,DE,52.5200,13.4050,
+Munich,DE,48.1351,11.5820,München
+Hamburg,DE,53.5511,9.9937,
+Amsterdam,NL,52.3676,4.9041,
+Brussels,BE,50.8503,4.3517,
+Madrid,ES,40.4168,-3.7038,
+Barcelona,ES,41.3874,2.1686,
+Lisbon,PT,38.7223,-9.1393,Lisboa
+Rome,IT,41.9028,12.4964,Roma
+Milan,IT,45.4642,9.1900,Milano
+Zurich,CH,47.3769,8.5417,Zürich
+Stockholm,SE,59.3293,18.0686,
+Copenhagen,DK,55.6761,12.5683,
+Oslo,NO,59.9139,10.7522,
+Helsinki,FI,60.1699,24.9384,
+Warsaw,PL,52.2297,21.0122,
+Prague,CZ,50.0755,14.4378,
+Vienna,AT,48.2082,16.3738,
+Tallinn,EE,59.4370,24.7536,
+Istanbul,TR,41.0082,28.9784,
+Dubai,AE,25.2048,55.2708,
+Abu Dhabi,AE,24.4539,54.3773,
+Riyadh,SA,24.7136,46.6753,
+Doha,QA,25.2854,51.5310,
+Tel Aviv,IL,32.0853,34.7818,
+New York,US,40.7128,-74.0060,NYC|New York City
+San Francisco,US,37.7749,-122.4194,SF
+Los Angeles,US,34.0522,-118.2437,LA
+Seattle,US,47.6062,-122.3321,
+Austin,US,30.2672,-97.7431,
+Chicago,US,41.8781,-87.6298,
+Boston,US,42.3601,-71.0589,
+Washington,US,38.9072,-77.0369,Washington DC|DC
+Atlanta,US,33.7490,-84.3880,
+Houston,US,29.7604,-95.3698,
+Dallas,US,32.7767,-96.7970,
+Miami,US,25.7617,-80.1918,
+Denver,US,39.7392,-104.9903,
+Toronto,CA,43.6532,-79.3832,
+Vancouver,CA,49.2827,-123.1207,
+Montreal,CA,45.5017,-73.5673,Montréal
+Calgary,CA,51.0447,-114.0719,
+Ottawa,CA,45.4215,-75.6972,
+Mexico City,MX,19.4326,-99.1332,
+Sao Paulo,BR,-23.5505,-46.6333,São Paulo
+Rio de Janeiro,BR,-22.9068,-43.1729,
+Buenos Aires,AR,-34.6037,-58.3816,
+Bogota,CO,4.7110,-74.0721,Bogotá
+Santiago,CL,-33.4489,-70.6693,
+Lima,PE,-12.0464,-77.0428,
+Bangalore,IN,12.9716,77.5946,Bengaluru
+Mumbai,IN,19.0760,72.8777,Bombay
+Delhi,IN,28.7041,77.1025,New Delhi
+Hyderabad,IN,17.3850,78.4867,
+Chennai,IN,13.0827,80.2707,
+Pune,IN,18.5204,73.8567,
+Singapore,SG,1.3521,103.8198,
+Kuala Lumpur,MY,3.1390,101.6869,KL
+Jakarta,ID,-6.2088,106.8456,
+Manila,PH,14.5995,120.9842,
+Bangkok,TH,13.7563,100.5018,
+Ho Chi Minh City,VN,10.8231,106.6297,Saigon
+Hong Kong,HK,22.3193,114.1694,
+Shanghai,CN,31.2304,121.4737,
+Beijing,CN,39.9042,116.4074,
+Shenzhen,CN,22.5431,114.0579,
+Seoul,KR,37.5665,126.9780,
+Tokyo,JP,35.6762,139.6503,
+Sydney,AU,-33.8688,151.2093,
+Melbourne,AU,-37.8136,144.9631,
+Brisbane,AU,-27.4698,153.0251,
+Perth,AU,-31.9505,115.8605,
+Auckland,NZ,-36.8485,174.7633,
+"""
+
+GEOHASH_ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+GEOHASH_PRECISION = 7
+PLACE_SEPARATORS = re.compile(r'[,;/|()]|\s-\s')
+
+
+def normalize_place(name):
+    return ' '.join(re.sub(r'[^\w\s]', ' ', name.lower()).split())
+
+
+def load_gazetteer():
+    places = {}
+
+    for row in csv.DictReader(io.StringIO(GAZETTEER)):
+        coordinates = (float(row['latitude']), float(row['longitude']))
+
+        for name in [row['name'], *filter(None, row['aliases'].split('|'))]:
+            places.setdefault(normalize_place(name), coordinates)
+
+    return places
+
+
+def geohash_encode(latitude, longitude, precision=GEOHASH_PRECISION):
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars = []
+    bits = 0
+    value = 0
+    even = True
+
+    while len(chars) < precision:
+        interval, coordinate = (lon_range, longitude) if even else (lat_range, latitude)
+        middle = (interval[0] + interval[1]) / 2
+
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+
+        even = not even
+        bits += 1
+
+        if bits == 5:
+            chars.append(GEOHASH_ALPHABET[value])
+            bits = 0
+            value = 0
+
+    return ''.join(chars)
+
+
+def location_columns(places, location):
+    """latitude, longitude and geohash of a job at `location`, all None if it can't be placed."""
+    for candidate in [location, *PLACE_SEPARATORS.split(location)] if location else []:
+        coordinates = places.get(normalize_place(candidate))
+
+        if coordinates is not None:
+            return {'latitude': coordinates[0], 'longitude': coordinates[1], 'geohash': geohash_encode(*coordinates)}
+
+    return {'latitude': None, 'longitude': None, 'geohash': None}
+
+
+jobs = sa.table(
+    'jobs',
+    sa.column('uid', postgresql.UUID(as_uuid=True)),
+    sa.column('location', sa.String()),
+    sa.column('latitude', sa.Float()),
+    sa.column('longitude', sa.Float()),
+    sa.column('geohash', sa.String()),
+)
+
+
+def backfill_coordinates(bind) -> None:
+    """Places every existing job with the bundled gazetteer, one committed batch at a time."""
+    update = (
+        jobs.update()
+        .where(jobs.c.uid == sa.bindparam('job_uid'))
+        .values(
+            latitude=sa.bindparam('latitude'),
+            longitude=sa.bindparam('longitude'),
+            geohash=sa.bindparam('geohash'),
+        )
+    )
+
+    places = load_gazetteer()
+
+    last_uid = None
+    while True:
+        batch = sa.select(jobs.c.uid, jobs.c.location).order_by(jobs.c.uid).limit(BATCH_SIZE)
+        if last_uid is not None:
+            batch = batch.where(jobs.c.uid > last_uid)
+
+        rows = bind.execute(batch).all()
+        if not rows:
+            break
+
+        bind.execute(update, [{'job_uid': uid, **location_columns(places, location)} for uid, location in rows])
+        last_uid = rows[-1].uid
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('jobs', sa.Column('latitude', sa.Float(), nullable=True))
+    op.add_column('jobs', sa.Column('longitude', sa.Float(), nullable=True))
+    op.add_column('jobs', sa.Column('geohash', sqlmodel.sql.sqltypes.AutoString(length=12), nullable=True))
+
+    # outside the migration transaction, so each batch commits and only holds its own row locks
+    with op.get_context().autocommit_block():
+        backfill_coordinates(op.get_bind())
+
+        op.create_index('ix_jobs_geohash', 'jobs', ['geohash'], postgresql_ops={'geohash': 'text_pattern_ops'}, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_jobs_geohash', table_name='jobs', postgresql_concurrently=True, if_exists=True)
+
+    op.drop_column('jobs', 'geohash')
+    op.drop_column('jobs', 'longitude')
+    op.drop_column('jobs', 'latitude')
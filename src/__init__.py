@@ -1,10 +1,14 @@
+import asyncio
 from fastapi import FastAPI, status
 from contextlib import asynccontextmanager
 from fastapi.responses import JSONResponse
 from src.app.auth import auth
 from src.app.errors import register_all_errors
-from src.db.main import init_db
-from src.app.router import users, jobs, application
+from src.db.main import init_db, async_engine
+from src.db.redis import listen_for_messages, rebuild_token_blocklist
+from src.db.change_feed import listen_for_changes
+from src.app.outbox import outbox_dispatcher
+from src.app.router import users, jobs, application, metrics
 from src.app.middlewares import register_all_middlewares
 
 
@@ -12,8 +16,17 @@ from src.app.middlewares import register_all_middlewares
 async def life_span(app: FastAPI):
     print(f"sever is starting ..........")
     await init_db()
+    # cross-worker cache invalidations
+    listeners = [asyncio.create_task(listen_for_messages()), asyncio.create_task(listen_for_changes())]
+    # drops expired revocations from the local blocklist filter
+    listeners.append(asyncio.create_task(rebuild_token_blocklist()))
+    # emails committed by requests
+    listeners.append(asyncio.create_task(outbox_dispatcher.run()))
     yield
     print(f"sever is shutting down ..........")
+    for listener in listeners:
+        listener.cancel()
+    await async_engine.dispose()
     print(f"sever has been stopped")
 
 version = "v1"
@@ -45,6 +58,7 @@ app.include_router(auth.auth_router, prefix=f'/api/{version}')
 app.include_router(users.user_router, prefix=f'/api/{version}')
 app.include_router(jobs.job_router, prefix=f'/api/{version}')
 app.include_router(application.apps_router, prefix=f'/api/{version}')
+app.include_router(metrics.metrics_router, prefix=f'/api/{version}')
 
 
 @app.get('/')
@@ -4,16 +4,17 @@ from datetime import timedelta
 from fastapi.responses import JSONResponse
 from datetime import datetime, timedelta, timezone
 from src.db.main import get_session
-from src.app.auth.utils import verify_password, create_access_token, create_url_safe_token, decode_url_safe_token, hash_password
+from src.app.auth.utils import create_access_token, create_url_safe_token, decode_url_safe_token
+from src.app.auth.hashing import verify_password, hash_password, password_needs_rehash
 from src.app import schemas, errors
 from src.app.services import user_service
 from src.app.auth.dependencies import refresh_token_bearer, access_token_bearer
-from src.db.redis import add_token_to_blocklist, save_email_verification_token
+from src.db.redis import add_token_to_blocklist, save_email_verification_token, claim_password_reset_email, release_password_reset_email
 from src.app.auth.dependencies import get_current_user, RoleChecker
 import logging
-from src.app.mail import mail, create_message
 from src.config import Config
 from src.celery_tasks import send_email as celery_worker
+from src.app.outbox import enqueue_email, outbox_dispatcher
 
 
 auth_router = APIRouter(
@@ -57,25 +58,22 @@ async def signup(user_data: schemas.UserCreate, bg_tasks: BackgroundTasks, sessi
     if user_data.role not in list(schemas.UserRoles):
         raise errors.RoleError()
     
-    new_user = await user_service.create_user(user_data, session)
-
     token = create_url_safe_token({"email": email})
 
     link = f"http://{Config.DOMAIN}/api/v1/auth/verify_email/{token}"
 
-    html_message =f"""
-    <h1>Verify your Email Address</h1>
-    <p>Please click on the <a href="{link}">link</a> to veify your account</p>
-    """
     emails = [email]
 
-    subject = "Verify your email"
+    # goes out only if create_user commits the user, in the same transaction
+    enqueue_email(session, emails, "verify_email", link=link)
+
+    new_user = await user_service.create_user(user_data, session)
+
+    outbox_dispatcher.notify()
 
     # Save the token in Redis
     await save_email_verification_token(emails, token)
 
-    celery_worker.delay(emails, subject, html_message)
-
     return {
         "message": "Account has been created successfuly! Please check your email to verify your account.",
         "user": new_user
@@ -121,9 +119,14 @@ async def login(login_data: schemas.LoginData, session: AsyncSession = Depends(g
 
     if user is not None:
 
-        validate_password = verify_password(password, user.hashed_password)
+        validate_password = await verify_password(password, user.hashed_password)
 
         if validate_password:
+            # opt-in: move old hashes to the current BCRYPT_ROUNDS while we still have the plain password
+            if Config.PASSWORD_REHASH_ON_LOGIN and password_needs_rehash(user.hashed_password):
+                new_hash = await hash_password(password)
+                await user_service.update_user_info(user, {"hashed_password": new_hash}, session)
+
             access_token = create_access_token(
                 user_data={
                     'email': user.email_address,
@@ -175,8 +178,9 @@ async def get_new_access_token(token_details: dict = Depends(refresh_token_beare
 
 
 @auth_router.get('/me')
-async def get_current_user(user=Depends(get_current_user), _: bool = Depends(role_checker)):
-    return user
+async def get_current_user(user=Depends(get_current_user), _: bool = Depends(role_checker), session: AsyncSession = Depends(get_session)):
+    # the auth dependency only carries the cached principal; the profile itself is read fresh
+    return await user_service.get_user(user.uid, session)
 
 
 @auth_router.get('/logout', status_code=status.HTTP_200_OK)
@@ -184,7 +188,7 @@ async def logout(token_details: dict = Depends(access_token_bearer)):
 
     jti = token_details['jti']
 
-    await add_token_to_blocklist(jti)
+    await add_token_to_blocklist(jti, token_details.get('exp'))
 
     return JSONResponse(
         content="Logged out successfully!",
@@ -193,26 +197,25 @@ async def logout(token_details: dict = Depends(access_token_bearer)):
 
 
 @auth_router.post('/password-reset-request')
-async def password_reset_request(email_data: schemas.PasswordResetRequest):
+async def password_reset_request(email_data: schemas.PasswordResetRequest, session: AsyncSession = Depends(get_session)):
     
     email = email_data.email_address
 
-    token = create_url_safe_token({"email": email})
+    # repeated clicks inside the window get the same answer but no extra email
+    if await claim_password_reset_email(email, Config.PASSWORD_RESET_EMAIL_WINDOW):
+        token = create_url_safe_token({"email": email})
 
-    link = f"http://{Config.DOMAIN}/api/v1/auth/confirm-password-reset/{token}"
+        link = f"http://{Config.DOMAIN}/api/v1/auth/confirm-password-reset/{token}"
 
-    html_message =f"""
-    <h1>Reset your Password</h1>
-    <p>Please click on the <a href="{link}">link</a> to reset your password</p>
-    """
-    
-    message = create_message(
-        recipients=[email],
-        subject="Password reset",
-        body=html_message
-    )
+        enqueue_email(session, [email], "password_reset", link=link)
+
+        try:
+            await session.commit()
+        except Exception:
+            await release_password_reset_email(email)
+            raise
 
-    mail.send_message(message)
+        outbox_dispatcher.notify()
 
     return JSONResponse(
         content={"message": "Please check your email for instructions to reset your password."},
@@ -244,7 +247,7 @@ async def confirm_password_reset(passwd_data: schemas.ConfirmPasswordReset, toke
         if not user:
             raise errors.UserNotFound()
         
-        hashed_password = hash_password(new_password)
+        hashed_password = await hash_password(new_password)
         
         await user_service.update_user_info(user, {"hashed_password": hashed_password}, session)
 
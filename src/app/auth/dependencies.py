@@ -7,21 +7,31 @@ from src.app.auth.utils import verify_access_token
 from src.db.redis import token_in_blocklist
 from src.db.main import get_session
 from src.app.services import user_service
-from src.app import errors
-from src.app.models import User
+from src.app.cache import user_principal_cache
+from src.app import errors, schemas
 
 class AccessPass(HTTPBearer):
     def __init__(self, auto_error = True):
         super().__init__(auto_error=auto_error)
     
-    async def __call__(self, request: Request) -> HTTPAuthorizationCredentials | None:
-        creds = await super().__call__(request)
+    async def __call__(self, request: Request) -> dict:
+        # claims are verified once per request and shared by every bearer/dependency after that
+        token_data = getattr(request.state, "token_data", None)
 
-        token = creds.credentials
+        if token_data is None:
+            token_data = await self.authenticate(request)
+            request.state.token_data = token_data
+        
+        self.verify_token_data(token_data)
+        
+        return token_data
+    
+    async def authenticate(self, request: Request) -> dict:
+        creds = await super().__call__(request)
 
-        token_data = verify_access_token(token)
+        token_data = verify_access_token(creds.credentials)
 
-        if not self.is_token_valid(token):
+        if token_data is None:
             raise errors.InvalidToken()
     
         jti = token_data.get('jti')
@@ -37,16 +47,8 @@ class AccessPass(HTTPBearer):
             #         "resolution": "Please generate a new token or login again"
             #     }
             # )
-        
-        self.verify_token_data(token_data)
-        
-        return token_data
-    
-    def is_token_valid(self, token: str) -> bool:
-        
-        token_data = verify_access_token(token)
 
-        return True if token_data is not None else False
+        return token_data
 
     def verify_token_data(self, token_data):
         raise NotImplementedError("Please override this method in child classes")
@@ -64,10 +66,24 @@ class RefreshTokenBearer(AccessPass):
             raise errors.RefreshToken()
 
 
-async def get_current_user(token_details: dict = Depends(AccessTokenBearer()), session: AsyncSession = Depends(get_session)):
-    user_data = token_details['user']['email']
+access_token_bearer = AccessTokenBearer()
+refresh_token_bearer = RefreshTokenBearer()
+
+
+async def get_current_user(token_details: dict = Depends(access_token_bearer), session: AsyncSession = Depends(get_session)):
+    user_uid = token_details['user']['user_uid']
 
-    user = await user_service.get_user_by_email(user_data, session)
+    # the session only connects when used, so a cache hit costs no database round trip
+    user = user_principal_cache.get(user_uid)
+
+    if user is None:
+        db_user = await user_service.get_user(user_uid, session)
+
+        if db_user is None:
+            raise errors.UserNotFound()
+
+        user = schemas.UserPrincipal.model_validate(db_user, from_attributes=True)
+        user_principal_cache.set(user_uid, user)
     
     if not user.is_verified:
         raise errors.AccountNotVerified(user)
@@ -78,13 +94,10 @@ class RoleChecker:
     def __init__(self, allowed_roles: List[str]) -> None:
         self.allowed_roles = [role for role in allowed_roles]
 
-    def __call__(self, current_user: User = Depends(get_current_user)) -> Any:
+    def __call__(self, current_user: schemas.UserPrincipal = Depends(get_current_user)) -> Any:
         
         user_role = current_user.role
         if user_role in self.allowed_roles:
             return True
         
         raise errors.RoleCheckAccess()
-
-access_token_bearer = AccessTokenBearer()
-refresh_token_bearer = RefreshTokenBearer()
\ No newline at end of file
@@ -0,0 +1,44 @@
+"""
+Runs the bcrypt helpers from utils on a bounded thread pool (bcrypt releases
+the GIL) so hashing never blocks the event loop.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from src.config import Config
+from src.app import errors
+from src.app.auth import utils
+
+
+class PasswordHasher:
+    def __init__(self, max_workers: int, queue_limit: int) -> None:
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-hasher")
+        self.queue_limit = queue_limit
+        self.pending = 0
+
+    async def run(self, func, *args):
+        if self.pending >= self.queue_limit:
+            raise errors.ServiceBusy()
+
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, func, *args)
+        finally:
+            self.pending -= 1
+
+
+password_hasher = PasswordHasher(
+    max_workers=Config.PASSWORD_HASH_WORKERS,
+    queue_limit=Config.PASSWORD_HASH_QUEUE_LIMIT
+)
+
+
+async def hash_password(password: str) -> str:
+    return await password_hasher.run(utils.hash_password, password)
+
+async def verify_password(password: str, hashed_password: str) -> bool:
+    return await password_hasher.run(utils.verify_password, password, hashed_password)
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True when the hash was made with a cost factor other than BCRYPT_ROUNDS. Cheap, no hashing involved."""
+    return utils.passwd_context.needs_update(hashed_password)
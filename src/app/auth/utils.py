@@ -7,7 +7,8 @@ from src.config import Config
 from itsdangerous import URLSafeTimedSerializer
 
 passwd_context = CryptContext(
-    schemes=['bcrypt']
+    schemes=['bcrypt'],
+    bcrypt__rounds=Config.BCRYPT_ROUNDS
 )
 
 
@@ -44,7 +45,8 @@ def verify_access_token(token: str) -> dict:
         )
 
         if 'jti' not in token_data:
-            raise KeyError("Token does not contain 'jti' field.")
+            logging.warning("Token does not contain 'jti' field.")
+            return None
         
         return token_data
     except jwt.ExpiredSignatureError as e:
@@ -52,8 +54,8 @@ def verify_access_token(token: str) -> dict:
         logging.warning("Token has expired.")
         return {"error": str(e)}
 
-    except jwt.PyJWKError as e:
-        logging.exception(e)
+    except jwt.InvalidTokenError as e:
+        logging.warning(f"Invalid token: {e}")
         return None
 
 
@@ -0,0 +1,297 @@
+import time
+import uuid
+import json
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Iterable, Optional
+from fastapi import Response
+from redis.exceptions import RedisError
+from src.config import Config
+from src.db.redis import publish, subscribe, on_connect, response_cache_client
+from src.db import change_feed
+from src.app.cdn import purge_surrogate_keys
+
+USER_INVALIDATION_CHANNEL = "cache:invalidate:users"
+
+# deletes the fill lock only if it is still ours; a slow loader's lock may have expired and been retaken
+RELEASE_FILL_LOCK = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class TTLCache:
+    """A bounded in-process LRU cache whose entries also expire after `ttl` seconds."""
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries: OrderedDict[Hashable, tuple[Any, float]] = OrderedDict()
+
+    def get(self, key: Hashable) -> Any:
+        entry = self.entries.get(key)
+
+        if entry is None:
+            return None
+
+        value, expires_at = entry
+
+        if expires_at <= time.monotonic():
+            del self.entries[key]
+            return None
+
+        self.entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self.entries[key] = (value, time.monotonic() + self.ttl)
+        self.entries.move_to_end(key)
+
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        self.entries.pop(key, None)
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+# slim principals (uid, email, role, is_verified) for get_current_user, keyed by str(user uid)
+user_principal_cache = TTLCache(maxsize=Config.USER_CACHE_SIZE, ttl=Config.USER_CACHE_TTL)
+
+
+async def invalidate_user(user_uid) -> None:
+    """Drops a user from this worker's cache and tells the other workers to do the same."""
+    user_principal_cache.delete(str(user_uid))
+
+    try:
+        await publish(USER_INVALIDATION_CHANNEL, str(user_uid))
+    except RedisError as e:
+        # the local copy is gone already; other workers fall back to the TTL
+        logging.warning(f"Could not publish user invalidation: {e}")
+
+
+subscribe(USER_INVALIDATION_CHANNEL, user_principal_cache.delete)
+# invalidations published while this worker was disconnected were missed
+on_connect(user_principal_cache.clear)
+
+# writes that bypass the services (other nodes' jobs, admin SQL, ...) arrive through the Postgres feed
+change_feed.on_change("users", lambda uid, op: user_principal_cache.delete(uid))
+change_feed.on_connect(user_principal_cache.clear)
+
+
+class ResponseCache:
+    """
+    Serialized responses stored in Redis under a key derived from the request
+    parameters. Every entry is added to one Redis set per tag, so `purge` can
+    drop all entries that show a given job or employer without knowing their keys.
+    Redis errors are logged and treated as a miss; the TTL bounds staleness.
+
+    Concurrent misses on a key in one process share a single load; the Redis
+    fill lock optionally extends that across workers.
+    """
+
+    def __init__(self, client, prefix: str, ttl: int, enabled: bool = True, fill_lock_ttl: float = 0) -> None:
+        self.client = client
+        self.prefix = prefix
+        self.ttl = ttl
+        self.enabled = enabled
+        # > 0: on a miss only one worker loads a key, the others wait up to this long for its result
+        self.fill_lock_ttl = fill_lock_ttl
+        # key -> the load in flight in this process, resolving to (body, headers)
+        self.flights: dict[str, asyncio.Future] = {}
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "errors": 0, "lock_waits": 0, "coalesced": 0}
+
+    def key(self, name: str, **params) -> str:
+        # None and unset are the same request; enums and uuids are keyed by their value
+        normalized = {k: getattr(v, "value", v) for k, v in params.items() if v is not None}
+        digest = hashlib.sha1(json.dumps(normalized, sort_keys=True, default=str).encode()).hexdigest()
+
+        return f"{self.prefix}:{name}:{digest}"
+
+    def tag_key(self, tag: str) -> str:
+        return f"{self.prefix}:tag:{tag}"
+
+    def lock_key(self, key: str) -> str:
+        return f"{key}:filling"
+
+    @staticmethod
+    def response(entry: dict) -> Response:
+        return Response(content=entry[b"body"], media_type="application/json", headers=json.loads(entry[b"headers"]))
+
+    async def get(self, key: str) -> Optional[Response]:
+        if not self.enabled:
+            return None
+
+        try:
+            entry = await self.client.hgetall(key)
+        except RedisError as e:
+            self.stats["errors"] += 1
+            logging.warning(f"Response cache read failed: {e}")
+            return None
+
+        if not entry:
+            self.stats["misses"] += 1
+            return None
+
+        self.stats["hits"] += 1
+
+        return self.response(entry)
+
+    async def set(self, key: str, body: bytes, headers: dict, tags: Iterable[str]) -> None:
+        if not self.enabled:
+            return
+
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                pipe.hset(key, mapping={"body": body, "headers": json.dumps(headers)})
+                pipe.expire(key, self.ttl)
+
+                for tag in set(tags):
+                    pipe.sadd(self.tag_key(tag), key)
+                    # a tag set has to outlive every entry it points at
+                    pipe.expire(self.tag_key(tag), self.ttl)
+
+                await pipe.execute()
+
+            self.stats["stores"] += 1
+        except RedisError as e:
+            self.stats["errors"] += 1
+            logging.warning(f"Response cache write failed: {e}")
+
+    async def get_or_load(self, key: str, load: Callable[[], Awaitable[tuple[bytes, dict, Iterable[str]]]]) -> Response:
+        """
+        Returns the cached response for `key`, or runs `load` (returning body, headers and tags),
+        caches and returns its result. Concurrent misses in this process wait for the same load;
+        with a fill lock, workers that lose the race for a key wait for the winner's entry too.
+        """
+        cached = await self.get(key)
+        if cached is not None:
+            return cached
+
+        return await self.fill(key, load)
+
+    async def fill(self, key: str, load: Callable[[], Awaitable[tuple[bytes, dict, Iterable[str]]]]) -> Response:
+        """The miss half of get_or_load, for callers that already looked the key up."""
+        flight = self.flights.get(key)
+
+        if flight is None:
+            flight = asyncio.ensure_future(self.load_entry(key, load))
+            self.flights[key] = flight
+            flight.add_done_callback(lambda done: self.flights.pop(key) if self.flights.get(key) is done else None)
+        else:
+            self.stats["coalesced"] += 1
+
+        # followers share the serialized body, never the loader's session or ORM objects;
+        # a cancelled request must not cancel the load the others are waiting on
+        body, headers = await asyncio.shield(flight)
+
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    async def load_entry(self, key: str, load: Callable[[], Awaitable[tuple[bytes, dict, Iterable[str]]]]) -> tuple[bytes, dict]:
+        """Runs `load` and stores its result; with a fill lock, only one worker at a time does."""
+        token = None
+        if self.enabled and self.fill_lock_ttl > 0:
+            token = await self.acquire_fill_lock(key)
+
+            if token is None:
+                cached = await self.wait_for_fill(key)
+                if cached is not None:
+                    return cached
+
+        try:
+            body, headers, tags = await load()
+            await self.set(key, body, headers, tags)
+        finally:
+            if token is not None:
+                await self.release_fill_lock(key, token)
+
+        return body, headers
+
+    async def acquire_fill_lock(self, key: str) -> Optional[str]:
+        """The token to release the lock with, or None if another loader holds it."""
+        token = uuid.uuid4().hex
+
+        try:
+            locked = await self.client.set(self.lock_key(key), token, nx=True, px=int(self.fill_lock_ttl * 1000))
+        except RedisError as e:
+            self.stats["errors"] += 1
+            logging.warning(f"Response cache lock failed: {e}")
+            # without Redis there is nobody to wait for
+            return None
+
+        return token if locked else None
+
+    async def release_fill_lock(self, key: str, token: str) -> None:
+        try:
+            await self.client.eval(RELEASE_FILL_LOCK, 1, self.lock_key(key), token)
+        except RedisError as e:
+            logging.warning(f"Response cache unlock failed: {e}")
+
+    async def wait_for_fill(self, key: str, interval: float = 0.05) -> Optional[tuple[bytes, dict]]:
+        # the lock expires on its own, so a crashed loader delays us by at most fill_lock_ttl
+        self.stats["lock_waits"] += 1
+        deadline = time.monotonic() + self.fill_lock_ttl
+
+        try:
+            while time.monotonic() < deadline:
+                await asyncio.sleep(interval)
+
+                entry = await self.client.hgetall(key)
+                if entry:
+                    self.stats["hits"] += 1
+                    return entry[b"body"], json.loads(entry[b"headers"])
+
+                if not await self.client.exists(self.lock_key(key)):
+                    return None
+        except RedisError as e:
+            self.stats["errors"] += 1
+            logging.warning(f"Response cache wait failed: {e}")
+
+        return None
+
+    async def purge(self, *tags: str) -> None:
+        if not self.enabled:
+            return
+
+        tag_keys = [self.tag_key(tag) for tag in tags]
+
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                for tag_key in tag_keys:
+                    pipe.smembers(tag_key)
+                members = await pipe.execute()
+
+            keys = set().union(*members)
+
+            if keys:
+                self.stats["evictions"] += await self.client.delete(*keys)
+
+            await self.client.delete(*tag_keys)
+        except RedisError as e:
+            self.stats["errors"] += 1
+            logging.warning(f"Response cache purge failed: {e}")
+
+
+# GET /jobs and GET /jobs/{job_uid}
+job_cache = ResponseCache(
+    response_cache_client,
+    prefix="jobs",
+    ttl=Config.JOB_CACHE_TTL,
+    enabled=Config.RESPONSE_CACHE_ENABLED,
+    fill_lock_ttl=Config.CACHE_FILL_LOCK_TTL,
+)
+
+
+async def purge_job_tags(*tags: str) -> None:
+    """Drops everything tagged with `tags` from the job response cache and the CDN."""
+    await job_cache.purge(*tags)
+    await purge_surrogate_keys(*tags)
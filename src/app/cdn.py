@@ -0,0 +1,60 @@
+"""
+Edge cache purging. Public responses carry a `Surrogate-Key` header listing
+the same tags the Redis response cache uses (see src/app/cache.py), so a
+write that purges tags locally can purge the CDN copies with the same call.
+The purger is chosen with CDN_PURGER; real CDN integrations implement Purger.
+"""
+import json
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Iterable
+from src.config import Config
+
+
+class Purger:
+    """Invalidates edge-cached responses by surrogate key."""
+
+    async def purge(self, keys: Iterable[str]) -> None:
+        raise NotImplementedError("Please override this method in child classes")
+
+
+class NoopPurger(Purger):
+    """For deployments without a CDN in front of the API."""
+
+    async def purge(self, keys: Iterable[str]) -> None:
+        pass
+
+
+class FileLoggingPurger(Purger):
+    """Appends every purge as a JSON line to a file; for development and tests."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    async def purge(self, keys: Iterable[str]) -> None:
+        line = json.dumps({"at": datetime.now(timezone.utc).isoformat(), "keys": sorted(set(keys))})
+
+        await asyncio.to_thread(self.write, line)
+
+    def write(self, line: str) -> None:
+        with open(self.path, "a") as log:
+            log.write(line + "\n")
+
+
+def create_purger() -> Purger:
+    if Config.CDN_PURGER == "file":
+        return FileLoggingPurger(Config.CDN_PURGE_LOG)
+
+    return NoopPurger()
+
+
+cdn_purger = create_purger()
+
+
+async def purge_surrogate_keys(*keys: str) -> None:
+    try:
+        await cdn_purger.purge(keys)
+    except Exception as e:
+        # edge copies expire after s-maxage anyway; a failed purge must not fail the write
+        logging.warning(f"CDN purge failed: {e}")
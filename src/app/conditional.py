@@ -0,0 +1,47 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Optional
+from fastapi import Request, Response, status
+
+
+def validators(uid, *version) -> dict:
+    """
+    ETag and Last-Modified headers for a representation identified by `uid` whose
+    content is fully determined by `version` (timestamps, child counts, ...).
+    """
+    etag = hashlib.sha1(":".join(str(part) for part in (uid, *version)).encode()).hexdigest()
+    headers = {"ETag": f'"{etag}"'}
+
+    timestamps = [part.astimezone(timezone.utc) for part in version if isinstance(part, datetime)]
+    if timestamps:
+        headers["Last-Modified"] = format_datetime(max(timestamps), usegmt=True)
+
+    return headers
+
+
+def etag_matches(request: Request, etag: Optional[str]) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+
+    if if_none_match is None or etag is None:
+        return False
+
+    if if_none_match.strip() == "*":
+        return True
+
+    # If-None-Match uses the weak comparison, so W/"x" matches "x"
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+
+    return etag.removeprefix("W/") in candidates
+
+
+def not_modified(headers: dict) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+
+def conditional(request: Request, response: Response) -> Response:
+    """Turns a full response into a 304 when the client already holds its ETag."""
+    if etag_matches(request, response.headers.get("etag")):
+        return not_modified({k: v for k, v in response.headers.items() if k in ("etag", "last-modified")})
+
+    return response
@@ -0,0 +1,69 @@
+import json
+from sqlalchemy import select, func, text, literal_column, bindparam
+from sqlalchemy.dialects import postgresql
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.config import Config
+
+
+async def count_rows(session: AsyncSession, model, *filters) -> tuple[int, bool]:
+    """
+        Number of `model` rows matching `filters`, as (count, exact).
+
+        In "auto" mode the rows are counted exactly as long as there are at most
+        TOTAL_COUNT_EXACT_LIMIT of them; a bigger set is estimated by the planner.
+    """
+    if Config.TOTAL_COUNT_MODE == "estimate":
+        return await estimate_rows(session, model, *filters), False
+
+    limit = None if Config.TOTAL_COUNT_MODE == "exact" else Config.TOTAL_COUNT_EXACT_LIMIT
+    count = await probe_rows(session, model, *filters, limit=limit)
+
+    if limit is None or count <= limit:
+        return count, True
+
+    # the probe stopped early, so there are at least that many rows whatever stale statistics say
+    return max(count, await estimate_rows(session, model, *filters)), False
+
+
+async def probe_rows(session: AsyncSession, model, *filters, limit: int | None = None) -> int:
+    """Counts matching rows, reading at most `limit` + 1 of them."""
+    rows = select(literal_column("1")).select_from(model).where(*filters)
+
+    if limit is not None:
+        rows = rows.limit(limit + 1)
+
+    result = await session.exec(select(func.count()).select_from(rows.subquery()))
+
+    return result.one()[0]
+
+
+async def estimate_rows(session: AsyncSession, model, *filters) -> int:
+    """The planner's row estimate; the table statistics alone when nothing is filtered."""
+    if not filters:
+        # -1 until the table has been vacuumed or analyzed for the first time
+        statement = text("SELECT reltuples FROM pg_class WHERE oid = to_regclass(:table)").bindparams(table=model.__tablename__)
+        result = await session.exec(statement)
+        reltuples = result.scalar()
+
+        if reltuples is not None and reltuples >= 0:
+            return int(reltuples)
+
+    rows = select(literal_column("1")).select_from(model).where(*filters)
+    # the filter values stay bound parameters, with their column types, and never become SQL text
+    compiled = rows.compile(dialect=postgresql.dialect(paramstyle="named"))
+    params = [bindparam(name, value, type_=compiled.binds[name].type) for name, value in compiled.params.items()]
+
+    result = await session.exec(text(f"EXPLAIN (FORMAT JSON) {compiled}").bindparams(*params))
+    plan = result.scalar()
+
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def total_count_headers(count: int, exact: bool) -> dict:
+    return {
+        "X-Total-Count": str(count),
+        "X-Total-Count-Type": "exact" if exact else "estimated",
+    }
@@ -0,0 +1,61 @@
+"""
+Email bodies are Jinja templates in app/templates. Request handlers only queue a template
+name and its context; the mail worker renders them, compiling each template once per process.
+"""
+from functools import lru_cache
+from pathlib import Path
+from jinja2 import Environment, FileSystemLoader, StrictUndefined, Template, select_autoescape
+from markupsafe import Markup
+
+TEMPLATE_DIR = Path(__file__).resolve().parent / "templates"
+
+EMAIL_TEMPLATES = ("verify_email", "password_reset", "application_received", "job_alert")
+
+
+@lru_cache(maxsize=None)
+def template_environment() -> Environment:
+    return Environment(
+        loader=FileSystemLoader(TEMPLATE_DIR),
+        autoescape=select_autoescape(["html"]),
+        # a missing variable is a bug in the caller, not an empty string in someone's inbox
+        undefined=StrictUndefined,
+        # the templates ship with the code, so never stat them again once compiled
+        auto_reload=False,
+        trim_blocks=True,
+        lstrip_blocks=True,
+    )
+
+
+@lru_cache(maxsize=None)
+def get_template(name: str) -> Template:
+    return template_environment().get_template(f"{name}.html")
+
+
+def load_templates() -> None:
+    """Compiles every email template up front, so no message pays for it."""
+    for name in EMAIL_TEMPLATES:
+        get_template(name)
+
+
+def email_message(recipients: list[str], template: str, **context) -> dict:
+    """A queueable email; `context` has to be JSON serializable."""
+    return {"recipients": recipients, "template": template, "context": context}
+
+
+def render_email(template: str, context: dict) -> tuple[str, str]:
+    """The subject and HTML body of a template rendered with `context`."""
+    compiled = get_template(template)
+    subject = "".join(compiled.blocks["subject"](compiled.new_context(context)))
+
+    # the subject is a header, not HTML, and must stay on one line
+    subject = " ".join(Markup(subject).unescape().split())
+
+    return subject, compiled.render(context)
+
+
+def render_message(message: dict) -> tuple[str, str]:
+    """Messages queued before templates existed carry their subject and body ready-made."""
+    if "template" in message:
+        return render_email(message["template"], message["context"])
+
+    return message["subject"], message["body"]
@@ -5,7 +5,8 @@ from fastapi.responses import JSONResponse
 from src.app.auth.utils import create_url_safe_token
 from src.db.redis import get_email_verification_token, save_email_verification_token
 from src.config import Config
-from src.celery_tasks import send_email as celery_worker
+from src.celery_tasks import send_email_batch
+from src.app.email_templates import email_message
 
 class ExceptionSystemManager(Exception):
     """Default home for all API errors"""
@@ -69,6 +70,18 @@ class RoleError(ExceptionSystemManager):
     """Invalid role, please input the correct role"""
     pass
 
+class InvalidCursor(ExceptionSystemManager):
+    """Invalid pagination cursor"""
+    pass
+
+class ServiceBusy(ExceptionSystemManager):
+    """Too many requests are waiting on a limited resource"""
+    pass
+
+class PublicListingDisabled(ExceptionSystemManager):
+    """Anonymous job listing is turned off"""
+    pass
+
 def create_exception_handler(status_code: int, initial_detail: Any) -> Callable[[Request, Exception], JSONResponse]:
 
     async def exception_handler(request: Request, exception: ExceptionSystemManager):
@@ -235,6 +248,44 @@ def register_all_errors(app: FastAPI):
         )
     )
 
+    # InvalidCursor
+    app.add_exception_handler(
+        InvalidCursor,
+        create_exception_handler(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            initial_detail={
+                "message": "Invalid pagination cursor",
+                "resolution": "Use the cursor returned in the X-Next-Cursor header of the previous page",
+                "error_code": "invalid_cursor"
+            }
+        )
+    )
+
+    # ServiceBusy
+    app.add_exception_handler(
+        ServiceBusy,
+        create_exception_handler(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            initial_detail={
+                "message": "The server is busy, please try again shortly",
+                "error_code": "service_busy"
+            }
+        )
+    )
+
+    # PublicListingDisabled
+    app.add_exception_handler(
+        PublicListingDisabled,
+        create_exception_handler(
+            status_code=status.HTTP_404_NOT_FOUND,
+            initial_detail={
+                "message": "Public job listing is not enabled",
+                "resolution": "Sign in and use /jobs instead",
+                "error_code": "public_listing_disabled"
+            }
+        )
+    )
+
     # app.add_exception_handler(
     #     AccountNotVerified,
     #     create_exception_handler(
@@ -279,17 +330,12 @@ def register_all_errors(app: FastAPI):
             new_token = create_url_safe_token({"email": user_email})
             verification_link = f"http://{Config.DOMAIN}/api/v1/auth/verify_email/{new_token}"
 
-            html_message = f"""
-            <h1>Verify your Email Address</h1>
-            <p>Please click on the <a href="{verification_link}">link</a> to verify your account</p>
-            """
-            subject = "Verify your email"
 
             # Save the new token
             await save_email_verification_token(user_email, new_token)
 
             # Send email asynchronously
-            celery_worker.delay([user_email], subject, html_message)
+            send_email_batch.delay([email_message([user_email], "verify_email", link=verification_link)])
 
             # Respond
             return JSONResponse(
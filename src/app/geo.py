@@ -0,0 +1,144 @@
+import csv
+import math
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+
+GAZETTEER_PATH = Path(__file__).parent / "data" / "gazetteer.csv"
+EARTH_RADIUS_KM = 6371.0
+
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+# ~150m cells; stored on every job so any coarser prefix can be matched with LIKE
+GEOHASH_PRECISION = 7
+
+
+PLACE_SEPARATORS = re.compile(r"[,;/|()]|\s-\s")
+
+
+class Coordinates(NamedTuple):
+    latitude: float
+    longitude: float
+
+
+def normalize_place(name: str) -> str:
+    return " ".join(re.sub(r"[^\w\s]", " ", name.lower()).split())
+
+
+@lru_cache
+def load_gazetteer(path: Path = GAZETTEER_PATH) -> dict[str, Coordinates]:
+    """Place name (and alias), normalized -> coordinates; the first entry wins on clashes."""
+    places = {}
+
+    with open(path, newline="", encoding="utf-8") as file:
+        for row in csv.DictReader(file):
+            coordinates = Coordinates(float(row["latitude"]), float(row["longitude"]))
+
+            for name in [row["name"], *filter(None, row["aliases"].split("|"))]:
+                places.setdefault(normalize_place(name), coordinates)
+
+    return places
+
+
+def resolve_location(location: str) -> Optional[Coordinates]:
+    """
+        Coordinates of a free-form job location, e.g. "Ikeja, Lagos, Nigeria", from the bundled gazetteer.
+
+        The whole string is tried first, then each part of it (split on commas, slashes, brackets
+        and dashes) from the most specific one. Locations it doesn't know (or "Remote") resolve to None.
+    """
+    if not location:
+        return None
+
+    places = load_gazetteer()
+
+    for candidate in [location, *PLACE_SEPARATORS.split(location)]:
+        coordinates = places.get(normalize_place(candidate))
+
+        if coordinates is not None:
+            return coordinates
+
+    return None
+
+
+def location_columns(location: str) -> dict:
+    """The coordinate columns of a job at `location`, all None if it can't be placed."""
+    coordinates = resolve_location(location)
+
+    if coordinates is None:
+        return {"latitude": None, "longitude": None, "geohash": None}
+
+    return {**coordinates._asdict(), "geohash": geohash_encode(*coordinates)}
+
+
+def geohash_encode(latitude: float, longitude: float, precision: int = GEOHASH_PRECISION) -> str:
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars = []
+    bits = 0
+    value = 0
+    even = True
+
+    while len(chars) < precision:
+        # bits alternate between longitude and latitude, longitude first
+        interval, coordinate = (lon_range, longitude) if even else (lat_range, latitude)
+        middle = (interval[0] + interval[1]) / 2
+
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+
+        even = not even
+        bits += 1
+
+        if bits == 5:
+            chars.append(GEOHASH_ALPHABET[value])
+            bits = 0
+            value = 0
+
+    return "".join(chars)
+
+
+def geohash_cell_size(precision: int) -> tuple[float, float]:
+    """(height, width) in degrees of the cells of a geohash precision."""
+    lon_bits = math.ceil(precision * 5 / 2)
+    lat_bits = precision * 5 // 2
+
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lon_bits
+
+
+def covering_geohashes(latitude: float, longitude: float, radius_km: float) -> list[str]:
+    """
+        Geohash prefixes whose cells together cover the circle; empty if it needs the whole globe.
+
+        Picks the finest precision whose cells are at least as big as the circle's bounding box,
+        so the box touches at most 2x2 cells, which are the ones under its corners.
+    """
+    lat_delta = math.degrees(radius_km / EARTH_RADIUS_KM)
+    # longitude degrees shrink towards the poles; near them the box spans every longitude
+    cos_lat = math.cos(math.radians(min(abs(latitude) + lat_delta, 90.0)))
+    lon_delta = math.degrees(radius_km / (EARTH_RADIUS_KM * cos_lat)) if cos_lat > 1e-9 else 180.0
+
+    precision = 0
+    while precision < GEOHASH_PRECISION:
+        height, width = geohash_cell_size(precision + 1)
+
+        if height < 2 * lat_delta or width < 2 * lon_delta:
+            break
+
+        precision += 1
+
+    if precision == 0:
+        return []
+
+    corners = [
+        (max(-90.0, min(90.0, latitude + lat_sign * lat_delta)), (longitude + lon_sign * lon_delta + 180.0) % 360.0 - 180.0)
+        for lat_sign in (-1, 1)
+        for lon_sign in (-1, 1)
+    ]
+
+    return sorted({geohash_encode(lat, lon, precision) for lat, lon in corners})
+
@@ -29,7 +29,8 @@ def register_all_middlewares(app: FastAPI):
         allow_origins=["*"],
         allow_methods=["*"],
         allow_headers=["*"],
-        allow_credentials=True
+        allow_credentials=True,
+        expose_headers=["X-Next-Cursor", "ETag", "X-Total-Count", "X-Total-Count-Type"]
         )
     
     app.add_middleware(
@@ -1,9 +1,9 @@
 from sqlmodel import SQLModel, Column, Field, ForeignKey, Relationship, Text
 import sqlalchemy.dialects.postgresql as pg
-from sqlalchemy import Enum as pgEnum, UniqueConstraint
+from sqlalchemy import Enum as pgEnum, UniqueConstraint, Index, Computed, func
 from datetime import datetime
 from typing import List, Optional
-from src.app.schemas import UserRoles, JobType, WorkMode
+from src.app.schemas import UserRoles, JobType, WorkMode, SalaryPeriod
 import uuid
 
 
@@ -21,10 +21,13 @@ class User(SQLModel, table=True):
     is_verified: bool = Field(default=False, nullable=True)
     role: UserRoles = Field(sa_column=Column(pgEnum(UserRoles, name="user_role", create_type=True), nullable=False, server_default=UserRoles.USER.value))
     created_at: datetime = Field(sa_column=Column(pg.TIMESTAMP, default=datetime.now))
-    updated_at: datetime = Field(sa_column=Column(pg.TIMESTAMP, default=datetime.now))
+    updated_at: datetime = Field(sa_column=Column(pg.TIMESTAMP, default=datetime.now, onupdate=datetime.now))
 
-    job: List["Job"] = Relationship(back_populates="employer", sa_relationship_kwargs={"lazy": "selectin"})
-    application: List["Application"] = Relationship(back_populates="user", sa_relationship_kwargs={"lazy": "selectin"})
+    # collections are loaded per query with loader options (see UserService.get_user_details)
+    job: List["Job"] = Relationship(back_populates="employer", sa_relationship_kwargs={"lazy": "raise"})
+    application: List["Application"] = Relationship(back_populates="user", sa_relationship_kwargs={"lazy": "raise"})
+
+    __table_args__ = (Index("ix_users_email_address", "email_address"),)
 
     def __repr__(self):
         return f"<User id={self.uid}, username={self.username}, email={self.email_address}>"
@@ -39,12 +42,51 @@ class Job(SQLModel, table=True):
     job_type: JobType = Field(sa_column=Column(pgEnum(JobType, name="job_type", create_type=True), nullable=False, server_default=JobType.FULL_TIME.value))
     work_mode: WorkMode = Field(sa_column=Column(pgEnum(WorkMode, name="work_mode", create_type=True), nullable=False, server_default=WorkMode.ON_SITE.value))
     salary: str
+    # normalized from `salary` by src.app.salary.parse_salary on every write
+    salary_min: Optional[float] = Field(default=None, sa_column=Column(pg.NUMERIC(12, 2, asdecimal=False), nullable=True))
+    salary_max: Optional[float] = Field(default=None, sa_column=Column(pg.NUMERIC(12, 2, asdecimal=False), nullable=True))
+    currency: Optional[str] = Field(default=None, sa_column=Column(pg.CHAR(3), nullable=True))
+    period: Optional[SalaryPeriod] = Field(default=None, sa_column=Column(pgEnum(SalaryPeriod, name="salary_period", create_type=True), nullable=True))
+    # resolved from `location` by src.app.geo.location_columns on every write
+    latitude: Optional[float] = Field(default=None, nullable=True)
+    longitude: Optional[float] = Field(default=None, nullable=True)
+    geohash: Optional[str] = Field(default=None, max_length=12, nullable=True)
     is_active: bool = Field(default=False)
     employer_uid: uuid.UUID = Field(sa_column=Column(pg.UUID(as_uuid=True), ForeignKey("users.uid"), nullable=False))
     created_at: datetime = Field(default_factory=datetime.now, sa_column=Column(pg.TIMESTAMP(timezone=True), nullable=False))
+    updated_at: datetime = Field(default_factory=datetime.now, sa_column=Column(pg.TIMESTAMP(timezone=True), nullable=False, onupdate=datetime.now, server_default=func.now()))
 
     employer: Optional["User"] = Relationship(back_populates="job")
-    application: List["Application"] = Relationship(back_populates="job", sa_relationship_kwargs={"lazy": "selectin"})
+    application: List["Application"] = Relationship(back_populates="job", sa_relationship_kwargs={"lazy": "raise"})
+
+    __table_args__ = (
+        Index("ix_jobs_created_at_uid", "created_at", "uid"),
+        Index("ix_jobs_employer_uid_created_at", "employer_uid", "created_at"),
+        Index("ix_jobs_job_type_work_mode_created_at", "job_type", "work_mode", "created_at", "uid"),
+        Index("ix_jobs_work_mode_created_at", "work_mode", "created_at", "uid"),
+        # one per bound of a salary range filter; Postgres combines them with a BitmapAnd
+        Index("ix_jobs_salary_min", "salary_min"),
+        Index("ix_jobs_salary_max", "salary_max"),
+        # radius searches match geohash prefixes with LIKE, which needs pattern ops outside the C locale
+        Index("ix_jobs_geohash", "geohash", postgresql_ops={"geohash": "text_pattern_ops"}),
+    )
+
+
+# Full-text search document of a job, kept up to date by Postgres. It is added to the table
+# but deliberately not mapped, so the ORM never loads, inserts or returns it; queries use
+# `job_search_vector` directly (see JobService.search_jobs).
+job_search_vector = Column(
+    "search_vector",
+    pg.TSVECTOR,
+    Computed(
+        "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(location, '')), 'B') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'C')",
+        persisted=True,
+    ),
+)
+Job.__table__.append_column(job_search_vector)
+Index("ix_jobs_search_vector", job_search_vector, postgresql_using="gin")
 
 
 class Application(SQLModel, table=True):
@@ -55,8 +97,29 @@ class Application(SQLModel, table=True):
     user_uid: uuid.UUID = Field(sa_column=Column(pg.UUID(as_uuid=True), ForeignKey("users.uid"), nullable=False))
     cover_letter: str = Field(sa_column=Column(Text, nullable=False))
     created_at: datetime = Field(default_factory=datetime.now, sa_column=Column(pg.TIMESTAMP(timezone=True), nullable=False))
+    updated_at: datetime = Field(default_factory=datetime.now, sa_column=Column(pg.TIMESTAMP(timezone=True), nullable=False, onupdate=datetime.now, server_default=func.now()))
 
     job: Optional["Job"] = Relationship(back_populates="application")
     user: Optional["User"] = Relationship(back_populates="application")
 
-    __table_args__ = (UniqueConstraint("job_uid", "user_uid", name="uq_job_seeker"),)
+    __table_args__ = (
+        UniqueConstraint("job_uid", "user_uid", name="uq_job_seeker"),
+        Index("ix_applications_created_at", "created_at"),
+        Index("ix_applications_job_uid_created_at", "job_uid", "created_at"),
+        Index("ix_applications_user_uid_created_at", "user_uid", "created_at"),
+    )
+
+
+class OutboxMessage(SQLModel, table=True):
+    """An email committed together with the change that caused it; sent by src.app.outbox"""
+    __tablename__ = "outbox"
+
+    uid: uuid.UUID = Field(default_factory=uuid.uuid4, sa_column=Column(pg.UUID(as_uuid=True), nullable=False, primary_key=True))
+    # {recipients, subject, body}, as taken by the send_email_batch task
+    payload: dict = Field(sa_column=Column(pg.JSONB, nullable=False))
+    attempts: int = Field(default=0, sa_column=Column(pg.INTEGER, nullable=False, server_default="0"))
+    created_at: datetime = Field(sa_column=Column(pg.TIMESTAMP(timezone=True), nullable=False, server_default=func.now()))
+    # pushed back after a failed direct delivery
+    available_at: datetime = Field(sa_column=Column(pg.TIMESTAMP(timezone=True), nullable=False, server_default=func.now()))
+
+    __table_args__ = (Index("ix_outbox_available_at", "available_at"),)
@@ -0,0 +1,138 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Literal
+from sqlalchemy import delete, func
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from src.app.models import OutboxMessage
+from src.app.email_templates import email_message
+from src.app.smtp_pool import SMTPPool, send_batch
+from src.celery_tasks import send_email_batch
+from src.config import Config
+from src.db.main import async_session
+
+
+def enqueue_email(session: AsyncSession, recipients: list[str], template: str, **context) -> None:
+    """Adds an email to the session; it is only rendered and sent if the session's transaction commits."""
+    session.add(OutboxMessage(payload=email_message(recipients, template, **context)))
+
+
+class OutboxDispatcher:
+    """
+    Moves committed outbox emails to Celery (or straight to SMTP) in batches.
+
+    Every API worker runs one; FOR UPDATE SKIP LOCKED hands each row to exactly one of them,
+    and a row is only deleted by the transaction that delivered it.
+    """
+
+    def __init__(self, session_maker: async_sessionmaker, batch_size: int = 100, poll_interval: float = 1.0, delivery: Literal["celery", "smtp"] = "celery"):
+        self.session_maker = session_maker
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.delivery = delivery
+        self.wakeup = asyncio.Event()
+        self.smtp_pool: SMTPPool | None = None
+        self.stats = {"dispatched": 0, "retried": 0, "dropped": 0, "errors": 0, "last_lag_seconds": None, "max_lag_seconds": 0.0}
+
+    def notify(self) -> None:
+        """Dispatch now rather than at the next poll; called after a commit that enqueued something."""
+        self.wakeup.set()
+
+    async def dispatch_batch(self) -> int:
+        async with self.session_maker() as session:
+            claimed = (
+                select(OutboxMessage.uid)
+                .where(OutboxMessage.available_at <= func.now())
+                .order_by(OutboxMessage.available_at)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            )
+
+            result = await session.exec(
+                delete(OutboxMessage)
+                .where(OutboxMessage.uid.in_(claimed))
+                .returning(OutboxMessage.payload, OutboxMessage.attempts, OutboxMessage.created_at)
+                # there are no loaded objects to sync; "fetch" would also add the primary key to the returned rows
+                .execution_options(synchronize_session=False)
+            )
+            rows = result.all()
+
+            if not rows:
+                return 0
+
+            # if delivery raises, the rollback puts every row back
+            await self.deliver(session, rows)
+            await session.commit()
+
+        oldest = min(created_at for _, _, created_at in rows)
+        lag = (datetime.now(timezone.utc) - oldest).total_seconds()
+        self.stats["dispatched"] += len(rows)
+        self.stats["last_lag_seconds"] = lag
+        self.stats["max_lag_seconds"] = max(self.stats["max_lag_seconds"], lag)
+
+        return len(rows)
+
+    async def deliver(self, session: AsyncSession, rows: list) -> None:
+        messages = [payload for payload, _, _ in rows]
+
+        if self.delivery == "celery":
+            # one broker round trip for the whole batch; the publish blocks, so keep it off the loop
+            await asyncio.to_thread(send_email_batch.delay, messages)
+            return
+
+        if self.smtp_pool is None:
+            self.smtp_pool = SMTPPool(size=Config.SMTP_POOL_SIZE, idle_timeout=Config.SMTP_IDLE_TIMEOUT, max_messages=Config.SMTP_MAX_MESSAGES_PER_CONNECTION)
+
+        retry, failed = await send_batch(self.smtp_pool, messages)
+        # send_batch hands back the very payload objects it was given
+        attempts = {id(payload): attempt for payload, attempt, _ in rows}
+
+        for message in retry:
+            attempt = attempts[id(message)] + 1
+
+            if attempt > Config.EMAIL_BATCH_MAX_RETRIES:
+                failed.append(message)
+                continue
+
+            delay = timedelta(seconds=Config.EMAIL_RETRY_DELAY * 2 ** (attempt - 1))
+            session.add(OutboxMessage(payload=message, attempts=attempt, available_at=datetime.now(timezone.utc) + delay))
+            self.stats["retried"] += 1
+
+        if failed:
+            logging.warning(f"Dropped {len(failed)} outbox emails the mail server refused")
+            self.stats["dropped"] += len(failed)
+
+    async def drain(self) -> None:
+        while await self.dispatch_batch() == self.batch_size:
+            pass
+
+    async def run(self) -> None:
+        """Drains the outbox until cancelled: on every notify() and at least every poll_interval."""
+        while True:
+            self.wakeup.clear()
+
+            try:
+                await self.drain()
+            except Exception as e:
+                self.stats["errors"] += 1
+                logging.warning(f"Outbox dispatch failed, retrying: {e}")
+
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def backlog(self, session: AsyncSession) -> dict:
+        """Emails waiting across all workers, and how long the oldest one has been waiting."""
+        result = await session.exec(select(func.count(), func.min(OutboxMessage.created_at)))
+        pending, oldest = result.one()
+
+        return {
+            "pending": pending,
+            "oldest_pending_seconds": (datetime.now(timezone.utc) - oldest).total_seconds() if oldest is not None else None,
+        }
+
+
+outbox_dispatcher = OutboxDispatcher(async_session, Config.OUTBOX_BATCH_SIZE, Config.OUTBOX_POLL_INTERVAL, Config.OUTBOX_DELIVERY)
@@ -0,0 +1,61 @@
+import base64
+import json
+from datetime import datetime
+from uuid import UUID
+from src.app import errors
+
+
+def encode_cursor(*keys) -> str:
+    """Encodes the sort keys of the last row of a page into an opaque cursor."""
+    values = [str(key) if isinstance(key, UUID) else key.isoformat() if isinstance(key, datetime) else key for key in keys]
+
+    payload = json.dumps(values, separators=(",", ":")).encode()
+
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list:
+    """Returns the raw sort keys stored in a cursor created by encode_cursor."""
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(cursor + padding))
+    except (ValueError, TypeError):
+        raise errors.InvalidCursor()
+
+    if not isinstance(values, list):
+        raise errors.InvalidCursor()
+
+    return values
+
+
+def decode_created_at_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """Decodes a (created_at, uid) cursor used by the listing endpoints."""
+    values = decode_cursor(cursor)
+
+    try:
+        created_at, uid = values
+        return datetime.fromisoformat(created_at), UUID(uid)
+    except (ValueError, TypeError):
+        raise errors.InvalidCursor()
+
+
+def decode_search_cursor(cursor: str) -> tuple[float, datetime, UUID]:
+    """Decodes a (rank, created_at, uid) cursor used by the search endpoint."""
+    values = decode_cursor(cursor)
+
+    try:
+        rank, created_at, uid = values
+        return float(rank), datetime.fromisoformat(created_at), UUID(uid)
+    except (ValueError, TypeError):
+        raise errors.InvalidCursor()
+
+
+def decode_distance_cursor(cursor: str) -> tuple[float, UUID]:
+    """Decodes a (distance, uid) cursor used by the nearby endpoint."""
+    values = decode_cursor(cursor)
+
+    try:
+        distance, uid = values
+        return float(distance), UUID(uid)
+    except (ValueError, TypeError):
+        raise errors.InvalidCursor()
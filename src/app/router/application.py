@@ -1,4 +1,4 @@
-from fastapi import APIRouter, status, HTTPException, Depends
+from fastapi import APIRouter, status, HTTPException, Depends, Response, Query
 from fastapi.responses import JSONResponse
 from sqlmodel.ext.asyncio.session import AsyncSession
 from uuid import UUID
@@ -6,7 +6,9 @@ from typing import List
 from src.app import schemas, models, errors
 from src.app.auth.dependencies import get_current_user, RoleChecker
 from src.app.services import job_service, user_service, application_service as apps
+from src.app.counting import total_count_headers
 from src.db.main import get_session
+from src.app.outbox import enqueue_email, outbox_dispatcher
 
 
 apps_router = APIRouter(
@@ -17,8 +19,15 @@ who_can_apply = Depends(RoleChecker(["USER"]))
 
 
 @apps_router.get('/applications', status_code=status.HTTP_200_OK, response_model=List[schemas.Application])
-async def get_all_apps(session: AsyncSession = Depends(get_session), current_user: models.User = Depends(get_current_user)):
-    applications = await apps.get_applications(session)
+async def get_all_apps(response: Response, skip: int = Query(0, ge=0), limit: int = Query(10, ge=1, le=100), session: AsyncSession = Depends(get_session), current_user: models.User = Depends(get_current_user)):
+    """
+        Lists applications, newest first, a page at a time.
+
+        - `X-Total-Count` is the number of applications; `X-Total-Count-Type` says whether it is `exact` or `estimated`
+    """
+    applications = await apps.get_applications(session, skip, limit)
+
+    response.headers.update(total_count_headers(*await apps.count_applications(session)))
 
     return applications
 
@@ -46,8 +55,28 @@ async def create_application(job_id: str, payload: schemas.ApplicationCreate, se
     if job is None:
         raise errors.JobNotFound()
 
+    # the auth principal carries no name
+    applicant = await user_service.get_user(current_user.uid, session)
+
+    # deleted since the token was issued
+    if applicant is None:
+        raise errors.UserNotFound()
+
+    # committed along with the application; a repeat application rolls it back
+    enqueue_email(
+        session,
+        [current_user.email_address],
+        "application_received",
+        first_name=applicant.first_name,
+        job_title=job.title,
+        location=job.location,
+    )
+
     new_application = await apps.create_application(payload, current_user.uid, job_id, session)
 
+    if isinstance(new_application, models.Application):
+        outbox_dispatcher.notify()
+
     return new_application
 
 
@@ -73,18 +102,14 @@ async def get_application(application_id: str, session: AsyncSession = Depends(g
 @apps_router.put('/applications/{application_uid}', status_code=status.HTTP_202_ACCEPTED, response_model=schemas.Application)
 async def update_application(application_id: str, payload: schemas.ApplicationUpdate, session: AsyncSession = Depends(get_session), current_user: models.User = Depends(get_current_user)):
 
-    application_to_update = await apps.get_application_by_id(application_id, session)
-
-    if application_to_update is None:
-        raise errors.ApplicationNotFound()
+    #granting access to the endpoint is part of the update itself
+    update_application = await apps.update_application(application_id, payload, session, current_user.uid)
 
-    #granting access to the endpoint
-    if application_to_update.user_uid != current_user.uid:
-        raise errors.NotAuthorized()
+    if update_application is None:
+        if await apps.application_exists(application_id, session):
+            raise errors.NotAuthorized()
 
-    
-
-    update_application = await apps.update_application(application_id, payload, session)
+        raise errors.ApplicationNotFound()
 
     return update_application
         
@@ -95,13 +120,12 @@ async def update_application(application_id: str, payload: schemas.ApplicationUp
 @apps_router.delete('/applications/{application_uid}', status_code=status.HTTP_204_NO_CONTENT)
 async def delete_application(application_id: str, session: AsyncSession = Depends(get_session), current_user: models.User = Depends(get_current_user)):
 
-    apps_to_delete = await apps.get_application_by_id(application_id, session)
-    if not apps_to_delete:
-        raise errors.ApplicationNotFound()
+    deleted_application = await apps.delete_application(application_id, session, current_user.uid)
 
-    if apps_to_delete.user_uid != current_user.uid:
-        raise errors.NotAuthorized()
-    
-    await apps.delete_application(application_id, session)
+    if deleted_application is None:
+        if await apps.application_exists(application_id, session):
+            raise errors.NotAuthorized()
+
+        raise errors.ApplicationNotFound()
 
 
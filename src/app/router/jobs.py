@@ -1,11 +1,18 @@
-from fastapi import APIRouter, status, HTTPException, Depends
+import json
+from fastapi import APIRouter, status, HTTPException, Depends, Query, Request, Response
 from fastapi.responses import JSONResponse
 from sqlmodel.ext.asyncio.session import AsyncSession
 from uuid import UUID
 from typing import List, Optional
+from pydantic import TypeAdapter
 from src.app import schemas, models, errors
+from src.app.cache import job_cache
+from src.app.conditional import validators, etag_matches, not_modified, conditional
 from src.app.auth.dependencies import access_token_bearer, RoleChecker, get_current_user
 from src.app.services import job_service, user_service
+from src.app.pagination import encode_cursor
+from src.app.counting import total_count_headers
+from src.config import Config
 from src.db.main import get_session
 
 
@@ -15,6 +22,9 @@ job_router = APIRouter(
 
 job_listing_role = Depends(RoleChecker(["EMPLOYER", "ADMIN"]))
 
+job_list_adapter = TypeAdapter(List[schemas.Job])
+job_details_adapter = TypeAdapter(schemas.JobDetails)
+
 
 async def parse_uuid_or_404(user_id: str) -> UUID:
     try:
@@ -23,23 +33,206 @@ async def parse_uuid_or_404(user_id: str) -> UUID:
         raise errors.InvalidId()
 
 
+def salary_filter(salary_min: Optional[float] = Query(None, ge=0), salary_max: Optional[float] = Query(None, ge=0), currency: Optional[str] = Query(None, min_length=3, max_length=3), period: Optional[schemas.SalaryPeriod] = None) -> schemas.SalaryFilter:
+    return schemas.SalaryFilter(salary_min=salary_min, salary_max=salary_max, currency=currency, period=period)
+
+
+async def list_jobs(session: AsyncSession, skip: int, limit: int, job_type: Optional[schemas.JobType], work_mode: Optional[schemas.WorkMode], cursor: Optional[str], salary: schemas.SalaryFilter) -> Response:
+    """A page of jobs from the response cache, loading it on a miss; shared by the signed-in and public listings."""
+
+    async def load():
+        jobs = await job_service.get_all_jobs(session, skip, limit, job_type, work_mode, cursor, salary)
+
+        headers = {}
+        # a short page means there is nothing left to fetch
+        if limit > 0 and len(jobs) == limit:
+            last_job = jobs[-1]
+            headers["X-Next-Cursor"] = encode_cursor(last_job.created_at, last_job.uid)
+
+        headers.update(await cached_job_count(session, job_type, work_mode, salary))
+
+        page = job_list_adapter.validate_python(jobs, from_attributes=True)
+
+        tags = ["jobs:list"]
+        for job in page:
+            tags += [f"job:{job.uid}", f"employer:{job.employer_uid}"]
+
+        # edge caches purge by the same tags; the filters are there for targeted manual purges
+        surrogate_keys = dict.fromkeys(tags)
+        if job_type is not None:
+            surrogate_keys[f"job_type:{job_type.value}"] = None
+        if work_mode is not None:
+            surrogate_keys[f"work_mode:{work_mode.value}"] = None
+        headers["Surrogate-Key"] = " ".join(surrogate_keys)
+
+        return job_list_adapter.dump_json(page), headers, tags
+
+    cache_key = job_cache.key("list", skip=None if cursor else skip, limit=limit, job_type=job_type, work_mode=work_mode, cursor=cursor, **salary.model_dump())
+
+    return await job_cache.get_or_load(cache_key, load)
+
+
+async def cached_job_count(session: AsyncSession, job_type: Optional[schemas.JobType], work_mode: Optional[schemas.WorkMode], salary: schemas.SalaryFilter) -> dict:
+    # every page of a filter combination shares one count
+    async def load():
+        count, exact = await job_service.count_jobs(session, job_type, work_mode, salary)
+
+        return json.dumps([count, exact]).encode(), {}, ["jobs:list"]
+
+    response = await job_cache.get_or_load(job_cache.key("count", job_type=job_type, work_mode=work_mode, **salary.model_dump()), load)
+
+    return total_count_headers(*json.loads(response.body))
+
+
 @job_router.get('/jobs', status_code=status.HTTP_200_OK, response_model=List[schemas.Job])
-async def get_all_jobs(skip: int, limit: int, job_type: Optional[schemas.JobType] = None, work_mode: Optional[schemas.WorkMode] = None, session: AsyncSession = Depends(get_session), current_user: models.User = Depends(access_token_bearer)):
+async def get_all_jobs(skip: int = 0, limit: int = 10, job_type: Optional[schemas.JobType] = None, work_mode: Optional[schemas.WorkMode] = None, cursor: Optional[str] = None, salary: schemas.SalaryFilter = Depends(salary_filter), session: AsyncSession = Depends(get_session), current_user: models.User = Depends(access_token_bearer)):
+    """
+        Lists jobs, newest first.
 
-    jobs = await job_service.get_all_jobs(session, skip, limit, job_type, work_mode)
+        - Pass the `X-Next-Cursor` header of a page as `cursor` to fetch the next one
+        - `skip` is ignored when a cursor is given
+        - `salary_min`/`salary_max` keep jobs whose salary range overlaps the given one; combine with `currency` and `period` to compare like with like
+        - `X-Total-Count` is the number of jobs matching the filters; `X-Total-Count-Type` says whether it is `exact` or `estimated`
+    """
 
-    return jobs
+    return await list_jobs(session, skip, limit, job_type, work_mode, cursor, salary)
+
+
+@job_router.get('/public/jobs', status_code=status.HTTP_200_OK, response_model=List[schemas.Job])
+async def get_public_jobs(skip: int = 0, limit: int = 10, job_type: Optional[schemas.JobType] = None, work_mode: Optional[schemas.WorkMode] = None, cursor: Optional[str] = None, salary: schemas.SalaryFilter = Depends(salary_filter), session: AsyncSession = Depends(get_session)):
+    """
+        The job listing without sign-in, cacheable by shared caches and CDNs.
+
+        - Same parameters and pages as `/jobs`
+        - `Surrogate-Key` lists the job, employer and filter keys that purge the page
+        - Only available when `PUBLIC_JOB_LISTING` is enabled
+    """
+
+    if not Config.PUBLIC_JOB_LISTING:
+        raise errors.PublicListingDisabled()
+
+    response = await list_jobs(session, skip, limit, job_type, work_mode, cursor, salary)
+    response.headers["Cache-Control"] = f"public, max-age=0, s-maxage={Config.PUBLIC_JOBS_S_MAXAGE}"
+
+    return response
+
+
+# declared before /jobs/{job_uid}, which would otherwise claim the path
+@job_router.get('/jobs/search', status_code=status.HTTP_200_OK, response_model=schemas.JobSearchResult)
+async def search_jobs(response: Response, q: str = Query(min_length=1, max_length=200), limit: int = Query(10, ge=1, le=100), job_type: Optional[schemas.JobType] = None, work_mode: Optional[schemas.WorkMode] = None, cursor: Optional[str] = None, session: AsyncSession = Depends(get_session), token_details=Depends(access_token_bearer)):
+    """
+        Full-text search over job titles, locations and descriptions, best match first.
+
+        - `q` accepts web search syntax: `"exact phrase"`, `-excluded`, `python or go`
+        - Pass the `X-Next-Cursor` header of a page as `cursor` to fetch the next one
+    """
+
+    rows = await job_service.search_jobs(session, q, limit, job_type, work_mode, cursor)
+    facets = await cached_job_facets(session, q, job_type, work_mode)
+
+    # a short page means there is nothing left to fetch
+    if len(rows) == limit:
+        last_job, last_rank = rows[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last_rank, last_job.created_at, last_job.uid)
+
+    jobs = job_list_adapter.validate_python([job for job, _ in rows], from_attributes=True)
+
+    return schemas.JobSearchResult(jobs=jobs, facets=facets)
+
+
+@job_router.get('/jobs/facets', status_code=status.HTTP_200_OK, response_model=schemas.JobFacets)
+async def get_job_facets(q: Optional[str] = Query(None, min_length=1, max_length=200), job_type: Optional[schemas.JobType] = None, work_mode: Optional[schemas.WorkMode] = None, session: AsyncSession = Depends(get_session), token_details=Depends(access_token_bearer)):
+    """
+        Job counts per `job_type`, `work_mode`, `location` (top 20) and `is_active` for a filter combination.
+
+        - Without `q` the counts cover the plain `/jobs` listing
+    """
+
+    return await cached_job_facets(session, q, job_type, work_mode)
+
+
+@job_router.get('/jobs/nearby', status_code=status.HTTP_200_OK, response_model=List[schemas.NearbyJob])
+async def get_nearby_jobs(response: Response, lat: float = Query(ge=-90, le=90), lon: float = Query(ge=-180, le=180), radius_km: float = Query(25, gt=0, le=500), limit: int = Query(10, ge=1, le=100), job_type: Optional[schemas.JobType] = None, work_mode: Optional[schemas.WorkMode] = None, cursor: Optional[str] = None, salary: schemas.SalaryFilter = Depends(salary_filter), session: AsyncSession = Depends(get_session), token_details=Depends(access_token_bearer)):
+    """
+        Jobs within `radius_km` of `lat`/`lon`, nearest first.
+
+        - Job locations are placed with a bundled gazetteer; jobs it can't place (e.g. "Remote") are never returned
+        - Takes the same filters as `/jobs`
+        - Pass the `X-Next-Cursor` header of a page as `cursor` to fetch the next one
+    """
+
+    rows = await job_service.get_nearby_jobs(session, lat, lon, radius_km, limit, job_type, work_mode, cursor, salary)
+
+    # a short page means there is nothing left to fetch
+    if len(rows) == limit:
+        last_job, last_distance = rows[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last_distance, last_job.uid)
+
+    return [schemas.NearbyJob.model_validate({**job.model_dump(), "distance_km": round(distance, 3)}) for job, distance in rows]
+
+
+async def cached_job_facets(session: AsyncSession, q: Optional[str], job_type: Optional[schemas.JobType], work_mode: Optional[schemas.WorkMode]) -> dict:
+    # facets only change when jobs do, and every job write purges jobs:list
+    async def load():
+        facets = await job_service.get_job_facets(session, q, job_type, work_mode)
+
+        return json.dumps(facets).encode(), {}, ["jobs:list"]
+
+    # spacing doesn't change what websearch_to_tsquery matches
+    normalized_q = " ".join(q.split()) if q is not None else None
+    response = await job_cache.get_or_load(job_cache.key("facets", q=normalized_q, job_type=job_type, work_mode=work_mode), load)
+
+    return json.loads(response.body)
 
 
 @job_router.get('/jobs/{job_uid}', status_code=status.HTTP_200_OK, response_model=schemas.JobDetails)
-async def get_job(job_uid: UUID, session: AsyncSession = Depends(get_session), token_details=Depends(access_token_bearer)):
+async def get_job(job_uid: UUID, request: Request, session: AsyncSession = Depends(get_session), token_details=Depends(access_token_bearer)):
+    """
+        Returns a job with its applications.
+
+        - Send the `ETag` of a previous response as `If-None-Match` to get `304 Not Modified` if nothing changed
+    """
+
+    async def load():
+        job = await job_service.get_job_details(job_uid, session)
+
+        if job is None:
+            raise errors.JobNotFound()
+
+        details = job_details_adapter.validate_python(job, from_attributes=True)
+        headers = validators(job_uid, *job_version(details))
+        tags = [f"job:{job_uid}", f"job:{job_uid}:applications", f"employer:{details.employer_uid}"]
+
+        return job_details_adapter.dump_json(details), headers, tags
+
+    cache_key = job_cache.key("detail", job_uid=job_uid)
 
-    job = await job_service.get_job_by_id(job_uid, session)
+    response = await job_cache.get(cache_key)
 
-    if job is not None:
-        return job
+    if response is None:
+        if "if-none-match" in request.headers:
+            # a cheap aggregate decides whether the client's copy is current before anything is loaded
+            version = await job_service.get_job_version(job_uid, session)
 
-    raise errors.JobNotFound()
+            if version is None:
+                raise errors.JobNotFound()
+
+            headers = validators(job_uid, *version)
+            if etag_matches(request, headers["ETag"]):
+                return not_modified(headers)
+
+        response = await job_cache.fill(cache_key, load)
+
+    return conditional(request, response)
+
+
+def job_version(job: schemas.JobDetails) -> tuple:
+    # same shape as JobService.get_job_version
+    return (
+        job.updated_at,
+        len(job.application),
+        max((application.updated_at for application in job.application), default=None),
+    )
 
 @job_router.post('/jobs', status_code=status.HTTP_201_CREATED, response_model=schemas.Job, dependencies=[job_listing_role])
 async def create_job(payload: schemas.JobCreate, session: AsyncSession = Depends(get_session), current_user: models.User = Depends(get_current_user)):
@@ -74,29 +267,28 @@ async def get_employer_jobs(user_uid: str, session: AsyncSession = Depends(get_s
 @job_router.put('/jobs/{job_uid}', status_code=status.HTTP_202_ACCEPTED, response_model=schemas.Job)
 async def update_job(job_uid: str, payload: schemas.JobUpdate, session: AsyncSession = Depends(get_session), token_details: dict=Depends(access_token_bearer)):
 
-    job = await job_service.get_job_by_id(job_uid, session)
-    if not job:
-        raise errors.JobNotFound()
-
     current_user = UUID(token_details.get('user')['user_uid'])
 
-    if job.employer_uid != current_user:
-        raise errors.NotAuthorized()
-    
-    updated_job = await job_service.update_job(job_uid, payload, session)
+    updated_job = await job_service.update_job(job_uid, payload, session, current_user)
+
+    if updated_job is None:
+        # nothing matched the uid and owner, only now check which of the two failed
+        if await job_service.job_exists(job_uid, session):
+            raise errors.NotAuthorized()
+
+        raise errors.JobNotFound()
     
     return updated_job
 
 @job_router.delete('/jobs/{job_uid}', status_code=status.HTTP_204_NO_CONTENT)
 async def delete_job(job_uid: str, session: AsyncSession = Depends(get_session), token_details: dict=Depends(access_token_bearer)):
 
-    job = await job_service.get_job_by_id(job_uid, session)
-    if not job:
-        raise errors.JobNotFound()
-
     current_user = UUID(token_details.get('user')['user_uid'])
 
-    if job.employer_uid != current_user:
-        raise errors.NotAuthorized()
-    
-    await job_service.delete_job(job_uid, session)
\ No newline at end of file
+    deleted_job = await job_service.delete_job(job_uid, session, current_user)
+
+    if deleted_job is None:
+        if await job_service.job_exists(job_uid, session):
+            raise errors.NotAuthorized()
+
+        raise errors.JobNotFound()
\ No newline at end of file
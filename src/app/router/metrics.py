@@ -0,0 +1,57 @@
+import os
+from fastapi import APIRouter, status, Depends
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.db.main import get_pool_stats, get_session
+from src.app.cache import job_cache
+from src.app.outbox import outbox_dispatcher
+from src.app.auth.dependencies import RoleChecker
+
+
+# internal state of the workers; admins only
+metrics_role = Depends(RoleChecker(["ADMIN"]))
+
+metrics_router = APIRouter(
+    tags=["Metrics"],
+    dependencies=[metrics_role]
+)
+
+
+@metrics_router.get('/metrics/db-pool', status_code=status.HTTP_200_OK)
+async def db_pool_metrics():
+    """
+        Connection pool usage of the worker that served the request.
+
+        - `checked_out` connections are in use, `overflow` counts those opened above `pool_size`
+    """
+
+    return get_pool_stats()
+
+
+@metrics_router.get('/metrics/cache', status_code=status.HTTP_200_OK)
+async def cache_metrics():
+    """
+        Response cache counters of the worker that served the request, since it started.
+
+        - `evictions` counts entries dropped by tag purges; expired entries are not counted
+    """
+
+    return {
+        "worker_pid": os.getpid(),
+        "jobs": job_cache.stats,
+    }
+
+
+@metrics_router.get('/metrics/outbox', status_code=status.HTTP_200_OK)
+async def outbox_metrics(session: AsyncSession = Depends(get_session)):
+    """
+        Email outbox backlog, and the dispatch counters of the worker that served the request.
+
+        - `backlog` is shared by all workers: emails not yet handed to Celery/SMTP and the age of the oldest
+        - `last_lag_seconds` / `max_lag_seconds`: commit-to-dispatch delay of the oldest email in a batch
+    """
+
+    return {
+        "worker_pid": os.getpid(),
+        "backlog": await outbox_dispatcher.backlog(session),
+        "dispatcher": outbox_dispatcher.stats,
+    }
@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlmodel.ext.asyncio.session import AsyncSession
 from typing import List, Optional
 from uuid import UUID
 from src.app import schemas, errors
 from src.db.main import get_session
 from src.app.services import user_service
+from src.app.conditional import validators, etag_matches, not_modified
 from src.app.auth.dependencies import access_token_bearer
 from src.app.auth.dependencies import RoleChecker
 
@@ -29,14 +30,44 @@ async def get_all_users(role: Optional[schemas.UserRoles] = None, session: Async
     return users
 
 @user_router.get("/users/{user_uid}", status_code=status.HTTP_200_OK, response_model=schemas.UserDetails)
-async def get_user(user_uid: UUID, session: AsyncSession = Depends(get_session), current_user=Depends(access_token_bearer)):
+async def get_user(user_uid: UUID, request: Request, response: Response, session: AsyncSession = Depends(get_session), current_user=Depends(access_token_bearer)):
+    """
+        Returns a user with their jobs and applications.
+
+        - Send the `ETag` of a previous response as `If-None-Match` to get `304 Not Modified` if nothing changed
+    """
+
+    if "if-none-match" in request.headers:
+        # a cheap aggregate decides whether the client's copy is current before anything is loaded
+        version = await user_service.get_user_version(user_uid, session)
+
+        if version is None:
+            raise errors.UserNotFound()
+
+        headers = validators(user_uid, *version)
+        if etag_matches(request, headers["ETag"]):
+            return not_modified(headers)
 
-    user = await user_service.get_user(user_uid, session)
+    user = await user_service.get_user_details(user_uid, session)
 
     if not user:
         raise errors.UserNotFound()
+
+    details = schemas.UserDetails.model_validate(user, from_attributes=True)
+    response.headers.update(validators(user_uid, *user_version(details)))
     
-    return user
+    return details
+
+
+def user_version(user: schemas.UserDetails) -> tuple:
+    # same shape as UserService.get_user_version
+    return (
+        user.updated_at,
+        len(user.job),
+        max((job.updated_at for job in user.job), default=None),
+        len(user.application),
+        max((application.updated_at for application in user.application), default=None),
+    )
 
 
 @user_router.put("/users/{user_uid}", status_code=status.HTTP_202_ACCEPTED, response_model=schemas.User)
@@ -49,34 +80,37 @@ async def update_user(user_data: schemas.UserUpdate, user_uid: UUID, session: As
         - Only the account owner can update their information
     """
 
-    user_to_update = await user_service.get_user(user_uid, session)
-
-    if user_to_update is None:
-        raise errors.UserNotFound()
-
     current_user = UUID(token_details.get('user')['user_uid'])
 
-    if user_to_update.uid != current_user:
+    if user_uid != current_user:
         raise errors.NotAuthorized()
 
     updated_user = await user_service.update_user(user_uid, user_data, session)
 
+    if updated_user is None:
+        raise errors.UserNotFound()
+
     return updated_user
 
 @user_router.delete("/users/{user_uid}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_user(user_uid:str, session: AsyncSession = Depends(get_session), token_details: dict=Depends(access_token_bearer)):
-    
-    user_to_delete = await user_service.get_user(user_uid, session)
+async def delete_user(user_uid: UUID, session: AsyncSession = Depends(get_session), token_details: dict=Depends(access_token_bearer)):
 
-    if user_to_delete is None:
-        raise errors.UserNotFound()
+    """
+        Deletes a user account together with its jobs and applications.
+
+        - Requires valid access token
+        - Only the account owner can delete their account
+    """
 
     current_user = UUID(token_details.get('user')['user_uid'])
 
-    if user_to_delete.uid != current_user:
+    if user_uid != current_user:
         raise errors.NotAuthorized()
     
-    await user_service.delete_user(user_uid, session)
+    deleted_user = await user_service.delete_user(user_uid, session)
+
+    if deleted_user is None:
+        raise errors.UserNotFound()
 
     return {"User deleted successfully!"}
 
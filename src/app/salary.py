@@ -0,0 +1,74 @@
+import re
+from typing import NamedTuple, Optional
+from src.app.schemas import SalaryPeriod
+
+
+CURRENCY_SYMBOLS = {"$": "USD", "₦": "NGN", "£": "GBP", "€": "EUR", "₵": "GHS", "₹": "INR"}
+CURRENCY_WORDS = {"naira": "NGN", "dollar": "USD", "dollars": "USD", "pound": "GBP", "pounds": "GBP", "euro": "EUR", "euros": "EUR", "cedi": "GHS", "cedis": "GHS"}
+# codes are only recognised from this list, so words like "per" or "day" are never taken for one
+CURRENCY_CODES = {"USD", "NGN", "GBP", "EUR", "CAD", "AUD", "GHS", "KES", "ZAR", "INR", "EGP"}
+
+PERIOD_WORDS = {
+    SalaryPeriod.HOUR: ("hour", "hourly", "hr", "ph"),
+    SalaryPeriod.DAY: ("day", "daily"),
+    SalaryPeriod.WEEK: ("week", "weekly", "wk", "pw"),
+    SalaryPeriod.MONTH: ("month", "monthly", "mo", "mth", "pm"),
+    SalaryPeriod.YEAR: ("year", "yearly", "yr", "annual", "annually", "annum", "pa"),
+}
+
+# longest suffixes first, so "million" is not read as "m"; "%" is captured only to skip percentages
+AMOUNT = re.compile(r"(\d[\d,]*(?:\.\d+)?)\s*(thousand|million|billion|mn|bn|k|m|%)?(?![a-z])", re.IGNORECASE)
+WORD = re.compile(r"[a-z]+", re.IGNORECASE)
+MULTIPLIERS = {"k": 1_000, "thousand": 1_000, "m": 1_000_000, "mn": 1_000_000, "million": 1_000_000, "bn": 1_000_000_000, "billion": 1_000_000_000}
+
+# salary_min and salary_max are NUMERIC(12, 2)
+MAX_AMOUNT = 10 ** 10
+
+
+class ParsedSalary(NamedTuple):
+    salary_min: Optional[float] = None
+    salary_max: Optional[float] = None
+    currency: Optional[str] = None
+    period: Optional[SalaryPeriod] = None
+
+
+def parse_salary(text: str) -> ParsedSalary:
+    """
+        Reads the range, currency and pay period out of a free-form salary,
+        e.g. "$50k - 70k per year" or "NGN 350,000 monthly".
+
+        Anything that isn't stated stays None; a single figure is both min and max.
+    """
+    if not text:
+        return ParsedSalary()
+
+    amounts = []
+    suffixes = []
+    for number, suffix in AMOUNT.findall(text):
+        # "10% bonus" is not an amount
+        if suffix == "%":
+            continue
+
+        amounts.append(float(number.replace(",", "")))
+        suffixes.append(suffix.lower())
+
+    # "50-70k" means 50k to 70k
+    if len(amounts) == 2 and suffixes[1] and not suffixes[0] and amounts[0] < amounts[1]:
+        suffixes[0] = suffixes[1]
+
+    amounts = [amount * MULTIPLIERS.get(suffix, 1) for amount, suffix in zip(amounts, suffixes)]
+    # too big to store, and far more likely a typo than a salary
+    amounts = [amount for amount in amounts if amount < MAX_AMOUNT]
+
+    words = [word.lower() for word in WORD.findall(text.replace(".", ""))]
+
+    currency = next((code for symbol, code in CURRENCY_SYMBOLS.items() if symbol in text), None)
+    currency = currency or next((word.upper() for word in words if word.upper() in CURRENCY_CODES), None)
+    currency = currency or next((CURRENCY_WORDS[word] for word in words if word in CURRENCY_WORDS), None)
+
+    period = next((period for word in words for period, names in PERIOD_WORDS.items() if word in names), None)
+
+    if not amounts:
+        return ParsedSalary(currency=currency, period=period)
+
+    return ParsedSalary(min(amounts), max(amounts), currency, period)
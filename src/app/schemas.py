@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional, List
+from typing import Optional, List, Dict
 from datetime import datetime
 import uuid
 from enum import Enum
@@ -22,6 +22,13 @@ class JobType(str, Enum):
     PART_TIME = "PART_TIME"
     CONTRACT = "CONTRACT"
 
+class SalaryPeriod(str, Enum):
+    HOUR = "HOUR"
+    DAY = "DAY"
+    WEEK = "WEEK"
+    MONTH = "MONTH"
+    YEAR = "YEAR"
+
 class UserBase(BaseModel):
     first_name: str
     last_name: str
@@ -42,6 +49,13 @@ class User(UserBase):
     created_at: datetime
     updated_at:datetime
 
+class UserPrincipal(BaseModel):
+    """What the auth dependencies need to know about the caller"""
+    uid: uuid.UUID
+    email_address: str
+    role: UserRoles
+    is_verified: Optional[bool] = False
+
 # class Username(BaseModel):
 #     username: str = Optional
 #     email_address: EmailStr = Optional
@@ -69,7 +83,25 @@ class JobUpdate(JobBase):
 class Job(JobBase):
     uid: uuid.UUID 
     employer_uid: uuid.UUID
+    # parsed from `salary`
+    salary_min: Optional[float] = None
+    salary_max: Optional[float] = None
+    currency: Optional[str] = None
+    period: Optional[SalaryPeriod] = None
     created_at: datetime
+    updated_at: datetime
+
+class NearbyJob(Job):
+    latitude: float
+    longitude: float
+    distance_km: float
+
+class SalaryFilter(BaseModel, frozen=True):
+    """Jobs whose salary range overlaps [salary_min, salary_max]"""
+    salary_min: Optional[float] = None
+    salary_max: Optional[float] = None
+    currency: Optional[str] = None
+    period: Optional[SalaryPeriod] = None
 
 class ApplicationCreate(BaseModel):
     cover_letter: str
@@ -83,6 +115,7 @@ class Application(BaseModel):
     user_uid: uuid.UUID
     job_uid: uuid.UUID
     created_at: datetime 
+    updated_at: datetime
 
 
 class UserDetails(User):
@@ -94,6 +127,19 @@ class JobDetails(Job):
     application: List[Application]
 
 
+class JobFacets(BaseModel):
+    """Number of matching jobs per value of each facet"""
+    job_type: Dict[str, int]
+    work_mode: Dict[str, int]
+    location: Dict[str, int]
+    is_active: Dict[str, int]
+
+
+class JobSearchResult(BaseModel):
+    jobs: List[Job]
+    facets: Optional[JobFacets] = None
+
+
 class EmailModel(BaseModel):
     addresses: List[str]
 
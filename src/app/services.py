@@ -1,11 +1,19 @@
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlmodel import select, desc
+from sqlalchemy import tuple_, update, delete, or_, func, literal_column
+from sqlalchemy.orm import selectinload
 from fastapi.responses import JSONResponse
+import math
 from typing import Optional
 from uuid import UUID
-from src.app.models import User, Job, Application
+from src.app.models import User, Job, Application, job_search_vector
 from src.app import schemas
-from src.app.auth.utils import hash_password
+from src.app.auth.hashing import hash_password
+from src.app.pagination import decode_created_at_cursor, decode_search_cursor, decode_distance_cursor
+from src.app.cache import invalidate_user, purge_job_tags
+from src.app.counting import count_rows
+from src.app.salary import parse_salary
+from src.app.geo import location_columns, covering_geohashes, EARTH_RADIUS_KM
 
 
 class UserService:
@@ -29,6 +37,27 @@ class UserService:
 
         return user
     
+    async def get_user_details(self, user_id: str, session:AsyncSession):
+        statement = select(User).where(User.uid == user_id).options(selectinload(User.job), selectinload(User.application))
+
+        result = await session.exec(statement)
+
+        return result.first()
+    
+    async def get_user_version(self, user_id: str, session: AsyncSession):
+        """(updated_at, job count, latest job update, application count, latest application update), without loading the collections"""
+        statement = select(
+            User.updated_at,
+            select(func.count(Job.uid)).where(Job.employer_uid == User.uid).scalar_subquery(),
+            select(func.max(Job.updated_at)).where(Job.employer_uid == User.uid).scalar_subquery(),
+            select(func.count(Application.uid)).where(Application.user_uid == User.uid).scalar_subquery(),
+            select(func.max(Application.updated_at)).where(Application.user_uid == User.uid).scalar_subquery(),
+        ).where(User.uid == user_id)
+
+        result = await session.exec(statement)
+
+        return result.first()
+    
     async def create_user(self, user_data: schemas.UserCreate, session: AsyncSession):
         user_data_dict = user_data.model_dump()
         
@@ -36,7 +65,7 @@ class UserService:
             **user_data_dict
         )
 
-        new_user.hashed_password = hash_password(user_data_dict['hashed_password'])
+        new_user.hashed_password = await hash_password(user_data_dict['hashed_password'])
 
         session.add(new_user)
 
@@ -45,19 +74,19 @@ class UserService:
         return new_user
     
     async def update_user(self, user_uid: str, user_data: schemas.UserUpdate, session: AsyncSession):
-        user_to_update = await self.get_user(user_uid, session)
+        user_data_dict = user_data.model_dump(exclude_unset=True)
 
-        if user_to_update is not None:
-            user_data_dict = user_data.model_dump(exclude_unset=True)
+        statement = update(User).where(User.uid == user_uid).values(**user_data_dict).returning(User)
 
-            for k, v in user_data_dict.items():
-                setattr(user_to_update, k, v)
+        result = await session.exec(statement)
 
-                await session.commit()
+        updated_user = result.scalars().first()
 
-            return user_to_update
-        else:
-            return None
+        await session.commit()
+
+        await invalidate_user(user_uid)
+
+        return updated_user
     
     async def update_user_info(self, user: User, user_data: dict, session: AsyncSession):
         
@@ -65,20 +94,38 @@ class UserService:
             setattr(user, k, v)
 
         await session.commit()
+
+        await invalidate_user(user.uid)
         
         return user
 
 
     async def delete_user(self, user_uid: str, session: AsyncSession):
-        user_to_delete = await self.get_user(user_uid, session)
+        # dependents are removed set-based, children first, in the same transaction as the user
+        employer_jobs = select(Job.uid).where(Job.employer_uid == user_uid)
+
+        applications = await session.exec(
+            delete(Application)
+            .where(or_(Application.user_uid == user_uid, Application.job_uid.in_(employer_jobs)))
+            .returning(Application.job_uid)
+            .execution_options(synchronize_session=False)
+        )
+        applied_jobs = set(applications.scalars().all())
 
-        if user_to_delete is not None:
-            await session.delete(user_to_delete)
+        await session.exec(delete(Job).where(Job.employer_uid == user_uid).execution_options(synchronize_session=False))
 
-            await session.commit()
-        
-        else:
-            return None
+        result = await session.exec(delete(User).where(User.uid == user_uid).returning(User.uid).execution_options(synchronize_session=False))
+
+        deleted_uid = result.scalars().first()
+
+        await session.commit()
+
+        await invalidate_user(user_uid)
+
+        if deleted_uid is not None:
+            await purge_job_tags("jobs:list", f"employer:{user_uid}", *(f"job:{job_uid}:applications" for job_uid in applied_jobs))
+
+        return deleted_uid
         
     
     async def get_user_by_email(self, user_email: str, session:AsyncSession):
@@ -97,19 +144,152 @@ class UserService:
 
 class JobService():
     
-    async def get_all_jobs(self, session: AsyncSession, skip: int=0, limit: int=10, job_type:Optional[schemas.JobType]=None, work_mode: Optional[schemas.WorkMode] = None):
-        statement = select(Job).order_by(desc(Job.created_at)).offset(skip).limit(limit)
+    async def get_all_jobs(self, session: AsyncSession, skip: int=0, limit: int=10, job_type:Optional[schemas.JobType]=None, work_mode: Optional[schemas.WorkMode] = None, cursor: Optional[str] = None, salary: Optional[schemas.SalaryFilter] = None):
+        statement = (
+            select(Job)
+            .where(*self.job_filters(None, job_type, work_mode, salary))
+            .order_by(desc(Job.created_at), desc(Job.uid))
+            .limit(limit)
+        )
+
+        # keyset pagination: seek past the last row of the previous page instead of scanning `skip` rows
+        if cursor is not None:
+            created_at, uid = decode_created_at_cursor(cursor)
+            statement = statement.where(tuple_(Job.created_at, Job.uid) < tuple_(created_at, uid))
+        else:
+            statement = statement.offset(skip)
+            
+        result = await session.exec(statement)
+
+        return result.all()
+    
+    async def count_jobs(self, session: AsyncSession, job_type: Optional[schemas.JobType]=None, work_mode: Optional[schemas.WorkMode]=None, salary: Optional[schemas.SalaryFilter]=None):
+        """(count, exact) of the jobs listed by get_all_jobs with these filters."""
+        return await count_rows(session, Job, *self.job_filters(None, job_type, work_mode, salary))
+    
+    def search_query(self, q: str):
+        # the same text search configuration as the generated column
+        return func.websearch_to_tsquery(literal_column("'english'::regconfig"), q)
+    
+    def job_filters(self, q: Optional[str]=None, job_type: Optional[schemas.JobType]=None, work_mode: Optional[schemas.WorkMode]=None, salary: Optional[schemas.SalaryFilter]=None) -> list:
+        filters = []
+
+        if q is not None:
+            filters.append(job_search_vector.op("@@")(self.search_query(q)))
 
         if job_type is not None:
-            statement = statement.where(Job.job_type == job_type)
-        
+            filters.append(Job.job_type == job_type)
+
         if work_mode is not None:
-            statement = statement.where(Job.work_mode == work_mode)
-            
+            filters.append(Job.work_mode == work_mode)
+
+        if salary is not None:
+            # ranges overlap when each one starts before the other ends
+            if salary.salary_min is not None:
+                filters.append(Job.salary_max >= salary.salary_min)
+
+            if salary.salary_max is not None:
+                filters.append(Job.salary_min <= salary.salary_max)
+
+            if salary.currency is not None:
+                filters.append(Job.currency == salary.currency.upper())
+
+            if salary.period is not None:
+                filters.append(Job.period == salary.period)
+
+        return filters
+    
+    async def search_jobs(self, session: AsyncSession, q: str, limit: int=10, job_type: Optional[schemas.JobType]=None, work_mode: Optional[schemas.WorkMode]=None, cursor: Optional[str]=None):
+        """Jobs matching `q` as (job, rank) rows, best match first; title outweighs location, which outweighs description."""
+        rank = func.ts_rank_cd(job_search_vector, self.search_query(q))
+
+        statement = (
+            select(Job, rank.label("rank"))
+            .where(*self.job_filters(q, job_type, work_mode))
+            .order_by(desc(rank), desc(Job.created_at), desc(Job.uid))
+            .limit(limit)
+        )
+
+        # keyset pagination over (rank, created_at, uid); ties on rank fall back to newest first
+        if cursor is not None:
+            last_rank, created_at, uid = decode_search_cursor(cursor)
+            statement = statement.where(tuple_(rank, Job.created_at, Job.uid) < tuple_(last_rank, created_at, uid))
+
+        result = await session.exec(statement)
+
+        return result.all()
+    
+    def distance_km(self, latitude: float, longitude: float):
+        """Great-circle (haversine) distance from a point to each job."""
+        job_latitude, job_longitude = func.radians(Job.latitude), func.radians(Job.longitude)
+        latitude, longitude = math.radians(latitude), math.radians(longitude)
+
+        h = (
+            func.power(func.sin((job_latitude - latitude) / 2), 2)
+            + func.cos(job_latitude) * math.cos(latitude) * func.power(func.sin((job_longitude - longitude) / 2), 2)
+        )
+
+        # rounding can push h a hair past 1
+        return 2 * EARTH_RADIUS_KM * func.asin(func.least(1.0, func.sqrt(h)))
+    
+    async def get_nearby_jobs(self, session: AsyncSession, latitude: float, longitude: float, radius_km: float, limit: int=10, job_type: Optional[schemas.JobType]=None, work_mode: Optional[schemas.WorkMode]=None, cursor: Optional[str]=None, salary: Optional[schemas.SalaryFilter]=None):
+        """Jobs within `radius_km` of a point as (job, distance_km) rows, nearest first."""
+        distance = self.distance_km(latitude, longitude)
+
+        statement = (
+            select(Job, distance.label("distance_km"))
+            .where(*self.job_filters(None, job_type, work_mode, salary), distance <= radius_km)
+            .order_by(distance, Job.uid)
+            .limit(limit)
+        )
+
+        # the geohash cells under the circle narrow the scan down through the index; the distance is exact
+        cells = covering_geohashes(latitude, longitude, radius_km)
+        if cells:
+            statement = statement.where(or_(*(Job.geohash.like(f"{cell}%") for cell in cells)))
+        else:
+            statement = statement.where(Job.geohash.is_not(None))
+
+        # keyset pagination over (distance, uid)
+        if cursor is not None:
+            last_distance, uid = decode_distance_cursor(cursor)
+            statement = statement.where(tuple_(distance, Job.uid) > tuple_(last_distance, uid))
+
         result = await session.exec(statement)
 
         return result.all()
     
+    async def get_job_facets(self, session: AsyncSession, q: Optional[str]=None, job_type: Optional[schemas.JobType]=None, work_mode: Optional[schemas.WorkMode]=None, location_limit: int=20):
+        """Job counts per job_type, work_mode, location and is_active for the filtered jobs, in one grouped query."""
+        facet_columns = {"job_type": Job.job_type, "work_mode": Job.work_mode, "location": Job.location, "is_active": Job.is_active}
+
+        # one GROUPING SETS scan yields the counts of every facet; grouping(col) = 0 marks the set a row belongs to
+        statement = (
+            select(*facet_columns.values(), *(func.grouping(column) for column in facet_columns.values()), func.count())
+            .where(*self.job_filters(q, job_type, work_mode))
+            .group_by(func.grouping_sets(*facet_columns.values()))
+        )
+
+        result = await session.exec(statement)
+
+        names = list(facet_columns)
+        facets = {name: {} for name in names}
+
+        for row in result.all():
+            values, grouped, count = row[:len(names)], list(row[len(names):-1]), row[-1]
+            index = grouped.index(0)
+            value = values[index]
+
+            # enum members by their value, is_active as "true"/"false"
+            key = str(value).lower() if isinstance(value, bool) else getattr(value, "value", value)
+            facets[names[index]][key] = count
+
+        # locations are free text; keep the biggest ones
+        locations = sorted(facets["location"].items(), key=lambda item: item[1], reverse=True)
+        facets["location"] = dict(locations[:location_limit])
+
+        return facets
+    
     async def get_job_by_id(self, job_uid: str, session: AsyncSession):
         statement = select(Job).where(Job.uid == job_uid)
 
@@ -117,6 +297,25 @@ class JobService():
 
         return result.first()
     
+    async def get_job_details(self, job_uid: str, session: AsyncSession):
+        statement = select(Job).where(Job.uid == job_uid).options(selectinload(Job.application))
+
+        result = await session.exec(statement)
+
+        return result.first()
+    
+    async def get_job_version(self, job_uid: str, session: AsyncSession):
+        """(updated_at, application count, latest application update), without loading the applications"""
+        statement = select(
+            Job.updated_at,
+            select(func.count(Application.uid)).where(Application.job_uid == Job.uid).scalar_subquery(),
+            select(func.max(Application.updated_at)).where(Application.job_uid == Job.uid).scalar_subquery(),
+        ).where(Job.uid == job_uid)
+
+        result = await session.exec(statement)
+
+        return result.first()
+    
     async def get_job_by_location(self, job_location: str, session: AsyncSession):
         statement = select(Job).where(Job.location == job_location)
 
@@ -129,7 +328,9 @@ class JobService():
         job_data_to_dict = job_data.model_dump()
 
         new_job = Job(
-            **job_data_to_dict
+            **job_data_to_dict,
+            **parse_salary(job_data.salary)._asdict(),
+            **location_columns(job_data.location)
         )
         
         new_job.employer_uid = user_uid
@@ -137,6 +338,8 @@ class JobService():
         session.add(new_job)
         await session.commit()
 
+        await purge_job_tags("jobs:list")
+
         return new_job
     
     async def get_employer_jobs(self, employer_uid: str, session: AsyncSession):
@@ -146,40 +349,68 @@ class JobService():
 
         return result.all()
     
-    async def update_job(self, job_uid: str, payload: schemas.JobUpdate, session: AsyncSession):
-        job_to_update = await self.get_job_by_id(job_uid, session)
+    async def job_exists(self, job_uid: str, session: AsyncSession):
+        statement = select(Job.uid).where(Job.uid == job_uid)
 
-        if job_to_update:
-            job_dict_payload = payload.model_dump(exclude_unset=True)
+        result = await session.exec(statement)
 
-            for k, v in job_dict_payload.items():
-                setattr(job_to_update, k, v)
+        return result.first() is not None
+    
+    async def update_job(self, job_uid: str, payload: schemas.JobUpdate, session: AsyncSession, employer_uid: UUID):
+        job_dict_payload = payload.model_dump(exclude_unset=True)
 
-                await session.commit()
+        if "salary" in job_dict_payload:
+            job_dict_payload.update(parse_salary(job_dict_payload["salary"])._asdict())
 
-            return job_to_update
-        else:
-            return None
+        if "location" in job_dict_payload:
+            job_dict_payload.update(location_columns(job_dict_payload["location"]))
+
+        # ownership is part of the predicate, so no row comes back for a job the employer doesn't own
+        statement = update(Job).where(Job.uid == job_uid, Job.employer_uid == employer_uid).values(**job_dict_payload).returning(Job)
+
+        result = await session.exec(statement)
+
+        updated_job = result.scalars().first()
+
+        await session.commit()
+
+        if updated_job is not None:
+            await purge_job_tags("jobs:list", f"job:{job_uid}")
+
+        return updated_job
     
-    async def delete_job(self, job_uid: str, session: AsyncSession):
+    async def delete_job(self, job_uid: str, session: AsyncSession, employer_uid: UUID):
+        owned_job = select(Job.uid).where(Job.uid == job_uid, Job.employer_uid == employer_uid)
 
-        job_to_delete = await self.get_job_by_id(job_uid, session)
-        
-        if job_to_delete is not None:
-            
-            await session.delete(job_to_delete)
-            await session.commit()
-        
-        else:
-            return None
+        # applications go first so the job's foreign keys are satisfied; nothing matches if the job isn't owned
+        await session.exec(delete(Application).where(Application.job_uid.in_(owned_job)).execution_options(synchronize_session=False))
+
+        result = await session.exec(
+            delete(Job)
+            .where(Job.uid == job_uid, Job.employer_uid == employer_uid)
+            .returning(Job.uid)
+            .execution_options(synchronize_session=False)
+        )
+
+        deleted_uid = result.scalars().first()
+
+        await session.commit()
+
+        if deleted_uid is not None:
+            await purge_job_tags("jobs:list", f"job:{job_uid}")
+
+        return deleted_uid
 
 class ApplicationService():
-    async def get_applications(self, session: AsyncSession):
-        statement = select(Application).order_by(desc(Application.created_at))
+    async def get_applications(self, session: AsyncSession, skip: int = 0, limit: int = 10):
+        statement = select(Application).order_by(desc(Application.created_at)).offset(skip).limit(limit)
 
         result = await session.exec(statement)
 
         return result.all()
+    
+    async def count_applications(self, session: AsyncSession):
+        return await count_rows(session, Application)
 
     
     async def create_application(self, payload: schemas.ApplicationCreate, applicant_id: str, job_id: str, session: AsyncSession):
@@ -205,6 +436,8 @@ class ApplicationService():
         session.add(new_apps)
         await session.commit()
 
+        await purge_job_tags(f"job:{job_id}:applications")
+
         return new_apps
 
     async def get_job_applications(self, job_id: str, session: AsyncSession):
@@ -229,31 +462,50 @@ class ApplicationService():
 
         return result.first()
     
-    async def update_application(self, application_id: str, payload: schemas.ApplicationUpdate, session: AsyncSession):
-        
-        application = await self.get_application_by_id(application_id, session)
+    async def application_exists(self, application_id: str, session: AsyncSession):
+        statement = select(Application.uid).where(Application.uid == application_id)
+
+        result = await session.exec(statement)
+
+        return result.first() is not None
+    
+    async def update_application(self, application_id: str, payload: schemas.ApplicationUpdate, session: AsyncSession, applicant_id: UUID):
 
         application_to_update = payload.model_dump(exclude_unset=True)
 
-        for k, v in application_to_update.items():
-            setattr(application, k, v)
+        statement = update(Application).where(Application.uid == application_id, Application.user_uid == applicant_id).values(**application_to_update).returning(Application)
+
+        result = await session.exec(statement)
 
-            await session.commit()
+        application = result.scalars().first()
+
+        await session.commit()
+
+        if application is not None:
+            await purge_job_tags(f"job:{application.job_uid}:applications")
         
         return application
     
-    async def delete_application(self, application_id: str, session: AsyncSession):
+    async def delete_application(self, application_id: str, session: AsyncSession, applicant_id: UUID):
 
-        app_to_delete = await self.get_application_by_id(application_id, session)
+        result = await session.exec(
+            delete(Application)
+            .where(Application.uid == application_id, Application.user_uid == applicant_id)
+            .returning(Application.uid, Application.job_uid)
+            .execution_options(synchronize_session=False)
+        )
 
-        if app_to_delete is not None:
+        deleted = result.first()
 
-            await session.delete(app_to_delete)
-            await session.commit()
+        await session.commit()
 
-        else: 
+        if deleted is None:
             return None
 
+        await purge_job_tags(f"job:{deleted.job_uid}:applications")
+
+        return deleted.uid
+
 
 
 user_service = UserService()
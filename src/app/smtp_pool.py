@@ -0,0 +1,208 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from email.message import EmailMessage
+from email.utils import formataddr
+from typing import Awaitable, Callable, TypeVar
+import aiosmtplib
+from jinja2 import TemplateError
+from src.app.email_templates import render_message
+from src.config import Config
+
+T = TypeVar("T")
+
+# the pooled connection is gone or unusable; a fresh one may well succeed
+CONNECTION_ERRORS = (aiosmtplib.SMTPServerDisconnected, aiosmtplib.SMTPConnectError, aiosmtplib.SMTPTimeoutError, ConnectionError, asyncio.TimeoutError)
+
+
+def create_email(recipients: list[str], subject: str, body: str) -> EmailMessage:
+    message = EmailMessage()
+    message["From"] = formataddr((Config.MAIL_FROM_NAME or "", Config.MAIL_FROM))
+    message["To"] = ", ".join(recipients)
+    message["Subject"] = subject
+    message.set_content(body, subtype="html")
+
+    return message
+
+
+async def connect_smtp() -> aiosmtplib.SMTP:
+    """An open, authenticated session with the configured mail server."""
+    smtp = aiosmtplib.SMTP(
+        hostname=Config.MAIL_SERVER,
+        port=Config.MAIL_PORT,
+        username=Config.MAIL_USERNAME if Config.USE_CREDENTIALS else None,
+        password=Config.MAIL_PASSWORD if Config.USE_CREDENTIALS else None,
+        use_tls=Config.MAIL_SSL_TLS,
+        start_tls=Config.MAIL_STARTTLS,
+        validate_certs=Config.VALIDATE_CERTS,
+        timeout=Config.SMTP_TIMEOUT,
+    )
+    # logs in as well when credentials are given
+    await smtp.connect()
+
+    return smtp
+
+
+class PooledConnection:
+    def __init__(self, smtp: aiosmtplib.SMTP):
+        self.smtp = smtp
+        self.sent = 0
+        self.last_used = time.monotonic()
+
+
+class SMTPPool:
+    """
+    Keeps up to `size` authenticated SMTP sessions open between sends, so a message
+    costs one MAIL/RCPT/DATA exchange instead of a connect, STARTTLS and login.
+
+    Belongs to the event loop it is first used on.
+    """
+
+    def __init__(self, connect: Callable[[], Awaitable[aiosmtplib.SMTP]] = connect_smtp, size: int = 1, idle_timeout: float = 60, max_messages: int = 100):
+        self.connect = connect
+        self.size = size
+        self.idle_timeout = idle_timeout
+        # servers cap the messages of one session
+        self.max_messages = max_messages
+        self.idle: list[PooledConnection] = []
+        self.slots = asyncio.Semaphore(size)
+        self.stats = {"connects": 0, "sent": 0, "reconnects": 0}
+
+    def usable(self, connection: PooledConnection) -> bool:
+        return (
+            connection.smtp.is_connected
+            and connection.sent < self.max_messages
+            and time.monotonic() - connection.last_used < self.idle_timeout
+        )
+
+    async def checkout(self) -> PooledConnection:
+        while self.idle:
+            connection = self.idle.pop()
+
+            if self.usable(connection):
+                return connection
+
+            await self.discard(connection)
+
+        self.stats["connects"] += 1
+
+        return PooledConnection(await self.connect())
+
+    def checkin(self, connection: PooledConnection) -> None:
+        connection.sent += 1
+        connection.last_used = time.monotonic()
+        self.idle.append(connection)
+
+    async def discard(self, connection: PooledConnection) -> None:
+        try:
+            await connection.smtp.quit()
+        except (aiosmtplib.SMTPException, OSError, asyncio.TimeoutError):
+            connection.smtp.close()
+
+    async def send(self, message: EmailMessage) -> None:
+        """Sends over a pooled session, reconnecting once if the session turns out to be dead."""
+        async with self.slots:
+            for attempt in range(2):
+                connection = await self.checkout()
+
+                try:
+                    await connection.smtp.send_message(message)
+                except CONNECTION_ERRORS:
+                    await self.discard(connection)
+
+                    if attempt:
+                        raise
+
+                    self.stats["reconnects"] += 1
+                    continue
+                except aiosmtplib.SMTPException:
+                    # the server refused this message; the session itself is fine
+                    self.checkin(connection)
+                    raise
+                except BaseException:
+                    await self.discard(connection)
+                    raise
+
+                self.checkin(connection)
+                self.stats["sent"] += 1
+                return
+
+    async def close(self) -> None:
+        while self.idle:
+            await self.discard(self.idle.pop())
+
+
+async def send_batch(pool: SMTPPool, messages: list[dict]) -> tuple[list[dict], list[dict]]:
+    """
+        Sends queued messages (see email_message) over the pool, rendering their templates first.
+
+        Returns the messages worth retrying later (server busy, connection trouble) and the ones
+        that will never go through (refused sender, recipients or content).
+    """
+    retry, failed = [], []
+
+    async def deliver(message: dict):
+        try:
+            subject, body = render_message(message)
+            email = create_email(message["recipients"], subject, body)
+        except (TemplateError, ValueError, KeyError, TypeError) as e:
+            # nothing about this message will change on a retry
+            logging.error(f"Could not build a message to {message.get('recipients')}: {e!r}")
+            failed.append(message)
+            return
+
+        try:
+            await pool.send(email)
+        except aiosmtplib.SMTPResponseException as e:
+            logging.warning(f"SMTP server refused a message to {message['recipients']}: {e.code} {e.message}")
+            (retry if 400 <= e.code < 500 else failed).append(message)
+        except aiosmtplib.SMTPRecipientsRefused as e:
+            logging.warning(f"SMTP server refused every recipient of a message: {e.recipients}")
+            failed.append(message)
+        except (aiosmtplib.SMTPException, OSError, asyncio.TimeoutError) as e:
+            logging.warning(f"Could not send a message to {message['recipients']}: {e}")
+            retry.append(message)
+
+    # the pool's slots bound how many sessions are used at once
+    await asyncio.gather(*(deliver(message) for message in messages))
+
+    return retry, failed
+
+
+class MailLoop:
+    """
+    An event loop on a background thread of the current worker process, shared by its tasks
+    so the pooled sessions outlive any single task. Safe to call from any task thread.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pid = None
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self.pool: SMTPPool | None = None
+
+    def start(self) -> None:
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self.loop.run_forever, name="smtp-pool", daemon=True).start()
+
+        self.pool = SMTPPool(size=Config.SMTP_POOL_SIZE, idle_timeout=Config.SMTP_IDLE_TIMEOUT, max_messages=Config.SMTP_MAX_MESSAGES_PER_CONNECTION)
+        self.pid = os.getpid()
+
+    def run(self, work: Callable[[SMTPPool], Awaitable[T]]) -> T:
+        with self.lock:
+            # a forked worker child inherits the parent's objects but not its threads
+            if self.pid != os.getpid():
+                self.start()
+
+        return asyncio.run_coroutine_threadsafe(work(self.pool), self.loop).result()
+
+    def close(self) -> None:
+        if self.pid == os.getpid():
+            asyncio.run_coroutine_threadsafe(self.pool.close(), self.loop).result(timeout=Config.SMTP_TIMEOUT)
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.pid = None
+
+
+mail_loop = MailLoop()
@@ -1,6 +1,8 @@
 from celery import Celery
-from src.app.mail import mail, create_message
-from asgiref.sync import async_to_sync
+from celery.signals import worker_init, worker_process_shutdown, worker_shutdown
+from src.app.email_templates import load_templates
+from src.app.smtp_pool import mail_loop, create_email, send_batch
+from src.config import Config
 
 app = Celery()
 
@@ -9,16 +11,62 @@ app.config_from_object("src.config")
 @app.task()
 def send_email(recipients:list[str], subject: str, body: str):
     try:
-        message = create_message(
+        message = create_email(
             recipients=recipients,
             subject=subject,
             body=body
         )
 
-        async_to_sync(mail.send_message)(message)
+        # reuses the worker's open SMTP session instead of connecting and logging in per message
+        mail_loop.run(lambda pool: pool.send(message))
         print("Message sent successfully!")
         return "done"
-    
+
     except Exception as e:
         print(f"Error sending email: {e}")
-        raise
\ No newline at end of file
+        raise
+
+
+def email_route(bulk: bool) -> dict:
+    """Bulk mail (digests, alerts) has a queue of its own and the lowest priority."""
+    return {"queue": "bulk", "priority": 9} if bulk else {"queue": "transactional", "priority": 0}
+
+
+def queue_email_batch(messages: list[dict], bulk: bool = False) -> None:
+    send_email_batch.apply_async((messages, 0, bulk), **email_route(bulk))
+
+
+@app.task()
+def send_email_batch(messages: list[dict], attempt: int = 0, bulk: bool = False):
+    """
+        Sends many messages (see email_message) over the worker's pooled SMTP sessions.
+
+        Messages that fail for a transient reason are queued again on their own, with backoff,
+        so one bad message never resends the ones that already went out.
+    """
+    retry, failed = mail_loop.run(lambda pool: send_batch(pool, messages))
+
+    if retry and attempt < Config.EMAIL_BATCH_MAX_RETRIES:
+        send_email_batch.apply_async((retry, attempt + 1, bulk), countdown=Config.EMAIL_RETRY_DELAY * 2 ** attempt, **email_route(bulk))
+    else:
+        failed += retry
+        retry = []
+
+    return {
+        "sent": len(messages) - len(retry) - len(failed),
+        "retrying": len(retry),
+        "failed": len(failed),
+    }
+
+
+@worker_init.connect
+def compile_email_templates(**kwargs):
+    # before the pool starts, so forked children inherit the compiled templates
+    load_templates()
+
+
+# prefork children get worker_process_shutdown; the threads pool only worker_shutdown
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def close_smtp_pool(**kwargs):
+    mail_loop.close()
@@ -1,8 +1,9 @@
 import os
 from functools import lru_cache
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import Optional
+from typing import Optional, Literal
 from pydantic import EmailStr
+from kombu import Queue
 
 env = os.getenv("ENV", "local")
 
@@ -30,6 +31,39 @@ class Settings(BaseSettings):
     USE_CREDENTIALS: bool = True
     VALIDATE_CERTS: bool = True
     DOMAIN: str
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_TIMEOUT: int = 30
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_QUEUE_LIMIT: int = 64
+    PASSWORD_REHASH_ON_LOGIN: bool = False
+    USER_CACHE_SIZE: int = 10000
+    USER_CACHE_TTL: int = 60
+    BLOCKLIST_FILTER_CAPACITY: int = 100000
+    BLOCKLIST_FILTER_ERROR_RATE: float = 0.001
+    BLOCKLIST_FILTER_REBUILD_INTERVAL: int = 3600
+    RESPONSE_CACHE_ENABLED: bool = True
+    JOB_CACHE_TTL: int = 30
+    CACHE_FILL_LOCK_TTL: float = 2.0
+    PUBLIC_JOB_LISTING: bool = False
+    PUBLIC_JOBS_S_MAXAGE: int = 60
+    CDN_PURGER: str = "noop"
+    CDN_PURGE_LOG: str = "cdn_purges.log"
+    TOTAL_COUNT_MODE: Literal["auto", "exact", "estimate"] = "auto"
+    TOTAL_COUNT_EXACT_LIMIT: int = 1000
+    SMTP_POOL_SIZE: int = 2
+    SMTP_IDLE_TIMEOUT: int = 60
+    SMTP_MAX_MESSAGES_PER_CONNECTION: int = 100
+    SMTP_TIMEOUT: int = 30
+    EMAIL_BATCH_MAX_RETRIES: int = 3
+    EMAIL_RETRY_DELAY: int = 30
+    PASSWORD_RESET_EMAIL_WINDOW: int = 300
+    OUTBOX_BATCH_SIZE: int = 100
+    OUTBOX_POLL_INTERVAL: float = 1.0
+    OUTBOX_DELIVERY: Literal["celery", "smtp"] = "celery"
 
     model_config = SettingsConfigDict(
         env_file=env_file,
@@ -45,4 +79,14 @@ Config = get_settings()
 
 broker_url = Config.REDIS_URL
 result_backend = Config.REDIS_URL
-broker_connection_retry_on_startup =True
\ No newline at end of file
+broker_connection_retry_on_startup =True
+
+# verification and reset emails never queue behind a digest blast
+task_queues = (Queue("transactional"), Queue("bulk"))
+task_default_queue = "transactional"
+# a worker consuming both queues drains them in the order above, and each by message priority
+broker_transport_options = {"queue_order_strategy": "priority", "priority_steps": list(range(10)), "sep": ":"}
+# nobody reads an email task's return value; don't keep one per email in Redis
+task_ignore_result = True
+# a worker only reserves what it can start, so new transactional mail is not stuck behind prefetched work
+worker_prefetch_multiplier = 1
\ No newline at end of file
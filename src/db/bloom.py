@@ -0,0 +1,38 @@
+import math
+import hashlib
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter for strings. `in` can return false positives
+    (at roughly `error_rate` once `capacity` items are added) but never false
+    negatives. Items can not be removed; build a new filter instead.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001) -> None:
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def positions(self, item: str):
+        # double hashing: k positions from two independent 64-bit halves of one digest
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, item: str) -> None:
+        for position in self.positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self.positions(item))
+
+    def __len__(self) -> int:
+        return self.count
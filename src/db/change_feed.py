@@ -0,0 +1,84 @@
+"""
+Row change feed from Postgres. Triggers on the users, jobs and applications
+tables (see the `add_row_change_notify_triggers` migration) NOTIFY every
+insert/update/delete on CHANNEL with a JSON payload of table, op and uid.
+Each worker keeps one dedicated LISTEN connection and hands the events to
+the handlers registered for that table.
+"""
+import json
+import asyncio
+import inspect
+import logging
+import asyncpg
+from collections import defaultdict
+from typing import Callable
+from sqlalchemy.engine import make_url
+from src.config import Config
+
+CHANNEL = "row_changes"
+
+# table -> handlers called with (uid, op) for every change to a row of it
+change_handlers: dict[str, list[Callable[[str, str], None]]] = defaultdict(list)
+# called every time the listener has (re)connected; changes made while disconnected were missed
+connect_hooks: list[Callable] = []
+
+
+def on_change(table: str, handler: Callable[[str, str], None]) -> None:
+    change_handlers[table].append(handler)
+
+
+def on_connect(hook: Callable) -> None:
+    connect_hooks.append(hook)
+
+
+def dispatch(payload: str) -> None:
+    try:
+        event = json.loads(payload)
+        table, op, uid = event["table"], event["op"], event["uid"]
+    except (ValueError, KeyError, TypeError):
+        logging.warning(f"Ignoring malformed change event: {payload!r}")
+        return
+
+    for handler in change_handlers.get(table, []):
+        try:
+            handler(uid, op)
+        except Exception:
+            logging.exception(f"Change handler for {table} failed")
+
+
+def listener_dsn() -> str:
+    # asyncpg speaks plain postgresql:// urls, without the SQLAlchemy driver suffix
+    return make_url(Config.DATABASE_URL).set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+async def listen_for_changes(retry_delay: float = 1.0) -> None:
+    """Keeps a LISTEN connection open until cancelled, reconnecting when it drops."""
+    while True:
+        conn = None
+        try:
+            conn = await asyncpg.connect(listener_dsn())
+            closed = asyncio.Event()
+            conn.add_termination_listener(lambda _: closed.set())
+
+            await conn.add_listener(CHANNEL, lambda _conn, _pid, _channel, payload: dispatch(payload))
+
+            for hook in connect_hooks:
+                result = hook()
+                if inspect.isawaitable(result):
+                    await result
+
+            await closed.wait()
+            logging.warning("Change feed connection closed")
+
+        except (OSError, asyncpg.PostgresError) as e:
+            logging.warning(f"Change feed listener disconnected: {e}")
+
+        except Exception:
+            # anything else (e.g. an asyncpg.InterfaceError) must not end invalidation for good
+            logging.exception("Change feed listener failed")
+
+        finally:
+            if conn is not None and not conn.is_closed():
+                await conn.close()
+
+        await asyncio.sleep(retry_delay)
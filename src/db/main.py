@@ -1,12 +1,23 @@
-from sqlmodel import create_engine, SQLModel
-from sqlalchemy.ext.asyncio import AsyncEngine
+import os
+from sqlmodel import SQLModel
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlmodel.ext.asyncio.session import AsyncSession
-from sqlalchemy.orm import sessionmaker
 from src.config import Config
 
-async_engine = AsyncEngine(
-    create_engine(
-        url=Config.DATABASE_URL)
+async_engine = create_async_engine(
+    url=Config.DATABASE_URL,
+    pool_size=Config.DB_POOL_SIZE,
+    max_overflow=Config.DB_MAX_OVERFLOW,
+    pool_pre_ping=Config.DB_POOL_PRE_PING,
+    pool_recycle=Config.DB_POOL_RECYCLE,
+    pool_timeout=Config.DB_POOL_TIMEOUT
+)
+
+# built once per process and shared by every request
+async_session = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    expire_on_commit=False
 )
 
 async def init_db() -> None:
@@ -17,12 +28,20 @@ async def init_db() -> None:
     
 
 async def get_session():
-    
-    Session = sessionmaker(
-        bind=async_engine,
-        class_=AsyncSession,
-        expire_on_commit=False
-    )
-
-    async with Session() as session:
-        yield session
\ No newline at end of file
+
+    async with async_session() as session:
+        yield session
+
+
+def get_pool_stats() -> dict:
+    """Live connection pool counters for this worker process."""
+    pool = async_engine.pool
+
+    return {
+        "worker_pid": os.getpid(),
+        "pool_size": pool.size(),
+        "max_overflow": Config.DB_MAX_OVERFLOW,
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow()
+    }
@@ -1,15 +1,103 @@
+import time
+import asyncio
+import inspect
+import logging
 import redis.asyncio as redis
+from typing import Callable
 from src.config import Config
+from src.db.bloom import BloomFilter
 
+# fallback TTL for tokens without an `exp` claim
 JTI_EXPIRY = 3600
+# blocklisted JTIs are stored as bare uuid4 keys
+JTI_KEY_PATTERN = "????????-????-????-????-????????????"
+BLOCKLIST_CHANNEL = "blocklist:revoked"
 token_blocklist = redis.from_url(Config.REDIS_URL)
 verify_client = redis.from_url(Config.REDIS_URL)
+pubsub_client = redis.from_url(Config.REDIS_URL)
+response_cache_client = redis.from_url(Config.REDIS_URL)
 
-async def add_token_to_blocklist(jti: str) -> None:
-    
-    await token_blocklist.set(name=jti, value="", ex=JTI_EXPIRY)
+# channel -> handler called with each message published on it
+channel_handlers: dict[str, Callable[[str], None]] = {}
+# called after the listener (re)subscribes / when it loses its connection
+connect_hooks: list[Callable] = []
+disconnect_hooks: list[Callable] = []
+# whether the listener is subscribed, and how many times it has subscribed so far
+listener_subscribed = False
+listener_generation = 0
+
+# In-process front for the blocklist: a JTI that is not in the filter was never revoked,
+# so Redis is only asked on a filter hit. The filter is only trusted while it is known
+# to be in sync, i.e. after a full load and while the pub/sub listener is connected.
+# Expired JTIs leave Redis but never leave the filter, so it is also rebuilt periodically.
+revoked_tokens = BloomFilter(Config.BLOCKLIST_FILTER_CAPACITY, Config.BLOCKLIST_FILTER_ERROR_RATE)
+revoked_tokens_synced = asyncio.Event()
+# filters being rebuilt by load_token_blocklist; revocations go to these too
+rebuilding_filters: list[BloomFilter] = []
+
+def remember_revoked_token(jti: str) -> None:
+    revoked_tokens.add(jti)
+
+    for bloom in rebuilding_filters:
+        bloom.add(jti)
+
+async def load_token_blocklist() -> None:
+    """Rebuilds the local filter from the JTIs currently blocklisted in Redis."""
+    global revoked_tokens
+
+    generation = listener_generation
+    bloom = BloomFilter(Config.BLOCKLIST_FILTER_CAPACITY, Config.BLOCKLIST_FILTER_ERROR_RATE)
+    rebuilding_filters.append(bloom)
+    try:
+        async for key in token_blocklist.scan_iter(match=JTI_KEY_PATTERN, count=1000):
+            bloom.add(key.decode())
+    finally:
+        rebuilding_filters.remove(bloom)
+
+    # the listener resubscribed while we scanned; the rebuild it started is the one to keep
+    if generation != listener_generation:
+        return
+
+    revoked_tokens = bloom
+
+    # revocations by other workers only reach the filter through the listener
+    if listener_subscribed:
+        revoked_tokens_synced.set()
+
+async def rebuild_token_blocklist(interval: float = Config.BLOCKLIST_FILTER_REBUILD_INTERVAL) -> None:
+    """Rebuilds the local filter every `interval` seconds until cancelled, keeping it under capacity."""
+    while True:
+        await asyncio.sleep(interval)
+
+        # an unsubscribed listener rebuilds the filter itself once it resubscribes
+        if not listener_subscribed:
+            continue
+
+        try:
+            await load_token_blocklist()
+        except redis.RedisError as e:
+            logging.warning(f"Could not rebuild the token blocklist filter: {e}")
+
+async def add_token_to_blocklist(jti: str, exp: int | None = None) -> None:
+    # keep the entry only as long as the token itself could still be presented
+    expiry = max(1, int(exp - time.time())) if exp is not None else JTI_EXPIRY
+
+    await token_blocklist.set(name=jti, value="", ex=expiry)
+
+    remember_revoked_token(jti)
+
+    # the token is revoked either way; without the announcement, other workers' filters
+    # only learn of it when they next rebuild from Redis
+    try:
+        await publish(BLOCKLIST_CHANNEL, jti)
+    except redis.RedisError as e:
+        logging.error(f"Could not announce a revoked token to other workers: {e}")
+        # pub/sub is likely failing for announcements to us too; ask Redis until the next rebuild
+        revoked_tokens_synced.clear()
 
 async def token_in_blocklist(jti: str) -> bool:
+    if revoked_tokens_synced.is_set() and jti not in revoked_tokens:
+        return False
     
     jti = await token_blocklist.get(jti)
 
@@ -29,4 +117,79 @@ async def get_email_verification_token(email: str) -> str | None:
 async def delete_email_verification_token(email: str) -> None:
     """Deletes the verification token after successful verification."""
     redis_key = f"verify:{email}"
-    await verify_client.delete(redis_key)
\ No newline at end of file
+    await verify_client.delete(redis_key)
+
+async def claim_password_reset_email(email: str, window: int) -> bool:
+    """True for the first reset request for an email within `window` seconds; only that one sends an email."""
+    redis_key = f"password_reset:{email.lower()}"
+    return bool(await verify_client.set(redis_key, 1, nx=True, ex=window))
+
+async def release_password_reset_email(email: str) -> None:
+    """Gives up a claim whose email never got queued, so the next request sends one."""
+    await verify_client.delete(f"password_reset:{email.lower()}")
+
+# --- Cross-worker pub/sub ---
+def subscribe(channel: str, handler: Callable[[str], None]) -> None:
+    """Registers a handler for a channel; picked up by listen_for_messages."""
+    channel_handlers[channel] = handler
+
+def on_connect(hook: Callable) -> None:
+    """Registers a (sync or async) hook run every time the listener has subscribed."""
+    connect_hooks.append(hook)
+
+def on_disconnect(hook: Callable) -> None:
+    """Registers a (sync or async) hook run when the listener loses its subscription."""
+    disconnect_hooks.append(hook)
+
+async def run_hooks(hooks: list[Callable]) -> None:
+    for hook in hooks:
+        result = hook()
+
+        if inspect.isawaitable(result):
+            await result
+
+async def publish(channel: str, message: str) -> None:
+    await pubsub_client.publish(channel, message)
+
+async def listen_for_messages(retry_delay: float = 1.0) -> None:
+    """Dispatches messages on every subscribed channel until cancelled, reconnecting on errors."""
+    global listener_subscribed, listener_generation
+
+    while True:
+        pubsub = pubsub_client.pubsub()
+        try:
+            await pubsub.subscribe(*channel_handlers)
+            listener_subscribed = True
+            listener_generation += 1
+            # anything published while we were not subscribed was missed; resync first
+            await run_hooks(connect_hooks)
+
+            async for message in pubsub.listen():
+                if message["type"] != "message":
+                    continue
+
+                handler = channel_handlers.get(message["channel"].decode())
+
+                if handler is None:
+                    continue
+
+                try:
+                    handler(message["data"].decode())
+                except Exception:
+                    # one bad message must not end invalidation for every channel
+                    logging.exception(f"Handler for {message['channel'].decode()} failed")
+
+        except redis.RedisError as e:
+            logging.warning(f"Redis pub/sub listener disconnected: {e}")
+
+        finally:
+            listener_subscribed = False
+            await run_hooks(disconnect_hooks)
+            await pubsub.aclose()
+
+        await asyncio.sleep(retry_delay)
+
+
+subscribe(BLOCKLIST_CHANNEL, remember_revoked_token)
+on_connect(load_token_blocklist)
+on_disconnect(revoked_tokens_synced.clear)
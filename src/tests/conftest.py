@@ -6,7 +6,9 @@ from src import app
 from src.app.auth.dependencies import access_token_bearer, get_current_user
 from src.app.router.jobs import job_listing_role
 from src.app.router.application import who_can_apply
+from src.app.router.metrics import metrics_role
 from src.app.auth import auth as auth_module
+from src.app.cache import job_cache
 from uuid import uuid4
 
 FAKE_USER_UID = str(uuid4())
@@ -59,9 +61,15 @@ def fake_celery(monkeypatch):
     mock_worker = Mock()
     monkeypatch.setattr(auth_module, "celery_worker", mock_worker)
 
+# the response cache talks to Redis; tests that need it mock it explicitly
+@pytest.fixture(autouse=True)
+def disable_response_cache(monkeypatch):
+    monkeypatch.setattr(job_cache, "enabled", False)
+    monkeypatch.setattr(job_cache, "purge", AsyncMock())
+
 @pytest.fixture
 def fake_auth_helpers(monkeypatch):
-    monkeypatch.setattr(auth_module, "verify_password", lambda p, h: True)
+    monkeypatch.setattr(auth_module, "verify_password", AsyncMock(return_value=True))
     monkeypatch.setattr(auth_module, "create_access_token", lambda user_data, refresh=False, expiry=None: "fake_token_" + ("refresh" if refresh else "access"))
 
 @pytest.fixture
@@ -71,6 +79,7 @@ def test_client():
     app.dependency_overrides[get_current_user] = get_current_user_uid
     app.dependency_overrides[job_listing_role.dependency] = lambda: True
     app.dependency_overrides[who_can_apply.dependency] = lambda: True
+    app.dependency_overrides[metrics_role.dependency] = lambda: True
     return TestClient(app)
 
 # @pytest.fixture
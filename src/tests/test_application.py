@@ -6,6 +6,10 @@ from unittest.mock import AsyncMock, Mock
 from src.tests.conftest import FAKE_USER_UID
 from src.app.router import application as app_module
 from src.app.schemas import Application, ApplicationCreate, ApplicationUpdate
+from src.app.models import OutboxMessage
+from src.app.schemas import UserPrincipal
+from src.app.auth.dependencies import get_current_user
+from src import app
 
 
 fake_app_uid = uuid4()
@@ -18,7 +22,8 @@ applications = [
         "cover_letter":"first message",
         "user_uid":FAKE_USER_UID,
         "job_uid":fake_job_uid,
-        "created_at":"2025-07-02T20:13:11.081985Z"
+        "created_at":"2025-07-02T20:13:11.081985Z",
+        "updated_at":"2025-07-02T20:13:11.081985Z"
     },
 
     {
@@ -26,7 +31,8 @@ applications = [
         "cover_letter":"second message",
         "user_uid":FAKE_USER_UID,
         "job_uid":fake_job_uid,
-        "created_at":"2025-07-02T20:13:11.081985Z"
+        "created_at":"2025-07-02T20:13:11.081985Z",
+        "updated_at":"2025-07-02T20:13:11.081985Z"
     },
 
     {
@@ -34,7 +40,8 @@ applications = [
         "cover_letter":"third message",
         "user_uid":FAKE_USER_UID,
         "job_uid":fake_job_uid,
-        "created_at":"2025-07-02T20:13:11.081985Z"
+        "created_at":"2025-07-02T20:13:11.081985Z",
+        "updated_at":"2025-07-02T20:13:11.081985Z"
     }
     ]
 
@@ -45,7 +52,8 @@ fake_application = Application(
     cover_letter="first message",
     user_uid=FAKE_USER_UID,
     job_uid=fake_job_uid,
-    created_at="2025-07-02T20:13:11.081985Z"
+    created_at="2025-07-02T20:13:11.081985Z",
+    updated_at="2025-07-02T20:13:11.081985Z"
 )
 
 single_application = {
@@ -53,7 +61,8 @@ single_application = {
     "cover_letter": "applying again application",
     "user_uid": fake_user_id,
     "job_uid": fake_job_uid,
-    "created_at": "2025-07-04T21:04:18.621092Z"
+    "created_at": "2025-07-04T21:04:18.621092Z",
+    "updated_at": "2025-07-04T21:04:18.621092Z"
 }
 
 @pytest.mark.asyncio
@@ -62,18 +71,27 @@ async def test_get_applications(fake_session, test_client, monkeypatch):
     #Mock application service
     mock_service = Mock()
     mock_service.get_applications = AsyncMock(return_value=applications)
+    mock_service.count_applications = AsyncMock(return_value=(250000, False))
 
     monkeypatch.setattr(app_module, "apps", mock_service)
 
     #response
-    response = test_client.get(url="/api/v1/applications")
+    response = test_client.get(url="/api/v1/applications?skip=20&limit=2")
     print(response.json())
 
     assert response.status_code == status.HTTP_200_OK
     data = response.json()
     assert data == jsonable_encoder(applications)
+    assert response.headers["X-Total-Count"] == "250000"
+    assert response.headers["X-Total-Count-Type"] == "estimated"
     
-    mock_service.get_applications.assert_awaited_once_with(fake_session)
+    mock_service.get_applications.assert_awaited_once_with(fake_session, 20, 2)
+
+
+def test_applications_page_size_is_bounded(test_client):
+    response = test_client.get(url="/api/v1/applications?limit=1000")
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
 
 @pytest.mark.asyncio
 async def test_get_job_applications_success(fake_session, test_client, monkeypatch):
@@ -131,7 +149,14 @@ async def test_create_application_success(fake_session, test_client, monkeypatch
 
     #mock service
     mock_job_service = Mock()
-    mock_job_service.get_job_by_id = AsyncMock(return_value=fake_application)
+    mock_job_service.get_job_by_id = AsyncMock(return_value=Mock(title="Backend Engineer", location="Lagos"))
+
+    mock_user_service = Mock()
+    mock_user_service.get_user = AsyncMock(return_value=Mock(first_name="test1"))
+
+    # what get_current_user really hands the route
+    principal = UserPrincipal(uid=fake_user_id, email_address="test1@example.com", role="USER", is_verified=True)
+    monkeypatch.setitem(app.dependency_overrides, get_current_user, lambda: principal)
 
     mock_service = Mock()
     mock_service.create_application = AsyncMock(return_value={
@@ -139,12 +164,14 @@ async def test_create_application_success(fake_session, test_client, monkeypatch
         "uid": fake_job_uid,
         "user_uid": fake_user_id,
         "job_uid": create_job_id,
-        "created_at": "2025-06-22T00:00:00Z" 
+        "created_at": "2025-06-22T00:00:00Z",
+        "updated_at": "2025-06-22T00:00:00Z" 
     })
 
     #patch the mock_service to the actual job_service
     monkeypatch.setattr(app_module, "apps", mock_service)
     monkeypatch.setattr(app_module, "job_service", mock_job_service)
+    monkeypatch.setattr(app_module, "user_service", mock_user_service)
 
     apps_create = ApplicationCreate(**app_create_payload)
 
@@ -155,7 +182,16 @@ async def test_create_application_success(fake_session, test_client, monkeypatch
 
     assert data["cover_letter"] == "fourth message"
     mock_service.create_application.assert_awaited
-    mock_service.create_application.assert_awaited_once_with(apps_create, fake_user_id, create_job_id, fake_session)
+    mock_service.create_application.assert_awaited_once_with(apps_create, principal.uid, create_job_id, fake_session)
+    mock_user_service.get_user.assert_awaited_once_with(principal.uid, fake_session)
+
+    # the confirmation email is queued in the application's transaction, for the worker to render
+    queued = [call.args[0] for call in fake_session.add.call_args_list if isinstance(call.args[0], OutboxMessage)]
+    assert queued[-1].payload == {
+        "recipients": ["test1@example.com"],
+        "template": "application_received",
+        "context": {"first_name": "test1", "job_title": "Backend Engineer", "location": "Lagos"},
+    }
 
 @pytest.mark.asyncio
 async def test_create_application_not_found(fake_session, test_client, monkeypatch):
@@ -177,7 +213,8 @@ async def test_create_application_not_found(fake_session, test_client, monkeypat
         "uid": fake_job_uid,
         "user_uid": fake_user_id,
         "job_uid": create_job_id,
-        "created_at": "2025-06-22T00:00:00Z" 
+        "created_at": "2025-06-22T00:00:00Z",
+        "updated_at": "2025-06-22T00:00:00Z" 
     })
 
     #patch the mock_service to the actual job_service
@@ -193,6 +230,30 @@ async def test_create_application_not_found(fake_session, test_client, monkeypat
     assert data["message"] == "Job not found"
     
 
+@pytest.mark.asyncio
+async def test_create_application_deleted_applicant(fake_session, test_client, monkeypatch):
+
+    mock_job_service = Mock()
+    mock_job_service.get_job_by_id = AsyncMock(return_value=Mock(title="Backend Engineer", location="Lagos"))
+
+    mock_user_service = Mock()
+    mock_user_service.get_user = AsyncMock(return_value=None)
+
+    mock_service = Mock()
+    mock_service.create_application = AsyncMock()
+
+    monkeypatch.setattr(app_module, "apps", mock_service)
+    monkeypatch.setattr(app_module, "job_service", mock_job_service)
+    monkeypatch.setattr(app_module, "user_service", mock_user_service)
+    fake_session.add.reset_mock()
+
+    response = test_client.post(url=f"/api/v1/applications?job_id={fake_job_uid}", json={"cover_letter": "fourth message"})
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert response.json()["error_code"] == "user_not_found"
+    mock_service.create_application.assert_not_awaited()
+    assert not [call for call in fake_session.add.call_args_list if isinstance(call.args[0], OutboxMessage)]
+
 @pytest.mark.asyncio
 async def test_get_user_applications(fake_session, test_client, monkeypatch):
 
@@ -202,7 +263,8 @@ async def test_get_user_applications(fake_session, test_client, monkeypatch):
         "cover_letter": "applying again application",
         "user_uid": fake_user_id,
         "job_uid": fake_job_uid,
-        "created_at": "2025-07-04T21:04:18.621092Z"
+        "created_at": "2025-07-04T21:04:18.621092Z",
+        "updated_at": "2025-07-04T21:04:18.621092Z"
     }
     ]
 
@@ -270,23 +332,20 @@ async def test_get_application_not_found(fake_session, test_client, monkeypatch)
 @pytest.mark.asyncio
 async def test_update_application_success(fake_session, test_client, monkeypatch):
 
-    #mock existing application to be updated
-    fake_existing_application = Mock()
-    fake_existing_application.user_uid = fake_user_id
-
     update_payload = {
         "cover_letter": "updated application"
     }
 
     #mocking service
     mock_service = Mock()
-    mock_service.get_application_by_id = AsyncMock(return_value=fake_existing_application)
+    mock_service.application_exists = AsyncMock()
     mock_service.update_application = AsyncMock(return_value={
         **update_payload,
         "uid": fake_app_uid,
         "user_uid": fake_user_id,
         "job_uid": fake_job_uid,
-        "created_at": "2025-07-04T21:04:18.621092Z"
+        "created_at": "2025-07-04T21:04:18.621092Z",
+        "updated_at": "2025-07-04T21:04:18.621092Z"
     })
 
     #making patch of the mocked service to actual job_service
@@ -300,27 +359,22 @@ async def test_update_application_success(fake_session, test_client, monkeypatch
     assert data["user_uid"] == fake_user_id
     assert data["uid"] == str(fake_app_uid)
 
-    mock_service.get_application_by_id.assert_awaited()
     mock_service.update_application.assert_awaited()
-    mock_service.get_application_by_id.assert_awaited_once_with(str(fake_app_uid), fake_session)
-    mock_service.update_application.assert_awaited_once_with(str(fake_app_uid), ApplicationUpdate(**update_payload), fake_session)
+    mock_service.update_application.assert_awaited_once_with(str(fake_app_uid), ApplicationUpdate(**update_payload), fake_session, fake_user_id)
+    mock_service.application_exists.assert_not_awaited()
 
 
 @pytest.mark.asyncio
 async def test_update_application_not_found(fake_session, test_client, monkeypatch):
 
-    #mock existing application to be updated
-    fake_existing_application = Mock()
-    fake_existing_application.uid = uuid4()
-    fake_existing_application.user_uid = fake_user_id
-
     update_payload = {
         "cover_letter": "updated application"
     }
 
     #mocking service
     mock_service = Mock()
-    mock_service.get_application_by_id = AsyncMock(return_value=None)
+    mock_service.update_application = AsyncMock(return_value=None)
+    mock_service.application_exists = AsyncMock(return_value=False)
 
     #making patch of the mocked service to actual job_service
     monkeypatch.setattr(app_module, "apps", mock_service)
@@ -331,19 +385,34 @@ async def test_update_application_not_found(fake_session, test_client, monkeypat
     data = response.json()
     assert data["message"] == "Application not found"
 
+    mock_service.application_exists.assert_awaited_once_with(str(fake_app_uid), fake_session)
 
-    mock_service.get_application_by_id.assert_awaited()
-    mock_service.get_application_by_id.assert_awaited_once_with(str(fake_app_uid), fake_session)
+@pytest.mark.asyncio
+async def test_update_application_not_authorized(fake_session, test_client, monkeypatch):
+
+    update_payload = {
+        "cover_letter": "updated application"
+    }
+
+    #the application exists but belongs to another user
+    mock_service = Mock()
+    mock_service.update_application = AsyncMock(return_value=None)
+    mock_service.application_exists = AsyncMock(return_value=True)
+
+    monkeypatch.setattr(app_module, "apps", mock_service)
+
+    response = test_client.put(url=f"api/v1/applications/{fake_app_uid}?application_id={fake_app_uid}", json=update_payload)
+
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    data = response.json()
+    assert data["message"] == "You do not have the permission to continue!"
 
 @pytest.mark.asyncio
 async def test_delete_application_success(fake_session, test_client, monkeypatch):
 
-    mock_application = Mock()
-    mock_application.user_uid = fake_user_id
-
     mock_service = Mock()
-    mock_service.get_application_by_id = AsyncMock(return_value=mock_application)
-    mock_service.delete_application = AsyncMock(return_value=None)
+    mock_service.delete_application = AsyncMock(return_value=fake_app_uid)
+    mock_service.application_exists = AsyncMock()
 
     monkeypatch.setattr(app_module, "apps", mock_service)
 
@@ -351,23 +420,19 @@ async def test_delete_application_success(fake_session, test_client, monkeypatch
 
     assert response.status_code == status.HTTP_204_NO_CONTENT
 
-    mock_service.get_application_by_id.assert_awaited_once_with(str(fake_app_uid), fake_session)
-    mock_service.delete_application.assert_awaited_once_with(str(fake_app_uid), fake_session)
+    mock_service.delete_application.assert_awaited_once_with(str(fake_app_uid), fake_session, fake_user_id)
+    mock_service.application_exists.assert_not_awaited()
 
 
 @pytest.mark.asyncio
 async def test_delete_application_not_found(fake_session, test_client, monkeypatch):
 
-    mock_application = Mock()
-    mock_application.uid = uuid4()
-
     mock_service = Mock()
-    mock_service.get_application_by_id = AsyncMock(return_value=None)
+    mock_service.delete_application = AsyncMock(return_value=None)
+    mock_service.application_exists = AsyncMock(return_value=False)
 
     monkeypatch.setattr(app_module, "apps", mock_service)
 
     response = test_client.delete(url=f"api/v1/applications/{fake_app_uid}?application_id={fake_app_uid}")
 
     assert response.status_code == status.HTTP_404_NOT_FOUND
-
-    mock_service.get_application_by_id.assert_awaited_once_with(str(fake_app_uid), fake_session)
\ No newline at end of file
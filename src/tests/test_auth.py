@@ -1,8 +1,14 @@
 import pytest
 from fastapi import status
-from unittest.mock import Mock
+from unittest.mock import AsyncMock, Mock
 from src.app.schemas import UserCreate
+from src.app.models import OutboxMessage
 from src.app.auth import auth as auth_module
+from src.app.auth import hashing
+from src.app.auth import dependencies as dependencies_module
+from src.app.auth.utils import create_access_token, verify_access_token
+from src.app import errors
+from starlette.requests import Request
 
 BASE_URL = f"/api/v1"
 
@@ -32,6 +38,10 @@ async def test_user_creation(fake_session, fake_user_service, test_client):
     assert fake_user_service.create_user_called_once_with(signup_data, fake_session)
     assert response.json()["message"].startswith("Account has been created successfuly!")
 
+    # the verification email rides in the signup transaction instead of going straight to the broker
+    queued = [call.args[0] for call in fake_session.add.call_args_list if isinstance(call.args[0], OutboxMessage)]
+    assert queued[-1].payload["recipients"] == [user_data["email_address"]]
+
 
 def test_send_email(fake_celery, test_client):
     payload = {"addresses": ["user@example.com"]}
@@ -81,10 +91,113 @@ def test_login_wrong_password(fake_user_service, test_client, monkeypatch):
     fake_user.hashed_password = "hashed_pw"
 
     fake_user_service.get_user_by_email.return_value = fake_user
-    monkeypatch.setattr(auth_module, "verify_password", lambda p, h: False)
+    monkeypatch.setattr(auth_module, "verify_password", AsyncMock(return_value=False))
 
     payload = {"email_address": "user@example.com", "password": "wrong"}
 
     response = test_client.post(f"{BASE_URL}/login", json=payload)
 
     assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_login_rehashes_outdated_password(fake_user_service, test_client, fake_auth_helpers, monkeypatch):
+    fake_user = Mock()
+    fake_user.email_address = "user@example.com"
+    fake_user.uid = "123"
+    fake_user.role = "user"
+    fake_user.hashed_password = "old_hash"
+
+    fake_user_service.get_user_by_email.return_value = fake_user
+    fake_user_service.update_user_info = AsyncMock()
+    monkeypatch.setattr(auth_module.Config, "PASSWORD_REHASH_ON_LOGIN", True)
+    monkeypatch.setattr(auth_module, "password_needs_rehash", lambda h: True)
+    monkeypatch.setattr(auth_module, "hash_password", AsyncMock(return_value="new_hash"))
+
+    payload = {"email_address": "user@example.com", "password": "correct"}
+
+    response = test_client.post(f"{BASE_URL}/login", json=payload)
+
+    assert response.status_code == status.HTTP_200_OK
+    args, kwargs = fake_user_service.update_user_info.await_args
+    assert args[0] is fake_user
+    assert args[1] == {"hashed_password": "new_hash"}
+
+
+@pytest.mark.asyncio
+async def test_password_hasher_rejects_when_queue_is_full():
+    hasher = hashing.PasswordHasher(max_workers=1, queue_limit=1)
+    hasher.pending = 1
+
+    with pytest.raises(errors.ServiceBusy):
+        await hasher.run(lambda: "hashed")
+
+    hasher.pending = 0
+    assert await hasher.run(lambda: "hashed") == "hashed"
+
+
+def make_bearer_request(token: str):
+    return Request({"type": "http", "headers": [(b"authorization", f"Bearer {token}".encode())]})
+
+
+@pytest.mark.asyncio
+async def test_access_pass_decodes_token_once_per_request(monkeypatch):
+    decode = Mock(side_effect=verify_access_token)
+    blocklist = AsyncMock(return_value=False)
+    monkeypatch.setattr(dependencies_module, "verify_access_token", decode)
+    monkeypatch.setattr(dependencies_module, "token_in_blocklist", blocklist)
+
+    token = create_access_token({"user_uid": "123"})
+    request = make_bearer_request(token)
+
+    first = await dependencies_module.access_token_bearer(request)
+    second = await dependencies_module.AccessTokenBearer()(request)
+
+    assert first is second is request.state.token_data
+    decode.assert_called_once_with(token)
+    blocklist.assert_awaited_once()
+
+    with pytest.raises(errors.RefreshToken):
+        await dependencies_module.refresh_token_bearer(request)
+
+
+@pytest.mark.asyncio
+async def test_access_pass_rejects_tampered_token(monkeypatch):
+    monkeypatch.setattr(dependencies_module, "token_in_blocklist", AsyncMock(return_value=False))
+
+    token = create_access_token({"user_uid": "123"})
+    request = make_bearer_request(token[:-2] + ("aa" if not token.endswith("aa") else "bb"))
+
+    with pytest.raises(errors.InvalidToken):
+        await dependencies_module.access_token_bearer(request)
+
+
+def test_password_reset_request_queues_one_email_per_window(fake_session, test_client, monkeypatch):
+    claims = iter([True, False])
+    monkeypatch.setattr(auth_module, "claim_password_reset_email", AsyncMock(side_effect=lambda email, window: next(claims)))
+    monkeypatch.setattr(fake_session, "add", Mock())
+    monkeypatch.setattr(fake_session, "commit", AsyncMock())
+
+    for _ in range(2):
+        response = test_client.post(f"{BASE_URL}/password-reset-request", json={"email_address": "user@example.com"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["message"].startswith("Please check your email")
+
+    [call] = fake_session.add.call_args_list
+    assert isinstance(call.args[0], OutboxMessage)
+    assert call.args[0].payload["recipients"] == ["user@example.com"]
+    assert call.args[0].payload["template"] == "password_reset"
+    fake_session.commit.assert_awaited_once()
+
+
+def test_password_reset_claim_is_released_when_the_email_is_not_queued(fake_session, test_client, monkeypatch):
+    release = AsyncMock()
+    monkeypatch.setattr(auth_module, "claim_password_reset_email", AsyncMock(return_value=True))
+    monkeypatch.setattr(auth_module, "release_password_reset_email", release)
+    monkeypatch.setattr(fake_session, "add", Mock())
+    monkeypatch.setattr(fake_session, "commit", AsyncMock(side_effect=ConnectionError("database is down")))
+
+    with pytest.raises(ConnectionError):
+        test_client.post(f"{BASE_URL}/password-reset-request", json={"email_address": "user@example.com"})
+
+    release.assert_awaited_once_with("user@example.com")
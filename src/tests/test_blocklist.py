@@ -0,0 +1,177 @@
+import time
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, Mock
+from uuid import uuid4
+from src.db import redis as redis_module
+from src.db.bloom import BloomFilter
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    items = [str(uuid4()) for _ in range(1000)]
+
+    for item in items:
+        bloom.add(item)
+
+    assert all(item in bloom for item in items)
+    # well under 5% false positives at capacity
+    assert sum(str(uuid4()) in bloom for _ in range(1000)) < 50
+
+
+@pytest.fixture
+def blocklist(monkeypatch):
+    client = AsyncMock()
+    monkeypatch.setattr(redis_module, "token_blocklist", client)
+    monkeypatch.setattr(redis_module, "publish", AsyncMock())
+    monkeypatch.setattr(redis_module, "revoked_tokens", BloomFilter(1000))
+    redis_module.revoked_tokens_synced.set()
+    yield client
+    redis_module.revoked_tokens_synced.clear()
+
+
+@pytest.mark.asyncio
+async def test_unrevoked_token_skips_redis(blocklist):
+    assert await redis_module.token_in_blocklist(str(uuid4())) is False
+    blocklist.get.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_revoked_token_is_confirmed_in_redis(blocklist):
+    jti = str(uuid4())
+    exp = int(time.time()) + 120
+
+    await redis_module.add_token_to_blocklist(jti, exp)
+
+    ttl = blocklist.set.await_args.kwargs["ex"]
+    assert 118 <= ttl <= 120
+    redis_module.publish.assert_awaited_once_with(redis_module.BLOCKLIST_CHANNEL, jti)
+
+    blocklist.get.return_value = b""
+    assert await redis_module.token_in_blocklist(jti) is True
+    blocklist.get.assert_awaited_once_with(jti)
+
+
+@pytest.mark.asyncio
+async def test_unsynced_filter_falls_back_to_redis(blocklist):
+    redis_module.revoked_tokens_synced.clear()
+    blocklist.get.return_value = b""
+
+    assert await redis_module.token_in_blocklist(str(uuid4())) is True
+    blocklist.get.assert_awaited_once()
+
+
+class FakePubSub:
+    def __init__(self, messages):
+        self.messages = messages
+        self.subscribe = AsyncMock()
+        self.aclose = AsyncMock()
+
+    async def listen(self):
+        for message in self.messages:
+            yield message
+
+        raise asyncio.CancelledError()
+
+
+@pytest.mark.asyncio
+async def test_failing_handler_does_not_stop_the_listener(monkeypatch):
+    received = []
+    pubsub = FakePubSub([
+        {"type": "message", "channel": b"broken", "data": b"first"},
+        {"type": "message", "channel": b"working", "data": b"second"},
+    ])
+
+    monkeypatch.setattr(redis_module, "pubsub_client", Mock(pubsub=Mock(return_value=pubsub)))
+    monkeypatch.setattr(redis_module, "channel_handlers", {"broken": Mock(side_effect=ValueError("bad")), "working": received.append})
+    monkeypatch.setattr(redis_module, "connect_hooks", [])
+    monkeypatch.setattr(redis_module, "disconnect_hooks", [])
+
+    with pytest.raises(asyncio.CancelledError):
+        await redis_module.listen_for_messages(retry_delay=0)
+
+    assert received == ["second"]
+
+
+@pytest.mark.asyncio
+async def test_revocation_survives_a_failed_announcement(blocklist):
+    jti = str(uuid4())
+    redis_module.publish.side_effect = redis_module.redis.ConnectionError("down")
+
+    await redis_module.add_token_to_blocklist(jti)
+
+    blocklist.set.assert_awaited_once()
+    assert jti in redis_module.revoked_tokens
+    # lookups go to Redis until the filter is rebuilt
+    assert not redis_module.revoked_tokens_synced.is_set()
+
+
+def scan_keys(*jtis, during_scan=None):
+    async def scan_iter(**kwargs):
+        for jti in jtis:
+            if during_scan is not None:
+                during_scan()
+            yield jti.encode()
+
+    return scan_iter
+
+
+@pytest.mark.asyncio
+async def test_rebuild_drops_expired_revocations(blocklist, monkeypatch):
+    expired, live = str(uuid4()), str(uuid4())
+    redis_module.remember_revoked_token(expired)
+    blocklist.scan_iter = scan_keys(live)
+    monkeypatch.setattr(redis_module, "listener_subscribed", True)
+    redis_module.revoked_tokens_synced.clear()
+
+    await redis_module.load_token_blocklist()
+
+    assert live in redis_module.revoked_tokens
+    assert expired not in redis_module.revoked_tokens
+    assert redis_module.revoked_tokens_synced.is_set()
+
+
+@pytest.mark.asyncio
+async def test_rebuild_without_a_listener_is_not_trusted(blocklist, monkeypatch):
+    blocklist.scan_iter = scan_keys(str(uuid4()))
+    monkeypatch.setattr(redis_module, "listener_subscribed", False)
+    redis_module.revoked_tokens_synced.clear()
+
+    await redis_module.load_token_blocklist()
+
+    assert not redis_module.revoked_tokens_synced.is_set()
+
+
+@pytest.mark.asyncio
+async def test_rebuild_spanning_a_resubscribe_is_discarded(blocklist, monkeypatch):
+    stale = redis_module.revoked_tokens
+    monkeypatch.setattr(redis_module, "listener_subscribed", True)
+    monkeypatch.setattr(redis_module, "listener_generation", 1)
+
+    def resubscribe():
+        redis_module.listener_generation = 2
+
+    blocklist.scan_iter = scan_keys(str(uuid4()), during_scan=resubscribe)
+
+    await redis_module.load_token_blocklist()
+
+    assert redis_module.revoked_tokens is stale
+    assert redis_module.rebuilding_filters == []
+
+
+@pytest.mark.asyncio
+async def test_periodic_rebuild_waits_for_the_listener(monkeypatch):
+    load = AsyncMock(side_effect=[redis_module.redis.ConnectionError("down"), asyncio.CancelledError()])
+    monkeypatch.setattr(redis_module, "load_token_blocklist", load)
+    monkeypatch.setattr(redis_module, "listener_subscribed", False)
+
+    task = asyncio.ensure_future(redis_module.rebuild_token_blocklist(interval=0))
+    await asyncio.sleep(0.01)
+    load.assert_not_awaited()
+
+    monkeypatch.setattr(redis_module, "listener_subscribed", True)
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    # a failed rebuild is retried on the next tick
+    assert load.await_count == 2
@@ -0,0 +1,250 @@
+import asyncio
+import json
+import pytest
+from unittest.mock import AsyncMock, Mock
+from uuid import uuid4
+from redis.exceptions import ConnectionError
+from src.app import cache as cache_module
+from src.app import cdn as cdn_module
+from src.app import errors
+from src.app.auth import dependencies as dependencies_module
+from src.app.cache import TTLCache, ResponseCache, RELEASE_FILL_LOCK
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    assert cache.get("a") == 1
+
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_ttl_cache_expires_entries(monkeypatch):
+    now = 1000.0
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now)
+    cache = TTLCache(maxsize=10, ttl=5)
+    cache.set("a", 1)
+
+    now += 5
+
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_invalidate_user_drops_local_entry_and_publishes(monkeypatch):
+    user_uid = uuid4()
+    publish = AsyncMock()
+    monkeypatch.setattr(cache_module, "publish", publish)
+    cache_module.user_principal_cache.set(str(user_uid), Mock())
+
+    await cache_module.invalidate_user(user_uid)
+
+    assert cache_module.user_principal_cache.get(str(user_uid)) is None
+    publish.assert_awaited_once_with(cache_module.USER_INVALIDATION_CHANNEL, str(user_uid))
+
+
+@pytest.mark.asyncio
+async def test_invalidate_user_survives_redis_outage(monkeypatch):
+    monkeypatch.setattr(cache_module, "publish", AsyncMock(side_effect=ConnectionError("down")))
+    cache_module.user_principal_cache.set("some-user", Mock())
+
+    await cache_module.invalidate_user("some-user")
+
+    assert cache_module.user_principal_cache.get("some-user") is None
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_is_served_from_cache(monkeypatch):
+    user_uid = str(uuid4())
+    db_user = Mock(uid=user_uid, email_address="user@example.com", role="USER", is_verified=True)
+    mock_service = Mock()
+    mock_service.get_user = AsyncMock(return_value=db_user)
+    monkeypatch.setattr(dependencies_module, "user_service", mock_service)
+    monkeypatch.setattr(dependencies_module, "user_principal_cache", TTLCache(maxsize=10, ttl=60))
+
+    token_details = {"user": {"user_uid": user_uid}}
+    session = Mock()
+
+    first = await dependencies_module.get_current_user(token_details, session)
+    second = await dependencies_module.get_current_user(token_details, session)
+
+    assert first == second
+    assert str(first.uid) == user_uid
+    mock_service.get_user.assert_awaited_once_with(user_uid, session)
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_deleted_user(monkeypatch):
+    mock_service = Mock()
+    mock_service.get_user = AsyncMock(return_value=None)
+    monkeypatch.setattr(dependencies_module, "user_service", mock_service)
+    monkeypatch.setattr(dependencies_module, "user_principal_cache", TTLCache(maxsize=10, ttl=60))
+
+    with pytest.raises(errors.UserNotFound):
+        await dependencies_module.get_current_user({"user": {"user_uid": str(uuid4())}}, Mock())
+
+
+@pytest.mark.asyncio
+async def test_response_cache_counts_hits_and_misses():
+    client = Mock()
+    client.hgetall = AsyncMock(side_effect=[{}, {b"body": b"[]", b"headers": b'{"X-Next-Cursor": "abc"}'}])
+    cache = ResponseCache(client, prefix="test", ttl=30)
+
+    assert await cache.get("test:list:1") is None
+    response = await cache.get("test:list:1")
+
+    assert response.body == b"[]"
+    assert response.headers["X-Next-Cursor"] == "abc"
+    assert cache.stats["misses"] == 1
+    assert cache.stats["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_response_cache_treats_redis_errors_as_miss():
+    client = Mock()
+    client.hgetall = AsyncMock(side_effect=ConnectionError("down"))
+    cache = ResponseCache(client, prefix="test", ttl=30)
+
+    assert await cache.get("test:list:1") is None
+    assert cache.stats["errors"] == 1
+
+
+@pytest.mark.asyncio
+async def test_response_cache_waits_for_other_workers_fill():
+    client = Mock()
+    entry = {b"body": b'{"uid": "1"}', b"headers": b"{}"}
+    client.hgetall = AsyncMock(side_effect=[{}, {}, entry])
+    client.set = AsyncMock(return_value=None)  # another worker holds the fill lock
+    client.exists = AsyncMock(return_value=1)
+    cache = ResponseCache(client, prefix="test", ttl=30, fill_lock_ttl=1)
+    load = AsyncMock()
+
+    response = await cache.get_or_load("test:detail:1", load)
+
+    assert response.body == entry[b"body"]
+    load.assert_not_awaited()
+    assert cache.stats["lock_waits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_response_cache_loads_and_releases_fill_lock():
+    client = Mock()
+    client.hgetall = AsyncMock(return_value={})
+    client.set = AsyncMock(return_value=True)
+    client.eval = AsyncMock()
+    cache = ResponseCache(client, prefix="test", ttl=30, fill_lock_ttl=1)
+    cache.set = AsyncMock()
+    load = AsyncMock(return_value=(b"[]", {}, ["jobs:list"]))
+
+    response = await cache.get_or_load("test:list:1", load)
+
+    assert response.body == b"[]"
+    cache.set.assert_awaited_once_with("test:list:1", b"[]", {}, ["jobs:list"])
+    # released with the token it was taken with
+    token = client.set.await_args.args[1]
+    client.eval.assert_awaited_once_with(RELEASE_FILL_LOCK, 1, cache.lock_key("test:list:1"), token)
+
+
+def slow_load(body=b"[]"):
+    async def load():
+        await asyncio.sleep(0.02)
+        return body, {"X-Total-Count": "0"}, ["jobs:list"]
+
+    return AsyncMock(side_effect=load)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_load_without_redis():
+    client = Mock()
+    client.set = AsyncMock(side_effect=ConnectionError("down"))
+    cache = ResponseCache(client, prefix="test", ttl=30, enabled=False, fill_lock_ttl=1)
+    load = slow_load()
+
+    responses = await asyncio.gather(*(cache.fill("test:list:1", load) for _ in range(20)))
+
+    load.assert_awaited_once()
+    assert all(response.body == b"[]" and response.headers["X-Total-Count"] == "0" for response in responses)
+    assert cache.stats["coalesced"] == 19
+    assert cache.flights == {}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_take_the_fill_lock_once():
+    client = Mock()
+    client.set = AsyncMock(return_value=True)
+    client.eval = AsyncMock()
+    client.pipeline = Mock(side_effect=ConnectionError("down"))
+    cache = ResponseCache(client, prefix="test", ttl=30, fill_lock_ttl=1)
+    load = slow_load()
+
+    await asyncio.gather(*(cache.fill("test:list:1", load) for _ in range(20)))
+
+    load.assert_awaited_once()
+    client.set.assert_awaited_once()
+    client.eval.assert_awaited_once()
+    # nobody polled Redis for the entry
+    assert cache.stats["lock_waits"] == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_request_does_not_cancel_the_shared_load():
+    cache = ResponseCache(Mock(), prefix="test", ttl=30, enabled=False)
+    load = slow_load()
+
+    first = asyncio.ensure_future(cache.fill("test:list:1", load))
+    second = asyncio.ensure_future(cache.fill("test:list:1", load))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert (await second).body == b"[]"
+    load.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_failed_load_reaches_every_waiter_and_is_retried():
+    cache = ResponseCache(Mock(), prefix="test", ttl=30, enabled=False)
+    load = AsyncMock(side_effect=[LookupError("boom"), (b"[]", {}, [])])
+
+    results = await asyncio.gather(cache.fill("k", load), cache.fill("k", load), return_exceptions=True)
+
+    assert all(isinstance(result, LookupError) for result in results)
+    assert (await cache.fill("k", load)).body == b"[]"
+
+
+@pytest.mark.asyncio
+async def test_disabled_cache_purges_without_redis():
+    client = Mock()
+    cache = ResponseCache(client, prefix="test", ttl=30, enabled=False)
+
+    await cache.purge("jobs:list")
+
+    assert client.method_calls == []
+    client.pipeline.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_purge_job_tags_reaches_the_cdn(monkeypatch, tmp_path):
+    log = tmp_path / "purges.log"
+    monkeypatch.setattr(cdn_module, "cdn_purger", cdn_module.FileLoggingPurger(str(log)))
+    monkeypatch.setattr(cache_module.job_cache, "purge", AsyncMock())
+
+    await cache_module.purge_job_tags("jobs:list", "job:1")
+
+    cache_module.job_cache.purge.assert_awaited_once_with("jobs:list", "job:1")
+    assert json.loads(log.read_text())["keys"] == ["job:1", "jobs:list"]
+
+
+@pytest.mark.asyncio
+async def test_failed_cdn_purge_does_not_fail_the_write(monkeypatch):
+    failing = Mock()
+    failing.purge = AsyncMock(side_effect=RuntimeError("cdn down"))
+    monkeypatch.setattr(cdn_module, "cdn_purger", failing)
+
+    await cdn_module.purge_surrogate_keys("jobs:list")
@@ -0,0 +1,46 @@
+import json
+import asyncio
+import asyncpg
+import pytest
+from unittest.mock import Mock
+from src.db import change_feed
+from src.app.cache import user_principal_cache
+
+
+def test_dispatch_calls_handlers_of_the_table(monkeypatch):
+    monkeypatch.setattr(change_feed, "change_handlers", {"jobs": [Mock()], "users": [Mock()]})
+
+    change_feed.dispatch(json.dumps({"table": "jobs", "op": "UPDATE", "uid": "abc"}))
+
+    change_feed.change_handlers["jobs"][0].assert_called_once_with("abc", "UPDATE")
+    change_feed.change_handlers["users"][0].assert_not_called()
+
+
+def test_dispatch_ignores_malformed_events(monkeypatch):
+    handler = Mock()
+    monkeypatch.setattr(change_feed, "change_handlers", {"jobs": [handler]})
+
+    change_feed.dispatch("not json")
+    change_feed.dispatch(json.dumps({"table": "jobs"}))
+
+    handler.assert_not_called()
+
+
+def test_user_change_evicts_cached_principal():
+    user_principal_cache.set("some-user", Mock())
+
+    change_feed.dispatch(json.dumps({"table": "users", "op": "UPDATE", "uid": "some-user"}))
+
+    assert user_principal_cache.get("some-user") is None
+
+
+@pytest.mark.asyncio
+async def test_listener_retries_after_unexpected_errors(monkeypatch):
+    # an InterfaceError, then some other bug, then stop the loop
+    connect = Mock(side_effect=[asyncpg.InterfaceError("connection is closed"), RuntimeError("boom"), asyncio.CancelledError()])
+    monkeypatch.setattr(change_feed.asyncpg, "connect", connect)
+
+    with pytest.raises(asyncio.CancelledError):
+        await change_feed.listen_for_changes(retry_delay=0)
+
+    assert connect.call_count == 3
@@ -0,0 +1,108 @@
+import json
+import pytest
+from unittest.mock import Mock
+from src.app import counting
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.app.models import Job
+from src.app.schemas import JobType, SalaryFilter, SalaryPeriod
+from src.app.services import job_service
+from src.tests.test_query_plans import plan_connection
+
+
+class ScriptedSession:
+    """Answers the probe, pg_class and EXPLAIN queries with canned values"""
+    def __init__(self, probe=0, reltuples=None, plan_rows=0):
+        self.probe = probe
+        self.reltuples = reltuples
+        self.plan_rows = plan_rows
+        self.statements = []
+
+    async def exec(self, statement):
+        sql = str(statement)
+        self.statements.append(sql)
+        result = Mock()
+
+        if sql.startswith("EXPLAIN"):
+            result.scalar.return_value = json.dumps([{"Plan": {"Plan Rows": self.plan_rows}}])
+        elif "pg_class" in sql:
+            result.scalar.return_value = self.reltuples
+        else:
+            result.one.return_value = (self.probe,)
+
+        return result
+
+
+@pytest.fixture(autouse=True)
+def auto_mode(monkeypatch):
+    monkeypatch.setattr(counting.Config, "TOTAL_COUNT_MODE", "auto")
+    monkeypatch.setattr(counting.Config, "TOTAL_COUNT_EXACT_LIMIT", 100)
+
+
+@pytest.mark.asyncio
+async def test_small_sets_are_counted_exactly():
+    session = ScriptedSession(probe=42)
+
+    assert await counting.count_rows(session, Job, Job.is_active) == (42, True)
+    assert len(session.statements) == 1
+    assert "LIMIT" in session.statements[0]
+
+
+@pytest.mark.asyncio
+async def test_large_unfiltered_sets_use_table_statistics():
+    session = ScriptedSession(probe=101, reltuples=2_500_000.0)
+
+    assert await counting.count_rows(session, Job) == (2_500_000, False)
+    assert not any(sql.startswith("EXPLAIN") for sql in session.statements)
+
+
+@pytest.mark.asyncio
+async def test_unanalyzed_tables_fall_back_to_the_planner():
+    session = ScriptedSession(probe=101, reltuples=-1.0, plan_rows=5000)
+
+    assert await counting.count_rows(session, Job) == (5000, False)
+
+
+@pytest.mark.asyncio
+async def test_large_filtered_sets_use_the_plan_estimate():
+    session = ScriptedSession(probe=101, plan_rows=30000)
+
+    assert await counting.count_rows(session, Job, Job.is_active) == (30000, False)
+    assert not any("pg_class" in sql for sql in session.statements)
+
+
+@pytest.mark.asyncio
+async def test_estimate_never_undercuts_the_probe():
+    # statistics from before a bulk insert
+    session = ScriptedSession(probe=101, plan_rows=3)
+
+    assert await counting.count_rows(session, Job, Job.is_active) == (101, False)
+
+
+@pytest.mark.asyncio
+async def test_exact_mode_counts_without_a_limit(monkeypatch):
+    monkeypatch.setattr(counting.Config, "TOTAL_COUNT_MODE", "exact")
+    session = ScriptedSession(probe=2_500_000)
+
+    assert await counting.count_rows(session, Job) == (2_500_000, True)
+    assert "LIMIT" not in session.statements[0]
+
+
+@pytest.mark.asyncio
+async def test_estimate_mode_skips_the_probe(monkeypatch):
+    monkeypatch.setattr(counting.Config, "TOTAL_COUNT_MODE", "estimate")
+    session = ScriptedSession(probe=1, reltuples=10.0)
+
+    assert await counting.count_rows(session, Job) == (10, False)
+    assert len(session.statements) == 1
+
+
+@pytest.mark.asyncio
+async def test_plan_estimate_binds_filter_values():
+    # a ":word" in a value used to be read back as a bind parameter of the EXPLAIN
+    salary = SalaryFilter(currency=":ab", salary_min=1000, period=SalaryPeriod.YEAR)
+
+    async with plan_connection() as conn:
+        session = AsyncSession(bind=conn)
+        estimate = await counting.estimate_rows(session, Job, *job_service.job_filters(None, JobType.FULL_TIME, None, salary))
+
+    assert estimate >= 0
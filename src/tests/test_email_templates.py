@@ -0,0 +1,56 @@
+import pytest
+from jinja2 import UndefinedError
+from src.app import email_templates
+from src.app.email_templates import render_email, render_message, email_message
+from src.app.smtp_pool import create_email
+
+
+def test_every_template_compiles_once():
+    email_templates.get_template.cache_clear()
+
+    email_templates.load_templates()
+    email_templates.load_templates()
+
+    assert email_templates.get_template.cache_info().currsize == len(email_templates.EMAIL_TEMPLATES)
+
+
+def test_verification_email():
+    subject, body = render_email("verify_email", {"link": "http://localhost/verify/abc"})
+
+    assert subject == "Verify your email"
+    assert '<a href="http://localhost/verify/abc">link</a>' in body
+
+
+def test_context_is_escaped_in_the_body_but_not_the_subject():
+    subject, body = render_email("application_received", {"first_name": "<b>Ada</b>", "job_title": "R&D Lead", "location": "Lagos"})
+
+    assert subject == "Application received: R&D Lead"
+    assert "&lt;b&gt;Ada&lt;/b&gt;" in body
+    assert "R&amp;D Lead" in body
+
+
+def test_job_alert_lists_every_job():
+    jobs = [{"title": f"Job {i}", "location": "Abuja", "salary": None, "link": f"http://localhost/jobs/{i}"} for i in range(3)]
+
+    subject, body = render_email("job_alert", {"first_name": "Ada", "jobs": jobs})
+
+    assert subject == "3 new jobs for you"
+    assert all(f'<a href="http://localhost/jobs/{i}">Job {i}</a>' in body for i in range(3))
+    assert render_email("job_alert", {"first_name": "Ada", "jobs": jobs[:1]})[0] == "1 new job for you"
+
+
+def test_missing_context_is_an_error():
+    with pytest.raises(UndefinedError):
+        render_email("password_reset", {})
+
+
+def test_ready_made_messages_pass_through():
+    assert render_message({"recipients": ["a@example.com"], "subject": "Hi", "body": "<p>hi</p>"}) == ("Hi", "<p>hi</p>")
+    assert render_message(email_message(["a@example.com"], "password_reset", link="x"))[0] == "Password reset"
+
+
+def test_subject_stays_on_one_line():
+    subject, _ = render_email("application_received", {"first_name": "Ada", "job_title": "Backend\r\nBcc: everyone@example.com", "location": "Lagos"})
+
+    assert subject == "Application received: Backend Bcc: everyone@example.com"
+    assert create_email(["a@example.com"], subject, "<p>hi</p>")["Subject"] == subject
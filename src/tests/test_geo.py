@@ -0,0 +1,59 @@
+import math
+import random
+import pytest
+from src.app.geo import resolve_location, location_columns, geohash_encode, covering_geohashes, Coordinates, EARTH_RADIUS_KM
+
+
+def test_geohash_encode():
+    assert geohash_encode(57.64911, 10.40744, 11) == "u4pruydqqvj"
+    assert geohash_encode(6.5244, 3.3792, 5) == "s14mh"
+
+
+@pytest.mark.parametrize("location, place", [
+    ("Lagos", "lagos"),
+    ("Ikeja, Lagos, Nigeria", "ikeja"),
+    ("LAGOS STATE", "lagos"),
+    ("Hybrid - Abuja", "abuja"),
+    ("Bengaluru (India)", "bangalore"),
+])
+def test_resolve_location(location, place):
+    assert resolve_location(location) == resolve_location(place)
+    assert resolve_location(location) is not None
+
+
+@pytest.mark.parametrize("location", ["", "Remote", "Anywhere, Earth"])
+def test_unknown_locations_are_not_placed(location):
+    assert resolve_location(location) is None
+    assert location_columns(location) == {"latitude": None, "longitude": None, "geohash": None}
+
+
+def point_at(center: Coordinates, distance_km: float, bearing: float) -> Coordinates:
+    lat, lon = math.radians(center.latitude), math.radians(center.longitude)
+    angle = distance_km / EARTH_RADIUS_KM
+
+    new_lat = math.asin(math.sin(lat) * math.cos(angle) + math.cos(lat) * math.sin(angle) * math.cos(bearing))
+    new_lon = lon + math.atan2(math.sin(bearing) * math.sin(angle) * math.cos(lat), math.cos(angle) - math.sin(lat) * math.sin(new_lat))
+
+    return Coordinates(math.degrees(new_lat), (math.degrees(new_lon) + 540) % 360 - 180)
+
+
+@pytest.mark.parametrize("center, radius_km", [
+    (Coordinates(6.5244, 3.3792), 1),
+    (Coordinates(6.5244, 3.3792), 25),
+    (Coordinates(51.5074, -0.1278), 100),
+    (Coordinates(-33.8688, 151.2093), 500),
+    # across the antimeridian
+    (Coordinates(-17.7134, 179.9), 50),
+])
+def test_covering_cells_contain_every_point_in_the_radius(center, radius_km):
+    cells = covering_geohashes(*center, radius_km)
+    rng = random.Random(radius_km)
+
+    assert 1 <= len(cells) <= 4
+    for _ in range(500):
+        point = point_at(center, radius_km * rng.random(), rng.uniform(0, 2 * math.pi))
+        assert geohash_encode(*point).startswith(tuple(cells))
+
+
+def test_polar_circles_cover_the_globe():
+    assert covering_geohashes(89.9, 0, 50) == []
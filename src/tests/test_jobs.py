@@ -1,12 +1,16 @@
+import json
 import pytest
 from unittest.mock import AsyncMock, Mock
 from typing import Optional
-from fastapi import status
+from fastapi import status, Response
 from fastapi.encoders import jsonable_encoder
 from src.app.router import jobs as job_module
 from uuid import uuid4, UUID
 from src.app.router.jobs import RoleChecker, access_token_bearer
-from src.app.schemas import JobType, WorkMode, JobCreate, JobUpdate
+from src.app import models
+from src.app.schemas import JobType, WorkMode, JobCreate, JobUpdate, Job, SalaryFilter, SalaryPeriod
+from src.app.pagination import encode_cursor, decode_cursor, decode_created_at_cursor, decode_distance_cursor
+from src.app.conditional import validators
 from datetime import datetime
 from src.tests.conftest import FAKE_USER_UID
 
@@ -19,25 +23,35 @@ fake_job_data = [
         "description": "job1",
         "location": "job1",
         "salary": "job1",
+        "salary_min": None,
+        "salary_max": None,
+        "currency": None,
+        "period": None,
         "job_type": "FULL_TIME",
         "work_mode": "HYBRID",
         "is_active": False,
         "uid": "3fa85f64-5717-4562-b3fc-2c963f66afa5",
         "employer_uid": "3fa85f64-5717-4562-b3fc-2c963f66afa6",
-        "created_at": datetime.now()
+        "created_at": datetime.now(),
+        "updated_at": datetime.now()
     },
 
     {
         "title": "job2",
         "description": "job2",
         "location": "job2",
-        "salary": "job2",
+        "salary": "$50k - 70k per year",
+        "salary_min": 50000.0,
+        "salary_max": 70000.0,
+        "currency": "USD",
+        "period": "YEAR",
         "job_type": "FULL_TIME",
         "work_mode": "REMOTE",
         "is_active": True,
         "uid": "3fa85f64-5717-4562-b3fc-2c963f66afa6",
         "employer_uid": "3fa85f64-5717-4562-b3fc-2c963f66afa6",
-        "created_at": datetime.now()
+        "created_at": datetime.now(),
+        "updated_at": datetime.now()
     }
 ]
 
@@ -63,6 +77,7 @@ fake_job ={
   "uid": fake_job_id,
   "employer_uid": "3fa85f64-5717-4562-b3fc-2c963f66afa6",
   "created_at": datetime.now(),
+  "updated_at": datetime.now(),
   "application": []
 }
 
@@ -71,6 +86,7 @@ async def test_get_all_jobs(fake_session, test_client, monkeypatch, skip: int=0,
     # Arrang
     mock_service = Mock()
     mock_service.get_all_jobs = AsyncMock(return_value=fake_job_data)
+    mock_service.count_jobs = AsyncMock(return_value=(2, True))
 
     monkeypatch.setattr(job_module, "job_service", mock_service)
 
@@ -81,13 +97,17 @@ async def test_get_all_jobs(fake_session, test_client, monkeypatch, skip: int=0,
     assert response.status_code == status.HTTP_200_OK
     data = response.json()
     assert data == jsonable_encoder(fake_job_data)
-    mock_service.get_all_jobs.assert_awaited_once_with(fake_session, skip, limit, job_type, work_mode)
+    assert response.headers["X-Total-Count"] == "2"
+    assert response.headers["X-Total-Count-Type"] == "exact"
+    mock_service.get_all_jobs.assert_awaited_once_with(fake_session, skip, limit, job_type, work_mode, None, SalaryFilter())
+    mock_service.count_jobs.assert_awaited_once_with(fake_session, job_type, work_mode, SalaryFilter())
 
 @pytest.mark.asyncio
 async def test_get_all_jobs_with_roles(fake_session, test_client, monkeypatch, skip: int=0, limit:int=10, job_type: Optional[JobType]=None, work_mode: Optional[WorkMode]=None):
     # Arrange
     mock_service = Mock()
     mock_service.get_all_jobs = AsyncMock(return_value=fake_job_data)
+    mock_service.count_jobs = AsyncMock(return_value=(2, True))
 
     monkeypatch.setattr(job_module,"job_service", mock_service)
 
@@ -99,13 +119,91 @@ async def test_get_all_jobs_with_roles(fake_session, test_client, monkeypatch, s
     assert response.status_code == 200
     data = response.json()
     assert data == jsonable_encoder(fake_job_data)
-    mock_service.get_all_jobs.assert_awaited_once_with(fake_session, skip, limit, job_type, work_mode)
+    mock_service.get_all_jobs.assert_awaited_once_with(fake_session, skip, limit, job_type, work_mode, None, SalaryFilter())
+
+@pytest.mark.asyncio
+async def test_get_all_jobs_next_cursor(fake_session, test_client, monkeypatch):
+    # Arrange
+    page = [Job(**job) for job in fake_job_data]
+    mock_service = Mock()
+    mock_service.get_all_jobs = AsyncMock(return_value=page)
+    mock_service.count_jobs = AsyncMock(return_value=(2, True))
+
+    monkeypatch.setattr(job_module, "job_service", mock_service)
+
+    # Act
+    response = test_client.get(f"{BASE_URL}/jobs?limit=2")
+
+    # Assert
+    assert response.status_code == status.HTTP_200_OK
+    created_at, uid = decode_created_at_cursor(response.headers["X-Next-Cursor"])
+    assert created_at == page[-1].created_at
+    assert uid == page[-1].uid
+    mock_service.get_all_jobs.assert_awaited_once_with(fake_session, 0, 2, None, None, None, SalaryFilter())
+
+@pytest.mark.asyncio
+async def test_get_all_jobs_with_cursor(fake_session, test_client, monkeypatch):
+    # Arrange
+    cursor = encode_cursor(datetime.now(), uuid4())
+    mock_service = Mock()
+    mock_service.get_all_jobs = AsyncMock(return_value=fake_job_data)
+    mock_service.count_jobs = AsyncMock(return_value=(2, True))
+
+    monkeypatch.setattr(job_module, "job_service", mock_service)
+
+    # Act
+    response = test_client.get(f"{BASE_URL}/jobs?limit=10&cursor={cursor}")
+
+    # Assert
+    assert response.status_code == status.HTTP_200_OK
+    assert "X-Next-Cursor" not in response.headers
+    mock_service.get_all_jobs.assert_awaited_once_with(fake_session, 0, 10, None, None, cursor, SalaryFilter())
+
+@pytest.mark.asyncio
+async def test_get_all_jobs_invalid_cursor(fake_session, test_client, monkeypatch):
+    # Arrange
+    mock_service = Mock()
+    mock_service.get_all_jobs = AsyncMock(side_effect=lambda *args: decode_created_at_cursor(args[-1]))
+
+    monkeypatch.setattr(job_module, "job_service", mock_service)
+
+    # Act
+    response = test_client.get(f"{BASE_URL}/jobs?limit=10&cursor=not-a-cursor")
+
+    # Assert
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json()["error_code"] == "invalid_cursor"
+
+@pytest.mark.asyncio
+async def test_get_all_jobs_salary_range(fake_session, test_client, monkeypatch):
+    # Arrange
+    mock_service = Mock()
+    mock_service.get_all_jobs = AsyncMock(return_value=fake_job_data[1:])
+    mock_service.count_jobs = AsyncMock(return_value=(1, True))
+
+    monkeypatch.setattr(job_module, "job_service", mock_service)
+
+    # Act
+    response = test_client.get(f"{BASE_URL}/jobs?salary_min=40000&salary_max=60000&currency=USD&period=YEAR")
+
+    # Assert
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()[0]["salary_min"] == 50000.0
+    salary = SalaryFilter(salary_min=40000, salary_max=60000, currency="USD", period=SalaryPeriod.YEAR)
+    mock_service.get_all_jobs.assert_awaited_once_with(fake_session, 0, 10, None, None, None, salary)
+    mock_service.count_jobs.assert_awaited_once_with(fake_session, None, None, salary)
+
+@pytest.mark.asyncio
+async def test_get_all_jobs_rejects_negative_salary(fake_session, test_client, monkeypatch):
+    response = test_client.get(f"{BASE_URL}/jobs?salary_min=-1")
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
 
 @pytest.mark.asyncio
 async def test_get_job(fake_session, test_client, monkeypatch):
     # Arrange
     mock_service = Mock()
-    mock_service.get_job_by_id = AsyncMock(return_value=fake_job)
+    mock_service.get_job_details = AsyncMock(return_value=fake_job)
 
     # Patch the actual import
     monkeypatch.setattr(job_module,"job_service", mock_service)
@@ -118,7 +216,7 @@ async def test_get_job(fake_session, test_client, monkeypatch):
     data = response.json()
     assert data["title"] == "job1"
     assert data["uid"] == fake_job_id
-    mock_service.get_job_by_id.assert_awaited_once_with(job_uid, fake_session)
+    mock_service.get_job_details.assert_awaited_once_with(job_uid, fake_session)
 
 @pytest.mark.asyncio
 async def test_get_job_not_found(fake_session, test_client, monkeypatch):
@@ -126,7 +224,7 @@ async def test_get_job_not_found(fake_session, test_client, monkeypatch):
     fake_id = uuid4()
     
     mock_service = Mock()
-    mock_service.get_job_by_id = AsyncMock(return_value=None)
+    mock_service.get_job_details = AsyncMock(return_value=None)
 
     # Patch the actual import
     monkeypatch.setattr(job_module,"job_service", mock_service)
@@ -138,7 +236,7 @@ async def test_get_job_not_found(fake_session, test_client, monkeypatch):
     assert response.status_code == status.HTTP_404_NOT_FOUND
     data = response.json()
     assert data["message"] == "Job not found"
-    mock_service.get_job_by_id.assert_awaited_once_with(fake_id, fake_session)
+    mock_service.get_job_details.assert_awaited_once_with(fake_id, fake_session)
 
 @pytest.mark.asyncio
 async def test_job_create_success(fake_session, test_client, monkeypatch):
@@ -162,6 +260,7 @@ async def test_job_create_success(fake_session, test_client, monkeypatch):
         "uid": fake_job_uid,
         "employer_uid": fake_user_uid,
         "created_at": "2025-06-22T00:00:00Z",
+        "updated_at": "2025-06-22T00:00:00Z",
         "application": [],
     })
 
@@ -185,22 +284,19 @@ async def test_update_job_success(fake_session, test_client, monkeypatch):
     fake_user_uid = UUID(FAKE_USER_UID)
     fake_job_uid = uuid4()
 
-    # Mock existing job returned by get_job_by_id
-    fake_existing_job = Mock()
-    fake_existing_job.employer_uid = fake_user_uid
-
     # Mock return of update
     fake_updated_job = {
         **update_payload,
         "uid": str(fake_job_uid),
         "employer_uid": fake_user_uid,
         "created_at": datetime.now(),
+        "updated_at": datetime.now(),
         "application": []
     }
 
     mock_service = Mock()
-    mock_service.get_job_by_id = AsyncMock(return_value=fake_existing_job)
     mock_service.update_job = AsyncMock(return_value=fake_updated_job)
+    mock_service.job_exists = AsyncMock()
 
     monkeypatch.setattr(job_module, "job_service", mock_service)
 
@@ -215,22 +311,17 @@ async def test_update_job_success(fake_session, test_client, monkeypatch):
     data = response.json()
     assert data["title"] == "updated title"
 
-    mock_service.get_job_by_id.assert_awaited_once_with(str(fake_job_uid), fake_session)
-    mock_service.update_job.assert_awaited_once_with(str(fake_job_uid), JobUpdate(**update_payload), fake_session)
+    mock_service.update_job.assert_awaited_once_with(str(fake_job_uid), JobUpdate(**update_payload), fake_session, fake_user_uid)
+    mock_service.job_exists.assert_not_awaited()
 
 @pytest.mark.asyncio
 async def test_update_job_not_found(fake_session, test_client, monkeypatch):
     # Arrange
-    fake_user_uid = FAKE_USER_UID
     fake_job_uid = uuid4()
 
-    # Mock existing job returned by get_job_by_id
-    fake_existing_job = Mock()
-    fake_existing_job.uid = uuid4()
-    fake_existing_job.employer_uid = fake_user_uid
-
     mock_service = Mock()
-    mock_service.get_job_by_id = AsyncMock(return_value=None)
+    mock_service.update_job = AsyncMock(return_value=None)
+    mock_service.job_exists = AsyncMock(return_value=False)
 
     monkeypatch.setattr(job_module, "job_service", mock_service)
 
@@ -242,21 +333,18 @@ async def test_update_job_not_found(fake_session, test_client, monkeypatch):
     data = response.json()
     assert data['message'] == "Job not found"
 
-    mock_service.get_job_by_id.assert_awaited_once_with(str(fake_job_uid), fake_session)
+    mock_service.job_exists.assert_awaited_once_with(str(fake_job_uid), fake_session)
 
 
 @pytest.mark.asyncio
 async def test_update_job_unauthorized_user(fake_session, test_client, monkeypatch):
     # Arrange
-    fake_user_uid = FAKE_USER_UID
     fake_job_uid = uuid4()
 
-    # Mock existing job returned by get_job_by_id
-    fake_existing_job = Mock()
-    fake_existing_job.employer_uid = uuid4()
-
+    # the job exists but the update matched no row, so it belongs to someone else
     mock_service = Mock()
-    mock_service.get_job_by_id = AsyncMock(return_value=fake_existing_job)
+    mock_service.update_job = AsyncMock(return_value=None)
+    mock_service.job_exists = AsyncMock(return_value=True)
 
     monkeypatch.setattr(job_module, "job_service", mock_service)
 
@@ -269,7 +357,8 @@ async def test_update_job_unauthorized_user(fake_session, test_client, monkeypat
     data = response.json()
     assert data['message'] == "You do not have the permission to continue!"
 
-    mock_service.get_job_by_id.assert_awaited_once_with(str(fake_job_uid), fake_session)
+    mock_service.update_job.assert_awaited_once_with(str(fake_job_uid), JobUpdate(**update_payload), fake_session, UUID(FAKE_USER_UID))
+    mock_service.job_exists.assert_awaited_once_with(str(fake_job_uid), fake_session)
 
 
 @pytest.mark.asyncio
@@ -277,14 +366,10 @@ async def test_delete_job_success(fake_session, test_client, monkeypatch):
     fake_user_uid = UUID(FAKE_USER_UID)
     fake_job_uid = uuid4()
 
-    # Mock job returned by job_service.get_job_by_id
-    mock_job = Mock()
-    mock_job.employer_uid = fake_user_uid
-
-    # Create the mock service with both get_job_by_id and delete_job
+    # Create the mock service; the delete returns the uid of the removed row
     mock_service = Mock()
-    mock_service.get_job_by_id = AsyncMock(return_value=mock_job)
-    mock_service.delete_job = AsyncMock()
+    mock_service.delete_job = AsyncMock(return_value=fake_job_uid)
+    mock_service.job_exists = AsyncMock()
 
     # Patch the job_service used in the router
     monkeypatch.setattr(job_module, "job_service", mock_service)
@@ -294,5 +379,307 @@ async def test_delete_job_success(fake_session, test_client, monkeypatch):
 
     # Assert
     assert response.status_code == status.HTTP_204_NO_CONTENT
-    mock_service.get_job_by_id.assert_awaited_once_with(str(fake_job_uid), fake_session)
-    mock_service.delete_job.assert_awaited_once_with(str(fake_job_uid), fake_session)
\ No newline at end of file
+    mock_service.delete_job.assert_awaited_once_with(str(fake_job_uid), fake_session, fake_user_uid)
+    mock_service.job_exists.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_delete_job_not_found(fake_session, test_client, monkeypatch):
+    fake_job_uid = uuid4()
+
+    mock_service = Mock()
+    mock_service.delete_job = AsyncMock(return_value=None)
+    mock_service.job_exists = AsyncMock(return_value=False)
+
+    monkeypatch.setattr(job_module, "job_service", mock_service)
+
+    response = test_client.delete(f"{BASE_URL}/jobs/{fake_job_uid}")
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert response.json()["message"] == "Job not found"
+    mock_service.job_exists.assert_awaited_once_with(str(fake_job_uid), fake_session)
+
+@pytest.mark.asyncio
+async def test_delete_job_unauthorized_user(fake_session, test_client, monkeypatch):
+    fake_job_uid = uuid4()
+
+    mock_service = Mock()
+    mock_service.delete_job = AsyncMock(return_value=None)
+    mock_service.job_exists = AsyncMock(return_value=True)
+
+    monkeypatch.setattr(job_module, "job_service", mock_service)
+
+    response = test_client.delete(f"{BASE_URL}/jobs/{fake_job_uid}")
+
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert response.json()["message"] == "You do not have the permission to continue!"
+
+@pytest.mark.asyncio
+async def test_get_all_jobs_served_from_cache(fake_session, test_client, monkeypatch):
+    # Arrange
+    mock_service = Mock()
+    mock_service.get_all_jobs = AsyncMock()
+    cached = Response(content=b'[]', media_type="application/json", headers={"X-Next-Cursor": "abc"})
+
+    monkeypatch.setattr(job_module, "job_service", mock_service)
+    monkeypatch.setattr(job_module.job_cache, "get", AsyncMock(return_value=cached))
+
+    # Act
+    response = test_client.get(f"{BASE_URL}/jobs?limit=10&job_type=FULL_TIME")
+
+    # Assert
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == []
+    assert response.headers["X-Next-Cursor"] == "abc"
+    mock_service.get_all_jobs.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_get_all_jobs_cache_miss_stores_tagged_page(fake_session, test_client, monkeypatch):
+    # Arrange
+    mock_service = Mock()
+    mock_service.get_all_jobs = AsyncMock(return_value=fake_job_data)
+    mock_service.count_jobs = AsyncMock(return_value=(2, True))
+    cache_set = AsyncMock()
+
+    monkeypatch.setattr(job_module, "job_service", mock_service)
+    monkeypatch.setattr(job_module.job_cache, "get", AsyncMock(return_value=None))
+    monkeypatch.setattr(job_module.job_cache, "set", cache_set)
+
+    # Act
+    response = test_client.get(f"{BASE_URL}/jobs?limit=10")
+
+    # Assert
+    assert response.status_code == status.HTTP_200_OK
+    key, body, headers, tags = cache_set.await_args.args
+    assert body == response.content
+    assert "jobs:list" in tags
+    assert {f"job:{job['uid']}" for job in fake_job_data} <= set(tags)
+    assert f"employer:{fake_job_data[0]['employer_uid']}" in tags
+
+def test_job_cache_key_is_normalized():
+    cache = job_module.job_cache
+
+    assert cache.key("list", skip=0, limit=10, job_type=JobType.FULL_TIME, work_mode=None) == cache.key("list", job_type="FULL_TIME", limit=10, skip=0)
+    assert cache.key("list", skip=0, limit=10) != cache.key("list", skip=10, limit=10)
+
+@pytest.mark.asyncio
+async def test_get_job_sets_etag(fake_session, test_client, monkeypatch):
+    # Arrange
+    mock_service = Mock()
+    mock_service.get_job_details = AsyncMock(return_value=fake_job)
+
+    monkeypatch.setattr(job_module, "job_service", mock_service)
+
+    # Act
+    response = test_client.get(f"{BASE_URL}/jobs/{fake_job_id}")
+
+    # Assert
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["ETag"].startswith('"')
+    assert "Last-Modified" in response.headers
+
+@pytest.mark.asyncio
+async def test_get_job_not_modified_skips_loading(fake_session, test_client, monkeypatch):
+    # Arrange
+    version = (fake_job["updated_at"], 0, None)
+    etag = validators(UUID(fake_job_id), *version)["ETag"]
+    mock_service = Mock()
+    mock_service.get_job_version = AsyncMock(return_value=version)
+    mock_service.get_job_details = AsyncMock()
+
+    monkeypatch.setattr(job_module, "job_service", mock_service)
+
+    # Act
+    response = test_client.get(f"{BASE_URL}/jobs/{fake_job_id}", headers={"If-None-Match": etag})
+
+    # Assert
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.headers["ETag"] == etag
+    assert response.content == b""
+    mock_service.get_job_details.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_get_job_stale_etag_returns_body(fake_session, test_client, monkeypatch):
+    # Arrange
+    mock_service = Mock()
+    mock_service.get_job_version = AsyncMock(return_value=(fake_job["updated_at"], 0, None))
+    mock_service.get_job_details = AsyncMock(return_value=fake_job)
+
+    monkeypatch.setattr(job_module, "job_service", mock_service)
+
+    # Act
+    response = test_client.get(f"{BASE_URL}/jobs/{fake_job_id}", headers={"If-None-Match": '"stale"'})
+
+    # Assert
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["title"] == "job1"
+
+@pytest.mark.asyncio
+async def test_get_job_not_modified_from_cache(fake_session, test_client, monkeypatch):
+    # Arrange
+    mock_service = Mock()
+    mock_service.get_job_version = AsyncMock()
+    cached = Response(content=b'{}', media_type="application/json", headers={"ETag": '"abc"'})
+
+    monkeypatch.setattr(job_module, "job_service", mock_service)
+    monkeypatch.setattr(job_module.job_cache, "get", AsyncMock(return_value=cached))
+
+    # Act
+    response = test_client.get(f"{BASE_URL}/jobs/{fake_job_id}", headers={"If-None-Match": 'W/"abc"'})
+
+    # Assert
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    mock_service.get_job_version.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_public_jobs_disabled(test_client, monkeypatch):
+    monkeypatch.setattr(job_module.Config, "PUBLIC_JOB_LISTING", False)
+
+    response = test_client.get(f"{BASE_URL}/public/jobs")
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert response.json()["error_code"] == "public_listing_disabled"
+
+@pytest.mark.asyncio
+async def test_public_jobs_are_edge_cacheable(fake_session, test_client, monkeypatch):
+    # Arrange
+    mock_service = Mock()
+    mock_service.get_all_jobs = AsyncMock(return_value=fake_job_data)
+    mock_service.count_jobs = AsyncMock(return_value=(2, True))
+
+    monkeypatch.setattr(job_module, "job_service", mock_service)
+    monkeypatch.setattr(job_module.Config, "PUBLIC_JOB_LISTING", True)
+    monkeypatch.setattr(job_module.Config, "PUBLIC_JOBS_S_MAXAGE", 120)
+
+    # Act
+    response = test_client.get(f"{BASE_URL}/public/jobs?work_mode=REMOTE")
+
+    # Assert
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == jsonable_encoder(fake_job_data)
+    assert response.headers["Cache-Control"] == "public, max-age=0, s-maxage=120"
+    surrogate_keys = response.headers["Surrogate-Key"].split(" ")
+    assert {"jobs:list", f"job:{fake_job_data[0]['uid']}", f"employer:{fake_job_data[0]['employer_uid']}", "work_mode:REMOTE"} <= set(surrogate_keys)
+    mock_service.get_all_jobs.assert_awaited_once_with(fake_session, 0, 10, None, WorkMode.REMOTE, None, SalaryFilter())
+
+fake_facets = {
+    "job_type": {"FULL_TIME": 2},
+    "work_mode": {"HYBRID": 1, "REMOTE": 1},
+    "location": {"job1": 1, "job2": 1},
+    "is_active": {"false": 1, "true": 1},
+}
+
+@pytest.mark.asyncio
+async def test_search_jobs(fake_session, test_client, monkeypatch):
+    # Arrange
+    page = [(Job(**job), 0.5) for job in fake_job_data]
+    mock_service = Mock()
+    mock_service.search_jobs = AsyncMock(return_value=page)
+    mock_service.get_job_facets = AsyncMock(return_value=fake_facets)
+
+    monkeypatch.setattr(job_module, "job_service", mock_service)
+
+    # Act
+    response = test_client.get(f"{BASE_URL}/jobs/search?q=python&limit=2&work_mode=REMOTE")
+
+    # Assert
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert [job["title"] for job in data["jobs"]] == ["job1", "job2"]
+    rank, created_at, uid = decode_cursor(response.headers["X-Next-Cursor"])
+    assert rank == 0.5
+    assert uid == str(page[-1][0].uid)
+    assert data["facets"] == fake_facets
+    mock_service.search_jobs.assert_awaited_once_with(fake_session, "python", 2, None, WorkMode.REMOTE, None)
+    mock_service.get_job_facets.assert_awaited_once_with(fake_session, "python", None, WorkMode.REMOTE)
+
+@pytest.mark.asyncio
+async def test_search_jobs_last_page(fake_session, test_client, monkeypatch):
+    # Arrange
+    mock_service = Mock()
+    mock_service.search_jobs = AsyncMock(return_value=[(Job(**fake_job_data[0]), 0.1)])
+    mock_service.get_job_facets = AsyncMock(return_value=fake_facets)
+
+    monkeypatch.setattr(job_module, "job_service", mock_service)
+
+    # Act
+    response = test_client.get(f"{BASE_URL}/jobs/search?q=python")
+
+    # Assert
+    assert response.status_code == status.HTTP_200_OK
+    assert "X-Next-Cursor" not in response.headers
+    assert "next_cursor" not in response.json()
+
+@pytest.mark.asyncio
+async def test_search_jobs_requires_query(test_client):
+    response = test_client.get(f"{BASE_URL}/jobs/search")
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+@pytest.mark.asyncio
+async def test_get_job_facets(fake_session, test_client, monkeypatch):
+    # Arrange
+    mock_service = Mock()
+    mock_service.get_job_facets = AsyncMock(return_value=fake_facets)
+
+    monkeypatch.setattr(job_module, "job_service", mock_service)
+
+    # Act
+    response = test_client.get(f"{BASE_URL}/jobs/facets?job_type=FULL_TIME")
+
+    # Assert
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == fake_facets
+    mock_service.get_job_facets.assert_awaited_once_with(fake_session, None, JobType.FULL_TIME, None)
+
+@pytest.mark.asyncio
+async def test_job_facets_cached_per_filter_combination(fake_session, test_client, monkeypatch):
+    # Arrange
+    mock_service = Mock()
+    mock_service.get_job_facets = AsyncMock()
+    cached = Response(content=json.dumps(fake_facets).encode(), media_type="application/json")
+    cache_get = AsyncMock(return_value=cached)
+
+    monkeypatch.setattr(job_module, "job_service", mock_service)
+    monkeypatch.setattr(job_module.job_cache, "get", cache_get)
+
+    # Act
+    response = test_client.get(f"{BASE_URL}/jobs/facets?q=python%20%20dev")
+
+    # Assert
+    assert response.json() == fake_facets
+    mock_service.get_job_facets.assert_not_awaited()
+    cache_get.assert_awaited_once_with(job_module.job_cache.key("facets", q="python dev"))
+
+@pytest.mark.asyncio
+async def test_get_nearby_jobs(fake_session, test_client, monkeypatch):
+    # Arrange
+    job = models.Job.model_validate({**fake_job_data[1], "latitude": 6.6018, "longitude": 3.3515, "geohash": "s14mq4y"})
+    mock_service = Mock()
+    mock_service.get_nearby_jobs = AsyncMock(return_value=[(job, 8.60512345)])
+
+    monkeypatch.setattr(job_module, "job_service", mock_service)
+
+    # Act
+    response = test_client.get(f"{BASE_URL}/jobs/nearby?lat=6.5244&lon=3.3792&radius_km=10&limit=1&work_mode=REMOTE")
+
+    # Assert
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data[0]["uid"] == fake_job_data[1]["uid"]
+    assert data[0]["distance_km"] == 8.605
+    assert (data[0]["latitude"], data[0]["longitude"]) == (6.6018, 3.3515)
+    assert decode_distance_cursor(response.headers["X-Next-Cursor"]) == (8.60512345, UUID(fake_job_data[1]["uid"]))
+    mock_service.get_nearby_jobs.assert_awaited_once_with(fake_session, 6.5244, 3.3792, 10, 1, None, WorkMode.REMOTE, None, SalaryFilter())
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("query", ["lat=91&lon=0", "lat=0&lon=-181", "lat=0&lon=0&radius_km=0", "lat=0&lon=0&radius_km=501", "lon=0"])
+async def test_get_nearby_jobs_validates_the_circle(fake_session, test_client, monkeypatch, query):
+    mock_service = Mock()
+    mock_service.get_nearby_jobs = AsyncMock()
+
+    monkeypatch.setattr(job_module, "job_service", mock_service)
+
+    response = test_client.get(f"{BASE_URL}/jobs/nearby?{query}")
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    mock_service.get_nearby_jobs.assert_not_awaited()
@@ -0,0 +1,41 @@
+import pytest
+from fastapi import status
+from uuid import uuid4
+from src import app
+from src.app.auth.dependencies import get_current_user
+from src.app.router.metrics import metrics_role
+from src.app.schemas import UserPrincipal
+
+BASE_URL = f"/api/v1"
+
+
+@pytest.mark.asyncio
+async def test_db_pool_metrics(test_client):
+
+    response = test_client.get(f"{BASE_URL}/metrics/db-pool")
+
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["checked_out"] == 0
+    assert {"worker_pid", "pool_size", "max_overflow", "checked_in", "overflow"} <= data.keys()
+
+
+@pytest.mark.asyncio
+async def test_cache_metrics(test_client):
+
+    response = test_client.get(f"{BASE_URL}/metrics/cache")
+
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert {"hits", "misses", "stores", "evictions", "errors"} <= data["jobs"].keys()
+
+
+@pytest.mark.parametrize("path", ["db-pool", "cache", "outbox"])
+def test_metrics_are_for_admins_only(path, test_client, monkeypatch):
+    monkeypatch.delitem(app.dependency_overrides, metrics_role.dependency)
+    monkeypatch.setitem(app.dependency_overrides, get_current_user, lambda: UserPrincipal(uid=uuid4(), email_address="user@example.com", role="USER"))
+
+    response = test_client.get(f"{BASE_URL}/metrics/{path}")
+
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert response.json()["error_code"] == "unauthorized_user_role"
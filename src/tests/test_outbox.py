@@ -0,0 +1,157 @@
+"""
+Runs the outbox dispatcher against a scratch schema. Needs a reachable Postgres
+at DATABASE_URL; skipped otherwise.
+"""
+import asyncio
+import pytest
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from unittest.mock import Mock
+from sqlalchemy import text
+from sqlalchemy.pool import NullPool
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.config import Config
+from src.app import outbox
+from src.app.models import OutboxMessage
+
+
+@asynccontextmanager
+async def scratch_outbox():
+    admin = create_async_engine(Config.DATABASE_URL, poolclass=NullPool, connect_args={"timeout": 2})
+    try:
+        async with admin.begin() as conn:
+            await conn.execute(text("DROP SCHEMA IF EXISTS outbox_test CASCADE"))
+            await conn.execute(text("CREATE SCHEMA outbox_test"))
+    except Exception as e:
+        await admin.dispose()
+        pytest.skip(f"Postgres is not reachable: {e}")
+
+    # the dispatcher commits, so it gets a schema of its own rather than a rolled back transaction
+    engine = create_async_engine(Config.DATABASE_URL, poolclass=NullPool, connect_args={"server_settings": {"search_path": "outbox_test"}})
+    async with engine.begin() as conn:
+        await conn.run_sync(OutboxMessage.__table__.create)
+
+    try:
+        yield async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    finally:
+        await engine.dispose()
+        async with admin.begin() as conn:
+            await conn.execute(text("DROP SCHEMA outbox_test CASCADE"))
+        await admin.dispose()
+
+
+async def enqueue(session_maker, count: int) -> None:
+    async with session_maker() as session:
+        for i in range(count):
+            outbox.enqueue_email(session, [f"user{i}@example.com"], "verify_email", link="http://localhost/verify")
+        await session.commit()
+
+
+async def pending(session_maker) -> list[OutboxMessage]:
+    async with session_maker() as session:
+        return (await session.exec(select(OutboxMessage))).all()
+
+
+@pytest.fixture
+def fake_batch_task(monkeypatch):
+    task = Mock()
+    monkeypatch.setattr(outbox, "send_email_batch", task)
+    return task
+
+
+@pytest.mark.asyncio
+async def test_drain_hands_committed_emails_to_celery_in_batches(fake_batch_task):
+    async with scratch_outbox() as session_maker:
+        await enqueue(session_maker, 250)
+        dispatcher = outbox.OutboxDispatcher(session_maker, batch_size=100)
+
+        await dispatcher.drain()
+
+        assert [len(call.args[0]) for call in fake_batch_task.delay.call_args_list] == [100, 100, 50]
+        assert {"recipients", "template", "context"} == set(fake_batch_task.delay.call_args.args[0][0])
+        assert await pending(session_maker) == []
+        assert dispatcher.stats["dispatched"] == 250
+        assert dispatcher.stats["last_lag_seconds"] >= 0
+
+
+@pytest.mark.asyncio
+async def test_uncommitted_emails_are_never_sent(fake_batch_task):
+    async with scratch_outbox() as session_maker:
+        async with session_maker() as session:
+            outbox.enqueue_email(session, ["user@example.com"], "verify_email", link="http://localhost/verify")
+            await session.rollback()
+
+        await outbox.OutboxDispatcher(session_maker).drain()
+
+        fake_batch_task.delay.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_broker_failure_keeps_the_emails(fake_batch_task):
+    async with scratch_outbox() as session_maker:
+        await enqueue(session_maker, 3)
+        fake_batch_task.delay.side_effect = ConnectionError("broker is down")
+        dispatcher = outbox.OutboxDispatcher(session_maker)
+
+        with pytest.raises(ConnectionError):
+            await dispatcher.drain()
+
+        assert len(await pending(session_maker)) == 3
+
+        fake_batch_task.delay.side_effect = None
+        await dispatcher.drain()
+
+        assert await pending(session_maker) == []
+
+
+@pytest.mark.asyncio
+async def test_concurrent_dispatchers_send_each_email_once(fake_batch_task):
+    async with scratch_outbox() as session_maker:
+        await enqueue(session_maker, 500)
+        dispatchers = [outbox.OutboxDispatcher(session_maker, batch_size=50) for _ in range(4)]
+
+        await asyncio.gather(*(dispatcher.drain() for dispatcher in dispatchers))
+
+        sent = [message["recipients"][0] for call in fake_batch_task.delay.call_args_list for message in call.args[0]]
+        assert len(sent) == len(set(sent)) == 500
+
+
+@pytest.mark.asyncio
+async def test_direct_delivery_pushes_back_transient_failures(monkeypatch):
+    async with scratch_outbox() as session_maker:
+        await enqueue(session_maker, 3)
+
+        async def send_batch(pool, messages):
+            return [messages[0]], [messages[1]]
+
+        monkeypatch.setattr(outbox, "send_batch", send_batch)
+        dispatcher = outbox.OutboxDispatcher(session_maker, delivery="smtp")
+
+        await dispatcher.drain()
+
+        [retry] = await pending(session_maker)
+        assert retry.attempts == 1
+        assert retry.available_at > datetime.now(timezone.utc)
+        assert (dispatcher.stats["dispatched"], dispatcher.stats["retried"], dispatcher.stats["dropped"]) == (3, 1, 1)
+
+        # not due yet
+        assert await dispatcher.dispatch_batch() == 0
+
+
+@pytest.mark.asyncio
+async def test_backlog(fake_batch_task):
+    async with scratch_outbox() as session_maker:
+        dispatcher = outbox.OutboxDispatcher(session_maker)
+
+        async with session_maker() as session:
+            assert await dispatcher.backlog(session) == {"pending": 0, "oldest_pending_seconds": None}
+
+        await enqueue(session_maker, 2)
+
+        async with session_maker() as session:
+            backlog = await dispatcher.backlog(session)
+
+        assert backlog["pending"] == 2
+        assert backlog["oldest_pending_seconds"] >= 0
@@ -0,0 +1,37 @@
+import pytest
+from src.app.salary import parse_salary, ParsedSalary
+from src.app.schemas import SalaryPeriod
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("$50k - 70k per year", ParsedSalary(50_000, 70_000, "USD", SalaryPeriod.YEAR)),
+    ("50-70k USD", ParsedSalary(50_000, 70_000, "USD", None)),
+    ("NGN 350,000 monthly", ParsedSalary(350_000, 350_000, "NGN", SalaryPeriod.MONTH)),
+    ("₦1.5m/yr", ParsedSalary(1_500_000, 1_500_000, "NGN", SalaryPeriod.YEAR)),
+    ("£30 per hour", ParsedSalary(30, 30, "GBP", SalaryPeriod.HOUR)),
+    ("$4,000 p.m.", ParsedSalary(4_000, 4_000, "USD", SalaryPeriod.MONTH)),
+    ("500 - 1k naira weekly", ParsedSalary(500, 1_000, "NGN", SalaryPeriod.WEEK)),
+    ("70,000 - 50,000 EUR", ParsedSalary(50_000, 70_000, "EUR", None)),
+    ("NGN 1.5 million per year", ParsedSalary(1_500_000, 1_500_000, "NGN", SalaryPeriod.YEAR)),
+    ("2 - 3 million naira", ParsedSalary(2_000_000, 3_000_000, "NGN", None)),
+    ("300 thousand monthly", ParsedSalary(300_000, 300_000, None, SalaryPeriod.MONTH)),
+    ("₦1.2bn a year", ParsedSalary(1_200_000_000, 1_200_000_000, "NGN", SalaryPeriod.YEAR)),
+    ("10% bonus, 200k", ParsedSalary(200_000, 200_000, None, None)),
+    ("$90k + 15 % equity", ParsedSalary(90_000, 90_000, "USD", None)),
+])
+def test_parse_salary(text, expected):
+    assert parse_salary(text) == expected
+
+
+@pytest.mark.parametrize("text", ["", "Negotiable", "Competitive"])
+def test_unparseable_salary_is_left_empty(text):
+    assert parse_salary(text) == ParsedSalary()
+
+
+def test_words_are_not_taken_for_currencies():
+    assert parse_salary("100 per day").currency is None
+
+
+def test_amounts_too_big_to_store_are_dropped():
+    assert parse_salary("50,000,000,000 NGN") == ParsedSalary(currency="NGN")
+    assert parse_salary("40k - 50,000,000,000 USD") == ParsedSalary(40_000, 40_000, "USD", None)
@@ -0,0 +1,199 @@
+import asyncio
+import threading
+import pytest
+import aiosmtplib
+from unittest.mock import Mock
+from src.app.smtp_pool import SMTPPool, MailLoop, send_batch
+from src.app.email_templates import email_message
+from src import celery_tasks
+
+
+class FakeSMTP:
+    """Records what it sends; `failures` maps a recipient to the exception sending to them raises"""
+    def __init__(self, failures=None):
+        self.is_connected = True
+        self.sent = []
+        self.failures = failures or {}
+
+    async def send_message(self, message):
+        error = self.failures.pop(message["To"], None)
+
+        if error is not None:
+            if isinstance(error, aiosmtplib.SMTPServerDisconnected):
+                self.is_connected = False
+            raise error
+
+        self.sent.append(message["To"])
+
+    async def quit(self):
+        self.is_connected = False
+
+    def close(self):
+        self.is_connected = False
+
+
+def fake_server(*sessions):
+    """A connect() handing out the given sessions, then fresh well-behaved ones"""
+    sessions = list(sessions)
+    opened = []
+
+    async def connect():
+        session = sessions.pop(0) if sessions else FakeSMTP()
+        opened.append(session)
+        return session
+
+    return connect, opened
+
+
+def message(to):
+    return {"recipients": [to], "subject": "Verify your email", "body": "<p>hi</p>"}
+
+
+@pytest.mark.asyncio
+async def test_messages_share_one_session():
+    connect, opened = fake_server()
+    pool = SMTPPool(connect, size=1)
+
+    retry, failed = await send_batch(pool, [message(f"user{i}@example.com") for i in range(20)])
+
+    assert (retry, failed) == ([], [])
+    assert len(opened) == 1
+    assert len(opened[0].sent) == 20
+
+
+@pytest.mark.asyncio
+async def test_dropped_session_is_replaced_and_the_message_resent():
+    connect, opened = fake_server(FakeSMTP(failures={"b@example.com": aiosmtplib.SMTPServerDisconnected("gone")}))
+    pool = SMTPPool(connect, size=1)
+
+    retry, failed = await send_batch(pool, [message("a@example.com"), message("b@example.com"), message("c@example.com")])
+
+    assert (retry, failed) == ([], [])
+    assert len(opened) == 2
+    assert opened[0].sent == ["a@example.com"]
+    assert opened[1].sent == ["b@example.com", "c@example.com"]
+    assert pool.stats["reconnects"] == 1
+
+
+@pytest.mark.asyncio
+async def test_sessions_are_recycled_after_max_messages():
+    connect, opened = fake_server()
+    pool = SMTPPool(connect, size=1, max_messages=3)
+
+    await send_batch(pool, [message(f"user{i}@example.com") for i in range(7)])
+
+    assert [len(session.sent) for session in opened] == [3, 3, 1]
+    assert not opened[0].is_connected
+
+
+@pytest.mark.asyncio
+async def test_refusals_are_sorted_into_retry_and_failed():
+    connect, opened = fake_server(FakeSMTP(failures={
+        "busy@example.com": aiosmtplib.SMTPResponseException(451, "try again later"),
+        "gone@example.com": aiosmtplib.SMTPRecipientsRefused([]),
+        "spam@example.com": aiosmtplib.SMTPDataError(554, "rejected"),
+    }))
+    pool = SMTPPool(connect, size=1)
+    messages = [message(to) for to in ["busy@example.com", "ok@example.com", "gone@example.com", "spam@example.com"]]
+
+    retry, failed = await send_batch(pool, messages)
+
+    assert retry == [messages[0]]
+    assert failed == [messages[2], messages[3]]
+    # a refused message doesn't cost the session
+    assert len(opened) == 1
+    assert opened[0].sent == ["ok@example.com"]
+
+
+def test_batch_task_requeues_only_retryable_messages(monkeypatch):
+    busy, refused = message("busy@example.com"), message("spam@example.com")
+    messages = [message("a@example.com"), busy, refused]
+    apply_async = Mock()
+
+    monkeypatch.setattr(celery_tasks.mail_loop, "run", lambda work: ([busy], [refused]))
+    monkeypatch.setattr(celery_tasks.send_email_batch, "apply_async", apply_async)
+
+    result = celery_tasks.send_email_batch(messages, attempt=1)
+
+    assert result == {"sent": 1, "retrying": 1, "failed": 1}
+    apply_async.assert_called_once_with(([busy], 2, False), countdown=celery_tasks.Config.EMAIL_RETRY_DELAY * 2, queue="transactional", priority=0)
+
+
+def test_batch_task_gives_up_after_max_retries(monkeypatch):
+    busy = message("busy@example.com")
+    apply_async = Mock()
+
+    monkeypatch.setattr(celery_tasks.mail_loop, "run", lambda work: ([busy], []))
+    monkeypatch.setattr(celery_tasks.send_email_batch, "apply_async", apply_async)
+
+    result = celery_tasks.send_email_batch([busy], attempt=celery_tasks.Config.EMAIL_BATCH_MAX_RETRIES)
+
+    assert result == {"sent": 0, "retrying": 0, "failed": 1}
+    apply_async.assert_not_called()
+
+
+def test_mail_loop_outlives_each_call():
+    mail_loop = MailLoop()
+
+    async def where(pool):
+        return asyncio.get_running_loop(), threading.current_thread(), pool
+
+    first = mail_loop.run(where)
+    second = mail_loop.run(where)
+
+    assert first == second
+    assert first[1] is not threading.current_thread()
+
+    mail_loop.close()
+
+
+@pytest.mark.asyncio
+async def test_templates_are_rendered_at_send_time():
+    session, sent = FakeSMTP(), []
+
+    async def send_message(message):
+        sent.append(message)
+
+    session.send_message = send_message
+    connect, opened = fake_server(session)
+    pool = SMTPPool(connect, size=1)
+    broken = email_message(["b@example.com"], "password_reset")
+
+    retry, failed = await send_batch(pool, [email_message(["a@example.com"], "password_reset", link="http://localhost/reset/abc"), broken])
+
+    assert (retry, failed) == ([], [broken])
+    assert sent[0]["Subject"] == "Password reset"
+    assert "http://localhost/reset/abc" in sent[0].get_content()
+
+
+def test_bulk_batches_keep_to_the_bulk_queue(monkeypatch):
+    busy = message("busy@example.com")
+    apply_async = Mock()
+
+    monkeypatch.setattr(celery_tasks.mail_loop, "run", lambda work: ([busy], []))
+    monkeypatch.setattr(celery_tasks.send_email_batch, "apply_async", apply_async)
+
+    celery_tasks.queue_email_batch([message("a@example.com")], bulk=True)
+    celery_tasks.send_email_batch([busy], attempt=0, bulk=True)
+
+    assert [call.kwargs["queue"] for call in apply_async.call_args_list] == ["bulk", "bulk"]
+    assert all(call.kwargs["priority"] == 9 for call in apply_async.call_args_list)
+
+
+def test_email_tasks_store_no_results():
+    assert celery_tasks.send_email.ignore_result
+    assert celery_tasks.send_email_batch.ignore_result
+    assert celery_tasks.app.conf.task_default_queue == "transactional"
+
+
+@pytest.mark.asyncio
+async def test_messages_that_cannot_be_built_fail_alone():
+    connect, opened = fake_server()
+    pool = SMTPPool(connect, size=1)
+    bad_header = {"recipients": ["a@example.com"], "subject": "Hi\nBcc: everyone@example.com", "body": "<p>hi</p>"}
+    no_context = {"recipients": ["b@example.com"], "template": "password_reset"}
+
+    retry, failed = await send_batch(pool, [bad_header, no_context, message("c@example.com")])
+
+    assert (retry, failed) == ([], [bad_header, no_context])
+    assert opened[0].sent == ["c@example.com"]
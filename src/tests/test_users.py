@@ -5,6 +5,8 @@ from src.app.router import users as users_module
 from uuid import uuid4, UUID
 from src.app.auth.dependencies import access_token_bearer
 from src import app
+from src.app.conditional import validators
+from src.app.schemas import UserDetails
 
 BASE_URL = f"/api/v1"
 user_uid = uuid4()
@@ -132,7 +134,7 @@ async def test_get_all_users_error(fake_session, test_client, monkeypatch):
 async def test_get_user(fake_session, test_client, monkeypatch):
     # Arrange
     mock_service = Mock()
-    mock_service.get_user = AsyncMock(return_value=fake_user)
+    mock_service.get_user_details = AsyncMock(return_value=fake_user)
 
     # Patch the actual import
     monkeypatch.setattr(users_module,"user_service", mock_service)
@@ -146,14 +148,53 @@ async def test_get_user(fake_session, test_client, monkeypatch):
     assert response.status_code == 200
     data = response.json()
     assert data == fake_user
-    mock_service.get_user.assert_awaited_once_with(user_uid, fake_session)
+    mock_service.get_user_details.assert_awaited_once_with(user_uid, fake_session)
+
+
+@pytest.mark.asyncio
+async def test_get_user_not_modified(fake_session, test_client, monkeypatch):
+    # Arrange
+    version = (fake_user["updated_at"], 0, None, 0, None)
+    mock_service = Mock()
+    mock_service.get_user_version = AsyncMock(return_value=version)
+    mock_service.get_user_details = AsyncMock()
+
+    monkeypatch.setattr(users_module,"user_service", mock_service)
+
+    # the ETag of a full response is accepted on the next poll
+    etag = validators(user_uid, *version)["ETag"]
+
+    # Act
+    response = test_client.get(f"{BASE_URL}/users/{user_uid}", headers={"If-None-Match": etag})
+
+    # Assert
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    mock_service.get_user_details.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_get_user_etag_matches_version(fake_session, test_client, monkeypatch):
+    # Arrange
+    mock_service = Mock()
+    mock_service.get_user_details = AsyncMock(return_value=fake_user)
+    mock_service.get_user_version = AsyncMock(return_value=(UserDetails(**fake_user).updated_at, 0, None, 0, None))
+
+    monkeypatch.setattr(users_module,"user_service", mock_service)
+
+    # Act
+    first = test_client.get(f"{BASE_URL}/users/{user_uid}")
+    second = test_client.get(f"{BASE_URL}/users/{user_uid}", headers={"If-None-Match": first.headers["ETag"]})
+
+    # Assert
+    assert first.status_code == status.HTTP_200_OK
+    assert second.status_code == status.HTTP_304_NOT_MODIFIED
 
 
 @pytest.mark.asyncio
 async def test_get_user_invalid_token(fake_session, test_client, monkeypatch):
     # Arrange
     mock_service = Mock()
-    mock_service.get_user = AsyncMock(return_value=fake_user)
+    mock_service.get_user_details = AsyncMock(return_value=fake_user)
 
     # Patch the actual import
     monkeypatch.setattr(users_module,"user_service", mock_service)
@@ -171,7 +212,7 @@ async def test_get_user_not_found(fake_session, test_client, monkeypatch):
     fake_uid = uuid4()
     # Arrange
     mock_service = Mock()
-    mock_service.get_user = AsyncMock(return_value=None)
+    mock_service.get_user_details = AsyncMock(return_value=None)
 
     # Patch the actual import
     monkeypatch.setattr(users_module,"user_service", mock_service)
@@ -185,7 +226,7 @@ async def test_get_user_not_found(fake_session, test_client, monkeypatch):
     assert response.status_code == status.HTTP_404_NOT_FOUND
     data = response.json()
     assert data["message"] == "User not found"
-    mock_service.get_user.assert_awaited_once_with(fake_uid, fake_session)
+    mock_service.get_user_details.assert_awaited_once_with(fake_uid, fake_session)
 
 @pytest.mark.asyncio
 async def test_update_user_success(fake_session, test_client, monkeypatch):
@@ -194,11 +235,7 @@ async def test_update_user_success(fake_session, test_client, monkeypatch):
 
     payload = update_payload
 
-    fake_user = Mock()
-    fake_user.uid = user_uid
-
     mock_service = Mock()
-    mock_service.get_user = AsyncMock(return_value=fake_user)
     mock_service.update_user = AsyncMock(return_value={**payload, "uid": str(user_uid)})
 
     monkeypatch.setattr(users_module, "user_service", mock_service)
@@ -211,7 +248,6 @@ async def test_update_user_success(fake_session, test_client, monkeypatch):
     data = response.json()
     assert data["first_name"] == "test4"
 
-    mock_service.get_user.assert_awaited_once_with(user_uid, fake_session)
     args, kwargs = mock_service.update_user.await_args
     assert args[0] == user_uid
     assert args[2] == fake_session
@@ -225,7 +261,7 @@ async def test_update_user_not_found(fake_session, test_client, monkeypatch):
     payload = update_payload
 
     mock_service = Mock()
-    mock_service.get_user = AsyncMock(return_value=None)
+    mock_service.update_user = AsyncMock(return_value=None)
 
     monkeypatch.setattr(users_module, "user_service", mock_service)
 
@@ -237,21 +273,20 @@ async def test_update_user_not_found(fake_session, test_client, monkeypatch):
     data = response.json()
     assert data["message"] == "User not found"
 
-    mock_service.get_user.assert_awaited_once_with(user_uid, fake_session)
+    mock_service.update_user.assert_awaited_once()
 
 @pytest.mark.asyncio
 async def test_update_user_not_authorized(fake_session, test_client, monkeypatch):
     user_uid = uuid4()
     payload = update_payload
 
-    fake_user = Mock()
-    fake_user.uid = uuid4()  # NOT the same as user_uid
     mock_service = Mock()
-    mock_service.get_user = AsyncMock(return_value=fake_user)
+    mock_service.update_user = AsyncMock()
 
     monkeypatch.setattr(users_module, "user_service", mock_service)
 
-    app.dependency_overrides[access_token_bearer] = lambda: {"user": {"user_uid": str(user_uid)}}
+    # token belongs to a different user than the one being updated
+    app.dependency_overrides[access_token_bearer] = lambda: {"user": {"user_uid": str(uuid4())}}
 
     response = test_client.put(f"{BASE_URL}/users/{user_uid}", json=payload)
 
@@ -259,18 +294,15 @@ async def test_update_user_not_authorized(fake_session, test_client, monkeypatch
     data = response.json()
     assert data["message"] == "You do not have the permission to continue!"
 
-    mock_service.get_user.assert_awaited_once_with(user_uid, fake_session)
+    mock_service.update_user.assert_not_awaited()
 
 
 @pytest.mark.asyncio
 async def test_delete_user_success(fake_session, test_client, monkeypatch):
-    user_uid = str(uuid4())
-    fake_user = Mock()
-    fake_user.uid = UUID(user_uid)
+    user_uid = uuid4()
 
     mock_service = Mock()
-    mock_service.get_user = AsyncMock(return_value=fake_user)
-    mock_service.delete_user = AsyncMock()
+    mock_service.delete_user = AsyncMock(return_value=user_uid)
 
     monkeypatch.setattr(users_module, "user_service", mock_service)
 
@@ -279,16 +311,15 @@ async def test_delete_user_success(fake_session, test_client, monkeypatch):
     response = test_client.delete(f"{BASE_URL}/users/{user_uid}")
 
     assert response.status_code == status.HTTP_204_NO_CONTENT
-    mock_service.get_user.assert_awaited_once_with(user_uid, fake_session)
     mock_service.delete_user.assert_awaited_once_with(user_uid, fake_session)
 
 
 @pytest.mark.asyncio
 async def test_delete_user_not_found(fake_session, test_client, monkeypatch):
-    user_uid = str(uuid4())
+    user_uid = uuid4()
 
     mock_service = Mock()
-    mock_service.get_user = AsyncMock(return_value=None)
+    mock_service.delete_user = AsyncMock(return_value=None)
 
     monkeypatch.setattr(users_module, "user_service", mock_service)
 
@@ -299,22 +330,19 @@ async def test_delete_user_not_found(fake_session, test_client, monkeypatch):
     assert response.status_code == status.HTTP_404_NOT_FOUND
     data = response.json()
     assert data["message"] == "User not found"
-    mock_service.get_user.assert_awaited_once_with(user_uid, fake_session)
+    mock_service.delete_user.assert_awaited_once_with(user_uid, fake_session)
 
 @pytest.mark.asyncio
 async def test_delete_user_not_authorized(fake_session, test_client, monkeypatch):
     user_uid = str(uuid4())
     another_user = str(uuid4())
 
-    fake_user = Mock()
-    fake_user.uid = UUID(another_user)
-
     mock_service = Mock()
-    mock_service.get_user = AsyncMock(return_value=fake_user)
+    mock_service.delete_user = AsyncMock()
 
     monkeypatch.setattr(users_module, "user_service", mock_service)
 
-    app.dependency_overrides[access_token_bearer] = lambda: {"user": {"user_uid": str(user_uid)}}
+    app.dependency_overrides[access_token_bearer] = lambda: {"user": {"user_uid": another_user}}
 
     response = test_client.delete(f"{BASE_URL}/users/{user_uid}")
 
@@ -322,4 +350,4 @@ async def test_delete_user_not_authorized(fake_session, test_client, monkeypatch
     data = response.json()
     assert data["message"] == "You do not have the permission to continue!"
 
-    mock_service.get_user.assert_awaited_once_with(user_uid, fake_session)
+    mock_service.delete_user.assert_not_awaited()